@@ -0,0 +1,43 @@
+"""
+Finans Asistanı - Alarm Worker'ı
+Fiyat alarmlarını web sunucusundan ayrı bir süreçte değerlendirir:
+
+    python src/alert_worker.py            # ALERT_EVAL_INTERVAL saniyede bir
+    python src/alert_worker.py --once     # tek tur (cron için)
+
+Web uygulaması serverless çalışırken (Vercel) arka plan thread'i yaşamaz;
+bu worker aynı DATABASE_URL ile sürekli çalışan bir makinede başlatılır.
+Tetiklenen alarmlar veritabanına yazılır, ALERT_WEBHOOK_URL tanımlıysa
+webhook'a gönderilir; tarayıcılar onları /api/alerts/check ile alır.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from web_app import alert_evaluator, evaluate_alerts, logger
+from utils import flush_logs
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if "--once" in argv:
+        count = evaluate_alerts()
+        logger.info(f"⏱️ {count} sembolün alarmları değerlendirildi")
+        flush_logs()
+        return 0
+
+    if alert_evaluator.interval <= 0:
+        logger.error("ALERT_EVAL_INTERVAL sıfırdan büyük olmalı")
+        return 1
+    logger.info(f"⏱️ Alarm worker'ı başladı ({alert_evaluator.interval:g} sn)")
+    try:
+        alert_evaluator.run()
+    except KeyboardInterrupt:
+        logger.info("👋 Alarm worker'ı durduruldu")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Finans Asistanı - Fiyat Alarmı İndeksi
+Alarmlar sembole göre gruplanır; her sembolde "üstüne çıkarsa" ve
+"altına düşerse" alarmları eşik fiyatına göre sıralı tutulur.
+
+Bir sembolün yeni fiyatı geldiğinde tetiklenen alarmlar tek bir bisect ile
+bulunur (O(log n + tetiklenen)); tüm alarm listesi taranmaz. Fiyatı
+izlenmeyen semboller için maliyet bir sözlük aramasıdır.
+
+Değerlendirme tarayıcı sorgularından bağımsızdır: AlertEvaluator bekleyen
+alarmların fiyatlarını arka planda periyodik olarak tazeler, tetiklenen
+alarmlar (tanımlıysa) webhook'a iletilir.
+"""
+
+import json
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("Alerts")
+
+KOSULLAR = ("above", "below")
+
+
+class _SembolAlarmlari:
+    """Tek sembolün alarmları: koşul başına eşik ve alarm listeleri (eşiğe göre sıralı)"""
+
+    __slots__ = ("esikler", "alarmlar")
+
+    def __init__(self):
+        self.esikler = {"above": [], "below": []}
+        self.alarmlar = {"above": [], "below": []}
+
+    def __len__(self):
+        return len(self.alarmlar["above"]) + len(self.alarmlar["below"])
+
+
+class AlertIndex:
+    """
+    Thread-safe alarm indeksi.
+
+    above: fiyat >= eşik olduğunda tetiklenir → eşiği fiyata eşit/küçük
+           olanlar sıralı listenin başındadır: [:bisect_right(fiyat)]
+    below: fiyat <= eşik olduğunda tetiklenir → eşiği fiyata eşit/büyük
+           olanlar sıralı listenin sonundadır: [bisect_left(fiyat):]
+
+    Tetiklenen alarmlar indeksten çıkarılır; aynı alarm iki kez tetiklenmez.
+    """
+
+    def __init__(self, alarmlar: Iterable[Dict] = ()):
+        self._semboller: Dict[str, _SembolAlarmlari] = {}
+        self._konum: Dict[int, tuple] = {}        # alarm id → (sembol, koşul, eşik)
+        self._lock = threading.Lock()
+        self.yukle(alarmlar)
+
+    def __len__(self):
+        return len(self._konum)
+
+    def __contains__(self, alarm_id) -> bool:
+        return alarm_id in self._konum
+
+    def yukle(self, alarmlar: Iterable[Dict]):
+        """Tetiklenmemiş alarmları toplu ekle"""
+        for alarm in alarmlar:
+            if not alarm.get("triggered"):
+                self.ekle(alarm)
+
+    def semboller(self) -> List[str]:
+        """Bekleyen alarmı olan semboller"""
+        with self._lock:
+            return list(self._semboller)
+
+    def ekle(self, alarm: Dict):
+        """
+        Alarmı indekse ekle.
+
+        Args:
+            alarm: id, symbol, condition ('above'/'below') ve target_price içeren kayıt
+        """
+        kosul = alarm["condition"]
+        if kosul not in KOSULLAR:
+            raise ValueError(f"Geçersiz alarm koşulu: {kosul}")
+        sembol = alarm["symbol"]
+        esik = float(alarm["target_price"])
+
+        with self._lock:
+            if alarm["id"] in self._konum:
+                return
+            grup = self._semboller.setdefault(sembol, _SembolAlarmlari())
+            esikler, alarmlar = grup.esikler[kosul], grup.alarmlar[kosul]
+            # Aynı eşikteki alarmlar eklenme sırasını korur
+            i = bisect_right(esikler, esik)
+            esikler.insert(i, esik)
+            alarmlar.insert(i, alarm)
+            self._konum[alarm["id"]] = (sembol, kosul, esik)
+
+    def sil(self, alarm_id) -> Optional[Dict]:
+        """Alarmı indeksten çıkar; bulunursa alarm kaydını döndür"""
+        with self._lock:
+            konum = self._konum.pop(alarm_id, None)
+            if konum is None:
+                return None
+            sembol, kosul, esik = konum
+            grup = self._semboller[sembol]
+            esikler, alarmlar = grup.esikler[kosul], grup.alarmlar[kosul]
+            # Aynı eşikteki alarmlar arasında id ile ara
+            i = bisect_left(esikler, esik)
+            while alarmlar[i]["id"] != alarm_id:
+                i += 1
+            del esikler[i]
+            alarm = alarmlar.pop(i)
+            if not len(grup):
+                del self._semboller[sembol]
+            return alarm
+
+    def tetiklenenler(self, sembol: str, fiyat: float) -> List[Dict]:
+        """
+        Yeni fiyatla tetiklenen alarmları indeksten çıkarıp döndür.
+        Alarm kayıtları değiştirilmez; işaretleme çağırana aittir.
+        """
+        with self._lock:
+            grup = self._semboller.get(sembol)
+            if grup is None:
+                return []
+
+            esikler, alarmlar = grup.esikler["above"], grup.alarmlar["above"]
+            i = bisect_right(esikler, fiyat)
+            tetiklenen = alarmlar[:i]
+            del esikler[:i], alarmlar[:i]
+
+            esikler, alarmlar = grup.esikler["below"], grup.alarmlar["below"]
+            i = bisect_left(esikler, fiyat)
+            tetiklenen += alarmlar[i:]
+            del esikler[i:], alarmlar[i:]
+
+            for alarm in tetiklenen:
+                del self._konum[alarm["id"]]
+            if not len(grup):
+                del self._semboller[sembol]
+            return tetiklenen
+
+
+# ============================================================
+# ARKA PLAN DEĞERLENDİRME & BİLDİRİM
+# ============================================================
+
+class AlertEvaluator:
+    """
+    Alarm değerlendirmesini 'interval' saniyede bir arka plan thread'inde
+    çalıştırır. Değerlendirme fonksiyonundaki hata thread'i durdurmaz.
+    """
+
+    def __init__(self, evaluate: Callable[[], int], interval: float):
+        self.evaluate = evaluate
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running or self.interval <= 0:
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="alert-evaluator", daemon=True)
+            self._thread.start()
+        logger.info(f"⏱️ Alarm değerlendirici başladı ({self.interval:g} sn)")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run(self):
+        """Durdurulana kadar değerlendir (ayrı worker sürecinde doğrudan çağrılabilir)"""
+        while True:
+            try:
+                self.evaluate()
+            except Exception as e:
+                logger.error(f"Alarm değerlendirme hatası: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+
+def post_webhook(url: str, alarmlar: List[Dict], timeout: float = 5.0) -> bool:
+    """Tetiklenen alarmları webhook adresine JSON olarak gönder"""
+    import requests
+
+    try:
+        response = requests.post(
+            url,
+            data=json.dumps({"event": "price_alert", "alerts": alarmlar}, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return True
+    except requests.RequestException as e:
+        logger.warning(f"⚠️ Alarm webhook'u gönderilemedi: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Benchmark: 10.000 alarm, 50 sembol - eski tam tarama ile indeksli değerlendirme
+    import random
+    import time
+
+    random.seed(7)
+    semboller = [f"S{i:02d}" for i in range(50)]
+    alarmlar = [
+        {"id": i, "symbol": random.choice(semboller), "condition": random.choice(KOSULLAR),
+         "target_price": round(random.uniform(50, 150), 2), "triggered": False}
+        for i in range(10_000)
+    ]
+    fiyatlar = [(random.choice(semboller), random.uniform(95, 105)) for _ in range(2_000)]
+
+    def tarama(liste, sembol, fiyat):
+        tetiklenen = []
+        for a in liste:
+            if a["triggered"] or a["symbol"] != sembol:
+                continue
+            if (a["condition"] == "above" and fiyat >= a["target_price"]) or \
+               (a["condition"] == "below" and fiyat <= a["target_price"]):
+                a["triggered"] = True
+                tetiklenen.append(a)
+        return tetiklenen
+
+    kopya = [dict(a) for a in alarmlar]
+    t = time.perf_counter()
+    beklenen = [sorted(a["id"] for a in tarama(kopya, s, f)) for s, f in fiyatlar]
+    tarama_sure = time.perf_counter() - t
+
+    t = time.perf_counter()
+    indeks = AlertIndex(alarmlar)
+    kurulum_sure = time.perf_counter() - t
+    t = time.perf_counter()
+    sonuc = [sorted(a["id"] for a in indeks.tetiklenenler(s, f)) for s, f in fiyatlar]
+    indeks_sure = time.perf_counter() - t
+
+    assert sonuc == beklenen, "İndeks sonuçları tam tarama ile aynı olmalı"
+    n = len(fiyatlar)
+    print(f"{len(alarmlar)} alarm, {len(semboller)} sembol, {n} fiyat güncellemesi "
+          f"({sum(map(len, sonuc))} tetiklenme)")
+    print(f"Tam tarama : {tarama_sure / n * 1e6:8.1f} µs/güncelleme")
+    print(f"İndeks     : {indeks_sure / n * 1e6:8.1f} µs/güncelleme (kurulum {kurulum_sure * 1000:.1f} ms)")
@@ -0,0 +1,363 @@
+"""
+Finans Asistanı - Portföy Analitiği
+İşlem geçmişi ve günlük fiyatlardan TWR, XIRR, volatilite, maksimum düşüş
+ve varlık bazlı katkı hesaplar. Tüm zaman serisi işlemleri NumPy ile vektöreldir.
+"""
+
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("Analytics")
+
+# Yıllıklandırma: takvim günleri üzerinden çalışıldığı için 365
+DAYS_PER_YEAR = 365
+VOLATILITY_WINDOW = 30
+
+# Kullanıcı başına son hesaplanan analiz: {user_id: (anahtar, sonuç)}
+# (en uzun süredir kullanılmayan kullanıcı önce çıkarılır)
+MAX_CACHED_USERS = 256
+_results_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_results_lock = Lock()
+
+_ESKI_MIKTAR = re.compile(r"Eski:\s*([-\d.]+)@")
+
+
+def _quantity_delta(islem: Dict) -> float:
+    """İşlemin pozisyon miktarına etkisi (+ alış, - satış/silme)"""
+    tip = islem["islem"]
+    if tip == "ALIS":
+        return islem["miktar"]
+    if tip in ("SATIS", "SIL"):
+        return -islem["miktar"]
+    if tip == "GUNCELLEME":
+        # GUNCELLEME yeni miktarı kaydeder; eski miktar detay alanındadır
+        m = _ESKI_MIKTAR.search(islem.get("detay") or "")
+        return islem["miktar"] - float(m.group(1)) if m else 0.0
+    return 0.0
+
+
+def build_series(islemler: List[Dict], fiyat_gecmisi: Dict[str, Tuple[list, list]],
+                 bugun: Optional[date] = None, baslangic: Optional[date] = None,
+                 baslangic_miktar: Optional[Dict[str, float]] = None) -> Dict:
+    """
+    İşlem geçmişini günlük takvim eksenine yerleştir.
+
+    Args:
+        islemler: islem_akisi() çıktısı (tarihe göre artan)
+        fiyat_gecmisi: {sembol: (tarihler, fiyatlar)}; eksik günler ileri doldurulur
+        bugun: Serinin son günü
+        baslangic: Serinin ilk günü (varsayılan: ilk işlem günü)
+        baslangic_miktar: baslangic gününden önceki pozisyonlar {sembol: miktar}
+            (artımlı yeniden oynatma için)
+
+    Returns:
+        gunler (D,), semboller (K,), fiyat (D×K), miktar (D×K),
+        akis (D×K, portföye giren nakit: alış +, satış -)
+    """
+    bugun = np.datetime64(bugun or date.today(), "D")
+    baslangic_miktar = baslangic_miktar or {}
+    semboller = sorted({i["sembol"] for i in islemler} | set(baslangic_miktar))
+    sembol_idx = {s: k for k, s in enumerate(semboller)}
+
+    islem_gun = np.array([i["tarih"][:10] for i in islemler], dtype="datetime64[D]")
+    baslangic = np.datetime64(baslangic, "D") if baslangic else islem_gun.min()
+    gunler = np.arange(baslangic, bugun + 1, dtype="datetime64[D]")
+    D, K = len(gunler), len(semboller)
+
+    t = (islem_gun - baslangic).astype(np.int64)
+    k = np.fromiter((sembol_idx[i["sembol"]] for i in islemler), dtype=np.int64, count=len(islemler))
+    delta = np.fromiter((_quantity_delta(i) for i in islemler), dtype=np.float64, count=len(islemler))
+    fiyat_islem = np.fromiter((i["fiyat"] for i in islemler), dtype=np.float64, count=len(islemler))
+
+    # Miktar matrisi: günlük değişimleri yerleştir, zaman ekseninde kümülatif topla
+    miktar = np.zeros((D, K))
+    for sembol, adet in baslangic_miktar.items():
+        miktar[0, sembol_idx[sembol]] += adet
+    np.add.at(miktar, (t, k), delta)
+    miktar = np.cumsum(miktar, axis=0)
+    miktar[np.abs(miktar) < 1e-9] = 0.0
+
+    # Fiyat matrisi: piyasa verisi + alış/satış fiyatları, son bilinen değerle ileri doldurma.
+    # GUNCELLEME ve SIL satırlarının fiyatı maliyet/ortalama maliyettir, piyasa gözlemi sayılmaz.
+    gozlem = np.fromiter((i["islem"] in ("ALIS", "SATIS") for i in islemler),
+                         dtype=bool, count=len(islemler))
+    fiyat = np.full((D, K), np.nan)
+    for sembol, kk in sembol_idx.items():
+        maske = (k == kk) & gozlem
+        tarihler = list(islem_gun[maske])
+        degerler = list(fiyat_islem[maske])
+        if sembol in fiyat_gecmisi:
+            g_tarih, g_fiyat = fiyat_gecmisi[sembol]
+            tarihler += list(np.array(g_tarih, dtype="datetime64[D]"))
+            degerler += list(g_fiyat)
+        gozlem_gun = np.array(tarihler, dtype="datetime64[D]")
+        gozlem_fiyat = np.array(degerler, dtype=np.float64)
+
+        # Aynı gün için piyasa fiyatı işlem fiyatının önüne geçsin (stable sort: sonra eklenen sonda)
+        sira = np.argsort(gozlem_gun, kind="stable")
+        gozlem_gun, gozlem_fiyat = gozlem_gun[sira], gozlem_fiyat[sira]
+
+        konum = np.searchsorted(gozlem_gun, gunler, side="right") - 1
+        gecerli = konum >= 0
+        fiyat[gecerli, kk] = gozlem_fiyat[konum[gecerli]]
+
+    # Nakit akışları (portföye giren +, çıkan -). Alış/satış işlem fiyatından;
+    # SIL ise pozisyonun o günkü piyasa değeriyle portföyden çekilmesi sayılır
+    akis_fiyat = fiyat_islem.copy()
+    sil = np.fromiter((i["islem"] == "SIL" for i in islemler), dtype=bool, count=len(islemler))
+    piyasa = fiyat[t[sil], k[sil]]
+    akis_fiyat[sil] = np.where(np.isnan(piyasa), fiyat_islem[sil], piyasa)
+    akis = np.zeros((D, K))
+    np.add.at(akis, (t, k), delta * akis_fiyat)
+
+    return {
+        "gunler": gunler,
+        "semboller": semboller,
+        "fiyat": fiyat,
+        "miktar": miktar,
+        "akis": akis,
+    }
+
+
+def time_weighted_returns(deger: np.ndarray, akis: np.ndarray) -> np.ndarray:
+    """
+    Günlük alt dönem getirileri.
+    Akışın gün başında gerçekleştiği varsayılır: r_t = V_t / (V_{t-1} + F_t) - 1
+    """
+    onceki = np.concatenate(([0.0], deger[:-1])) + akis
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(onceki > 1e-9, deger / onceki - 1, 0.0)
+    return r
+
+
+def xirr(tutarlar: np.ndarray, gun: np.ndarray, iterasyon: int = 100) -> Optional[float]:
+    """
+    Para ağırlıklı getiri (XIRR).
+    Yatırımcı perspektifi: yatırılan para -, çekilen ve son değer +.
+    Newton yöntemi, yakınsamazsa ikiye bölme ile çözülür.
+    """
+    if len(tutarlar) < 2 or not (np.any(tutarlar > 0) and np.any(tutarlar < 0)):
+        return None
+    yil = (gun - gun.min()) / DAYS_PER_YEAR
+
+    def npv(r):
+        return np.sum(tutarlar / np.power(1.0 + r, yil))
+
+    def dnpv(r):
+        return np.sum(-yil * tutarlar / np.power(1.0 + r, yil + 1))
+
+    r = 0.1
+    for _ in range(iterasyon):
+        f, df = npv(r), dnpv(r)
+        if df == 0 or not np.isfinite(f):
+            break
+        yeni = r - f / df
+        if yeni <= -0.9999:
+            yeni = (r - 0.9999) / 2
+        if abs(yeni - r) < 1e-10:
+            return float(yeni)
+        r = yeni
+
+    # İkiye bölme (Newton yakınsamadıysa)
+    alt, ust = -0.9999, 100.0
+    f_alt = npv(alt)
+    if np.sign(f_alt) == np.sign(npv(ust)):
+        return None
+    for _ in range(200):
+        orta = (alt + ust) / 2
+        f_orta = npv(orta)
+        if np.sign(f_orta) == np.sign(f_alt):
+            alt, f_alt = orta, f_orta
+        else:
+            ust = orta
+        if ust - alt < 1e-10:
+            break
+    return float((alt + ust) / 2)
+
+
+def rolling_volatility(r: np.ndarray, pencere: int = VOLATILITY_WINDOW) -> np.ndarray:
+    """Yıllıklandırılmış kayan volatilite (ilk pencere-1 gün NaN)"""
+    sonuc = np.full(len(r), np.nan)
+    if len(r) >= pencere:
+        pencereler = np.lib.stride_tricks.sliding_window_view(r, pencere)
+        sonuc[pencere - 1:] = pencereler.std(axis=1, ddof=1) * np.sqrt(DAYS_PER_YEAR)
+    return sonuc
+
+
+def max_drawdown(endeks: np.ndarray) -> Tuple[float, int, int]:
+    """En büyük tepe-dip düşüşü ve tepe/dip indeksleri"""
+    tepe = np.maximum.accumulate(endeks)
+    dusus = endeks / tepe - 1
+    dip = int(np.argmin(dusus))
+    tepe_idx = int(np.argmax(endeks[:dip + 1])) if dip > 0 else 0
+    return float(dusus[dip]), tepe_idx, dip
+
+
+def compute_analytics(islemler: List[Dict], fiyat_gecmisi: Dict[str, Tuple[list, list]],
+                      guncel_fiyatlar: Dict[str, float], bugun: Optional[date] = None,
+                      pencere: int = VOLATILITY_WINDOW) -> Dict:
+    """
+    Portföy performans metriklerini hesapla.
+
+    Args:
+        islemler: islem_akisi() çıktısı
+        fiyat_gecmisi: {sembol: (tarihler, fiyatlar)} günlük kapanışlar
+        guncel_fiyatlar: {sembol: anlık fiyat} — son gün bu fiyatla değerlenir
+        pencere: Kayan volatilite penceresi (gün)
+    """
+    if not islemler:
+        return {"bos": True}
+
+    seri = build_series(islemler, fiyat_gecmisi, bugun)
+    gunler, semboller = seri["gunler"], seri["semboller"]
+    fiyat, miktar, akis = seri["fiyat"], seri["miktar"], seri["akis"]
+
+    # Son günü anlık fiyatla güncelle
+    for kk, sembol in enumerate(semboller):
+        if sembol in guncel_fiyatlar:
+            fiyat[-1, kk] = guncel_fiyatlar[sembol]
+
+    fiyat_dolu = np.nan_to_num(fiyat)
+    varlik_deger = miktar * fiyat_dolu           # D×K
+    deger = varlik_deger.sum(axis=1)              # D
+    toplam_akis = akis.sum(axis=1)                # D
+
+    # Zaman ağırlıklı getiri
+    r = time_weighted_returns(deger, toplam_akis)
+    endeks = np.cumprod(1 + r)
+    twr = float(endeks[-1] - 1)
+    yil_sayisi = (len(gunler) - 1) / DAYS_PER_YEAR
+    twr_yillik = float((1 + twr) ** (1 / yil_sayisi) - 1) if yil_sayisi >= 1 and twr > -1 else None
+
+    # Para ağırlıklı getiri: yalnızca akış olan günler + son değer
+    akis_gunleri = np.nonzero(np.abs(toplam_akis) > 1e-9)[0]
+    xirr_tutar = np.append(-toplam_akis[akis_gunleri], deger[-1])
+    xirr_gun = np.append(akis_gunleri, len(gunler) - 1).astype(np.float64)
+    xirr_degeri = xirr(xirr_tutar, xirr_gun)
+
+    # Volatilite ve maksimum düşüş (akışlardan arındırılmış endeks üzerinden)
+    vol = rolling_volatility(r, pencere)
+    dd, tepe_idx, dip_idx = max_drawdown(endeks)
+
+    # Varlık katkısı: w_{k,t-1} × r_{k,t} toplamı (yüzde puan) ve TL kar/zarar
+    with np.errstate(divide="ignore", invalid="ignore"):
+        varlik_getiri = np.where(fiyat_dolu[:-1] > 0, fiyat_dolu[1:] / fiyat_dolu[:-1] - 1, 0.0)
+        onceki_deger = deger[:-1] + toplam_akis[1:]
+        agirlik = np.where(onceki_deger[:, None] > 1e-9,
+                           (varlik_deger[:-1] + akis[1:]) / onceki_deger[:, None], 0.0)
+    katki = (agirlik * varlik_getiri).sum(axis=0) * 100
+    kar_zarar = varlik_deger[-1] - akis.sum(axis=0)
+
+    vol_son = vol[~np.isnan(vol)]
+    return {
+        "bos": False,
+        "baslangic": str(gunler[0]),
+        "bitis": str(gunler[-1]),
+        "gun_sayisi": int(len(gunler)),
+        "guncel_deger": round(float(deger[-1]), 2),
+        "net_yatirim": round(float(toplam_akis.sum()), 2),
+        "twr": round(twr * 100, 2),
+        "twr_yillik": round(twr_yillik * 100, 2) if twr_yillik is not None else None,
+        "xirr": round(xirr_degeri * 100, 2) if xirr_degeri is not None else None,
+        "volatilite": round(float(vol_son[-1]) * 100, 2) if len(vol_son) else None,
+        "volatilite_pencere": pencere,
+        "max_dusus": round(dd * 100, 2),
+        "max_dusus_tepe": str(gunler[tepe_idx]),
+        "max_dusus_dip": str(gunler[dip_idx]),
+        "katki": [
+            {"sembol": s, "katki_yuzde_puan": round(float(c), 2), "kar_zarar": round(float(kz), 2)}
+            for s, c, kz in zip(semboller, katki, kar_zarar)
+        ],
+        "seri": {
+            "tarih": [str(g) for g in gunler.tolist()],
+            "deger": np.round(deger, 2).tolist(),
+            "endeks": np.round(endeks * 100, 2).tolist(),
+            "volatilite": [None if v != v else round(v * 100, 2) for v in vol.tolist()],
+        },
+    }
+
+
+def portfolio_analytics(pdb, prices_lookup: Callable[[List[str]], Dict[str, dict]],
+                        histories_lookup: Callable[[List[str], date], Dict[str, dict]],
+                        pencere: int = VOLATILITY_WINDOW) -> Dict:
+    """
+    /api/portfolio/analytics yanıtını oluştur.
+    Sonuç portföy versiyonu, gün ve anlık fiyatlar değişmedikçe önbellekten döner.
+
+    Args:
+        pdb: Kullanıcının PortfolioDB görünümü
+        prices_lookup: get_prices (semboller → {sembol: fiyat sonucu})
+        histories_lookup: get_price_histories (semboller, başlangıç günü)
+    """
+    islemler = pdb.islem_akisi()
+    if not islemler:
+        return compute_analytics([], {}, {})
+
+    semboller = sorted({i["sembol"] for i in islemler})
+    guncel = {
+        sembol: price_data["price"]
+        for sembol, price_data in prices_lookup(semboller).items()
+        if price_data.get("success")
+    }
+
+    anahtar = (pdb.etag(), date.today().isoformat(), pencere,
+               zlib.crc32(repr(sorted(guncel.items())).encode()))
+    with _results_lock:
+        cached = _results_cache.get(pdb.user_id)
+        if cached and cached[0] == anahtar:
+            _results_cache.move_to_end(pdb.user_id)
+            return cached[1]
+
+    baslangic = datetime.strptime(islemler[0]["tarih"][:10], "%Y-%m-%d").date()
+    gecmis = {}
+    for sembol, h in histories_lookup(semboller, baslangic).items():
+        if h.get("success"):
+            gecmis[sembol] = (h["dates"], h["prices"])
+        else:
+            logger.debug("Fiyat geçmişi alınamadı: %s (%s)", sembol, h.get('error'))
+
+    sonuc = compute_analytics(islemler, gecmis, guncel, pencere=pencere)
+    with _results_lock:
+        _results_cache[pdb.user_id] = (anahtar, sonuc)
+        _results_cache.move_to_end(pdb.user_id)
+        while len(_results_cache) > MAX_CACHED_USERS:
+            _results_cache.popitem(last=False)
+    return sonuc
+
+
+if __name__ == "__main__":
+    # Benchmark: 5 yıl, 20 sembol, 5.000 işlem
+    rng = np.random.default_rng(7)
+    N, K = 5_000, 20
+    semboller_ = [f"SYM{i:02d}" for i in range(K)]
+    baslangic_ = np.datetime64("2021-01-01")
+    gun_sayisi = 5 * 365
+    tarihler_ = np.sort(baslangic_ + rng.integers(0, gun_sayisi, N))
+    islemler_ = [
+        {"sembol": semboller_[s], "islem": "ALIS", "miktar": float(m), "fiyat": float(f),
+         "tarih": f"{g} 10:00:00", "detay": ""}
+        for s, m, f, g in zip(rng.integers(0, K, N), rng.uniform(1, 10, N),
+                              rng.uniform(50, 150, N), tarihler_.astype(str))
+    ]
+    eksen = np.arange(baslangic_, baslangic_ + gun_sayisi, dtype="datetime64[D]")
+    gecmis_ = {
+        s: (eksen.astype(str).tolist(), (100 * np.cumprod(1 + rng.normal(0.0003, 0.02, gun_sayisi))).tolist())
+        for s in semboller_
+    }
+
+    t0 = time.perf_counter()
+    sonuc_ = compute_analytics(islemler_, gecmis_, {}, bugun=date(2025, 12, 31))
+    t1 = time.perf_counter()
+
+    print(f"İşlem: {N:,} | Sembol: {K} | Gün: {sonuc_['gun_sayisi']}")
+    print(f"Hesaplama süresi: {(t1 - t0) * 1000:.1f} ms")
+    for anahtar_ in ("twr", "twr_yillik", "xirr", "volatilite", "max_dusus"):
+        print(f"  {anahtar_:12}: {sonuc_[anahtar_]}")
@@ -0,0 +1,238 @@
+"""
+Finans Asistanı - ASGI Sunucu Modu
+Aynı Flask uygulamasını (aynı route ve şablonlarla) ASGI sunucusunda çalıştırır:
+
+    uvicorn asgi:app --app-dir src --host 0.0.0.0 --port 8000
+
+Her istek olay döngüsünü bloklamadan sınırlı bir thread havuzunda çalışır;
+Yahoo/TEFAS/Groq'u bekleyen yavaş istekler diğer istekleri durdurmaz.
+Yanıt gövdesi parça parça aktarılır (akış yanıtları da desteklenir).
+
+Not: asgiref'in WsgiToAsgi sarmalayıcısı varsayılan olarak tüm istekleri tek
+bir thread'de sıraya koyduğu için burada kendi adaptörümüz kullanılır.
+"""
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from web_app import app as flask_app, alert_evaluator
+
+# Aynı anda işlenebilecek istek sayısı (I/O beklerken thread boşta kalır)
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 32))
+
+
+class WSGIOffload:
+    """
+    WSGI uygulamasını ASGI arayüzüne bağlar.
+    Uygulama ve yanıt gövdesinin her parçası executor'da üretilir.
+    """
+
+    def __init__(self, wsgi_app, max_workers: int = ASGI_THREADS):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.extend(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+        loop = asyncio.get_running_loop()
+        environ = self._environ(scope, bytes(body))
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+            ]
+            return lambda data: None
+
+        def run_app():
+            result = self.wsgi_app(environ, start_response)
+            return result, iter(result)
+
+        result, chunks = await loop.run_in_executor(self.executor, run_app)
+        try:
+            started = False
+            while True:
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+                if not started:
+                    await send({"type": "http.response.start", "status": response["status"],
+                                "headers": response["headers"]})
+                    started = True
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            close = getattr(result, "close", None)
+            if close:
+                await loop.run_in_executor(self.executor, close)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Alarm değerlendiricisi sunucu süreciyle birlikte çalışır
+                alert_evaluator.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                alert_evaluator.stop()
+                # Executor kapatılmaz: bitmek üzere olan yanıtların close()
+                # çağrıları hâlâ bu havuzda çalışır
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def _environ(scope, body: bytes) -> dict:
+        """ASGI scope → WSGI environ (PEP 3333)"""
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": unquote(scope["path"], errors="surrogateescape").encode("utf-8", "surrogateescape").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope.get("headers", []):
+            key = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if key == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif key == "CONTENT_LENGTH":
+                continue
+            else:
+                key = f"HTTP_{key}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+
+app = WSGIOffload(flask_app)
+
+
+if __name__ == "__main__":
+    # Benchmark: I/O ağırlıklı endpoint'te üç kurulum. Her satır bir önceki
+    # satırdan tek bir farkla ayrılır; kazancın nereden geldiği ayrı görünür:
+    #   WSGI-1  tek thread'li wsgiref, fiyatlar sırayla (önceki davranış)
+    #   WSGI-T  istek başına thread'li wsgiref, fiyatlar io_pool ile eşzamanlı
+    #           (fark: thread sayısı + eşzamanlı dış çağrılar, sunucu modu aynı)
+    #   ASGI    uvicorn + WSGIOffload, fiyatlar io_pool ile eşzamanlı
+    #           (WSGI-T'den tek fark: ASGI sunucu modu)
+    # Dış kaynak gecikmesi sahte fiyat fonksiyonuyla simüle edilir.
+    #   DATABASE_URL=sqlite:///:memory: python src/asgi.py
+    import threading
+    import time
+    import urllib.request
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import make_server, WSGIRequestHandler, WSGIServer
+
+    import uvicorn
+    import web_app
+
+    GECIKME = 0.2          # sembol başına dış kaynak gecikmesi (saniye)
+    SEMBOLLER = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    ISTEMCI, ISTEK = 8, 24
+
+    def sahte_fiyat(symbol):
+        time.sleep(GECIKME)
+        return {"success": True, "symbol": symbol, "price": 10.0}
+
+    for s in SEMBOLLER:
+        web_app.get_db().ekle(s, 1, 5.0)
+
+    def yuk_testi(port):
+        url = f"http://127.0.0.1:{port}/api/portfolio/performance"
+        gecikmeler = []
+
+        def istemci(n):
+            for _ in range(n):
+                t = time.perf_counter()
+                urllib.request.urlopen(url).read()
+                gecikmeler.append(time.perf_counter() - t)
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=istemci, args=(ISTEK // ISTEMCI,)) for _ in range(ISTEMCI)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        sure = time.perf_counter() - t0
+        gecikmeler.sort()
+        return len(gecikmeler) / sure, gecikmeler[len(gecikmeler) // 2], gecikmeler[-1]
+
+    class SessizHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    class ThreadliWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    def wsgi_olc(port, server_class):
+        sunucu = make_server("127.0.0.1", port, flask_app, server_class=server_class,
+                             handler_class=SessizHandler)
+        threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+        try:
+            return yuk_testi(port)
+        finally:
+            sunucu.shutdown()
+
+    eszamanli_get_prices = web_app.get_prices
+    web_app.get_price_for_symbol = sahte_fiyat
+    sonuclar = []
+
+    # 1) WSGI-1: tek thread, fiyatlar sırayla
+    web_app.get_prices = lambda symbols: {s: sahte_fiyat(s) for s in dict.fromkeys(symbols)}
+    sonuclar.append(("WSGI-1", "tek thread, sıralı fiyat", wsgi_olc(8765, WSGIServer)))
+
+    # 2) WSGI-T: thread'li WSGI, fiyatlar eşzamanlı
+    web_app.get_prices = eszamanli_get_prices
+    sonuclar.append(("WSGI-T", "thread'li, eşzamanlı fiyat", wsgi_olc(8767, ThreadliWSGIServer)))
+
+    # 3) ASGI: istekler thread havuzunda, fiyatlar eşzamanlı
+    asgi_sunucu = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=8766, log_level="warning"))
+    asgi_thread = threading.Thread(target=asgi_sunucu.run, daemon=True)
+    asgi_thread.start()
+    while not asgi_sunucu.started:
+        time.sleep(0.05)
+    sonuclar.append(("ASGI", f"{ASGI_THREADS} thread, eşzamanlı fiyat", yuk_testi(8766)))
+    asgi_sunucu.should_exit = True
+    asgi_thread.join()
+
+    print(f"Endpoint: /api/portfolio/performance | {len(SEMBOLLER)} sembol × {GECIKME * 1000:.0f} ms dış gecikme")
+    print(f"{ISTEMCI} eşzamanlı istemci, toplam {ISTEK} istek")
+    print(f"{'Mod':8} {'kurulum':28} {'istek/sn':>10} {'medyan ms':>10} {'max ms':>10}")
+    for ad, kurulum, (rps, medyan, en_cok) in sonuclar:
+        print(f"{ad:8} {kurulum:28} {rps:10.1f} {medyan * 1000:10.0f} {en_cok * 1000:10.0f}")
+    print("WSGI-1 → WSGI-T: thread sayısı ve eşzamanlı dış çağrıların etkisi; "
+          "WSGI-T → ASGI: sunucu modunun etkisi")
@@ -0,0 +1,117 @@
+"""
+Finans Asistanı - Chatbot Yanıt Önbelleği
+Aynı portföy ve benzer fiyatlarla tekrar sorulan sorular Groq'a gitmez.
+
+Anahtar dört parçadan oluşur:
+    - normalize edilmiş soru ("Portföyümü analiz et!" == "portfoyumu analiz et")
+    - sohbet geçmişinin özeti: "bunu daha detaylı açıklar mısın" gibi bir devam
+      sorusu başka bir konuşma için üretilmiş yanıtı almaz
+    - portföy versiyonu (PortfolioDB.etag): alım/satım sonrası eski yanıt kullanılmaz
+    - fiyat kovası: ilgili sembollerin fiyatları CHAT_CACHE_PRICE_STEP (%)
+      adımlarına yuvarlanır; fiyat bir kova değiştirdiğinde yanıt yeniden üretilir
+
+"neden?", "devam et" gibi kısa sorular önceki mesaja bağlı olduğu için
+önbelleğe alınmaz (CHAT_CACHE_MIN_CHARS).
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from utils.env import load_env
+
+load_env()
+CHAT_CACHE_TTL = float(os.environ.get("CHAT_CACHE_TTL", 600))
+CHAT_CACHE_SIZE = int(os.environ.get("CHAT_CACHE_SIZE", 500))
+CHAT_CACHE_PRICE_STEP = float(os.environ.get("CHAT_CACHE_PRICE_STEP", 1.0))
+CHAT_CACHE_MIN_CHARS = int(os.environ.get("CHAT_CACHE_MIN_CHARS", 12))
+
+_TR_ASCII = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_question(text: str) -> str:
+    """Büyük/küçük harf, Türkçe karakter, noktalama ve boşluk farklarını kaldır"""
+    text = text.replace("I", "ı").replace("İ", "i").lower().translate(_TR_ASCII)
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def price_bucket(price: Optional[float], step: float = CHAT_CACHE_PRICE_STEP) -> Optional[int]:
+    """Fiyatı logaritmik %step'lik kovaya yuvarla (fiyat yoksa None)"""
+    if not price or price <= 0:
+        return None
+    return round(math.log(price) / math.log1p(step / 100))
+
+
+def history_digest(history: List[Dict]) -> str:
+    """Sohbet geçmişinin kısa özeti (geçmiş yoksa boş; yeni oturumlar ortak anahtarı paylaşır)"""
+    if not history:
+        return ""
+    raw = repr([(m["role"], m["content"]) for m in history]).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL yanıt önbelleği (isabet oranı sayaçlarıyla)"""
+
+    def __init__(self, max_entries: int = CHAT_CACHE_SIZE, ttl: float = CHAT_CACHE_TTL,
+                 min_chars: int = CHAT_CACHE_MIN_CHARS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_chars = min_chars
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # anahtar → (yanıt, zaman)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, question: str, *parts) -> Optional[str]:
+        """Önbellek anahtarı; soru önbelleğe uygun değilse None"""
+        normalized = normalize_question(question)
+        if len(normalized) < self.min_chars:
+            return None
+        raw = repr((normalized, parts)).encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Optional[str], reply: str):
+        if key is None or not reply:
+            return
+        with self._lock:
+            self._entries[key] = (reply, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
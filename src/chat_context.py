@@ -0,0 +1,228 @@
+"""
+Finans Asistanı - Chatbot Context'i
+LLM'e giden mesaj listesini token bütçesi içinde kurar:
+
+    1. Sistem mesajı (sabit)
+    2. Portföy bloğu: pozisyonlar + fiyat önbelleğindeki güncel fiyatlar.
+       Kullanıcı başına önbelleklenir; portföy versiyonu (ETag) veya
+       fiyatlar değişmedikçe yeniden üretilmez. Bütçenin CHAT_CONTEXT_SHARE
+       payını aşarsa en küçük pozisyonlar tek satırda özetlenir. Araç
+       çağrısı açıkken (compact) yalnızca toplamlar ve semboller yazılır.
+    3. Sohbet geçmişi: en yeni mesajlardan geriye doğru bütçeye sığanlar
+       aynen eklenir; sığmayan eski mesajlardaki kullanıcı soruları kısa
+       bir özet satırına indirgenir (ek LLM çağrısı yapılmaz).
+    4. Yeni soru
+
+Token sayısı karakter sayısından tahmin edilir (Llama tokenizer'ı Türkçe
+metinde ~3.5 karakter/token); tam sayım için tokenizer yüklenmez.
+"""
+
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from utils.env import load_env
+
+load_env()
+CHAT_TOKEN_BUDGET = int(os.environ.get("CHAT_TOKEN_BUDGET", 3000))
+CHAT_CONTEXT_SHARE = float(os.environ.get("CHAT_CONTEXT_SHARE", 0.4))
+
+CHARS_PER_TOKEN = 3.5
+SUMMARY_QUESTION_CHARS = 80     # özetteki her sorunun en fazla uzunluğu
+MAX_CACHED_BLOCKS = 512         # önbellekte tutulan kullanıcı sayısı
+
+logger = logging.getLogger("ChatContext")
+
+
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısı"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _message_tokens(message: Dict) -> int:
+    # Rol ve mesaj ayracı için birkaç token eklenir
+    return estimate_tokens(message["content"]) + 4
+
+
+class ChatContextBuilder:
+    """Portföy bloğu önbelleği + token bütçeli mesaj listesi"""
+
+    def __init__(self, system_prompt: str, token_budget: int = CHAT_TOKEN_BUDGET,
+                 context_share: float = CHAT_CONTEXT_SHARE, compact: bool = False):
+        """
+        Args:
+            compact: portföy bloğunda yalnızca toplamlar ve semboller yer alır
+                (model pozisyon detaylarını ve fiyatları araçlarla ister)
+        """
+        self.system_prompt = system_prompt
+        self.compact = compact
+        self.token_budget = token_budget
+        self.context_budget = int(token_budget * context_share)
+        # user_id → (anahtar, blok); en uzun süredir kullanılmayan önce çıkar
+        self._blocks: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Portföy bloğu
+    # ------------------------------------------------------------
+
+    def portfolio_block(self, pdb, price_of: Callable[[str], Optional[float]]) -> str:
+        """
+        Kullanıcının portföy bloğu (önbellekten veya yeniden üretilerek).
+
+        Args:
+            pdb: kullanıcının PortfolioDB görünümü
+            price_of: sembolün önbellekteki fiyatı (yoksa None); dış çağrı yapmamalı
+        """
+        portfolio = pdb.getir()
+        if not portfolio:
+            return ""
+        prices = () if self.compact else tuple(price_of(p["sembol"]) for p in portfolio)
+        key = (pdb.etag("chat-context"), prices)
+
+        with self._lock:
+            entry = self._blocks.get(pdb.user_id)
+            if entry is not None and entry[0] == key:
+                self._blocks.move_to_end(pdb.user_id)
+                return entry[1]
+
+        block = self.render_portfolio(portfolio, prices)
+        with self._lock:
+            self._blocks[pdb.user_id] = (key, block)
+            self._blocks.move_to_end(pdb.user_id)
+            while len(self._blocks) > MAX_CACHED_BLOCKS:
+                self._blocks.popitem(last=False)
+        return block
+
+    def render_portfolio(self, portfolio: List[Dict], prices: tuple) -> str:
+        """Portföy bloğunu context bütçesine sığacak şekilde üret"""
+        toplam_maliyet = sum(p["toplam_maliyet"] for p in portfolio)
+        if self.compact:
+            return (f"\n\n📊 Kullanıcının Portföyü: {len(portfolio)} sembol, "
+                    f"toplam maliyet {round(toplam_maliyet, 2)} TL\n"
+                    f"Semboller: {', '.join(p['sembol'] for p in portfolio)}\n"
+                    "Pozisyon detayları, güncel fiyatlar ve işlem geçmişi için araçları kullan.\n")
+        toplam_deger = 0.0
+        satirlar = []
+        for p, fiyat in zip(portfolio, prices):
+            satir = f"- {p['sembol']}: {p['adet']} adet, ort. {p['alis_fiyati']} TL, maliyet {p['toplam_maliyet']} TL"
+            if fiyat is not None:
+                deger = p["adet"] * fiyat
+                kar = deger - p["toplam_maliyet"]
+                yuzde = kar / p["toplam_maliyet"] * 100 if p["toplam_maliyet"] else 0.0
+                toplam_deger += deger
+                satir += f", güncel {fiyat:g} TL → değer {deger:.2f} TL ({kar:+.2f} TL, %{yuzde:+.1f})"
+            satirlar.append((p["toplam_maliyet"], satir))
+
+        baslik = "\n\n📊 Kullanıcının Portföyü:\n"
+        baslik += f"Toplam Maliyet: {round(toplam_maliyet, 2)} TL\n"
+        if any(f is not None for f in prices):
+            baslik += f"Güncel Değer (fiyatı bilinenler): {toplam_deger:.2f} TL\n"
+        baslik += f"Sembol Sayısı: {len(portfolio)}\n"
+
+        # Büyük pozisyonlar önce; bütçe dolunca kalanlar tek satırda özetlenir
+        satirlar.sort(key=lambda s: s[0], reverse=True)
+        kalan = self.context_budget - estimate_tokens(baslik)
+        secilen = []
+        for i, (maliyet, satir) in enumerate(satirlar):
+            gereken = estimate_tokens(satir) + 1
+            if gereken > kalan:
+                diger = satirlar[i:]
+                secilen.append(f"- ... ve {len(diger)} sembol daha "
+                               f"(toplam maliyet {round(sum(m for m, _ in diger), 2)} TL)")
+                break
+            secilen.append(satir)
+            kalan -= gereken
+        return baslik + "\n".join(secilen) + "\n"
+
+    # ------------------------------------------------------------
+    # Mesaj listesi
+    # ------------------------------------------------------------
+
+    def build(self, portfolio_block: str, history: List[Dict], user_message: str) -> List[Dict]:
+        """Sistem + portföy + (bütçeye sığan) geçmiş + yeni soru"""
+        system = self.system_prompt + portfolio_block
+        question = {"role": "user", "content": user_message}
+        kalan = self.token_budget - estimate_tokens(system) - _message_tokens(question)
+
+        # En yeni mesajdan geriye: sığanlar aynen eklenir
+        secilen: List[Dict] = []
+        i = len(history)
+        while i > 0 and _message_tokens(history[i - 1]) <= kalan:
+            i -= 1
+            kalan -= _message_tokens(history[i])
+            secilen.append(history[i])
+        secilen.reverse()
+        # Yanıtı kırpılmış bir soru ile başlamasın
+        if secilen and secilen[0]["role"] == "assistant" and i > 0:
+            kalan += _message_tokens(secilen.pop(0))
+            i += 1
+
+        ozet = self.summarize(history[:i], kalan)
+        if ozet:
+            system += ozet
+
+        messages = [{"role": "system", "content": system}, *secilen, question]
+        logger.debug("Chat prompt ~%s token (%s/%s geçmiş mesaj)",
+                     sum(_message_tokens(m) for m in messages), len(secilen), len(history))
+        return messages
+
+    @staticmethod
+    def summarize(older: List[Dict], budget: int) -> str:
+        """Bütçeye sığmayan eski mesajlardan kullanıcı sorularının kısa özeti"""
+        sorular = [m["content"].strip().replace("\n", " ") for m in older if m["role"] == "user"]
+        if not sorular or budget <= 0:
+            return ""
+        ozet = "\n\n🗂️ Önceki konuşmada kullanıcının sorduğu konular: "
+        parcalar = []
+        kalan = budget - estimate_tokens(ozet)
+        # En yeni sorular öncelikli
+        for soru in reversed(sorular):
+            if len(soru) > SUMMARY_QUESTION_CHARS:
+                soru = soru[:SUMMARY_QUESTION_CHARS].rstrip() + "…"
+            maliyet = estimate_tokens(soru) + 1
+            if maliyet > kalan:
+                break
+            parcalar.append(soru)
+            kalan -= maliyet
+        if not parcalar:
+            return ""
+        return ozet + "; ".join(reversed(parcalar))
+
+
+if __name__ == "__main__":
+    # Prompt boyutu: 150 sembollük portföy + 20 mesajlık geçmiş
+    import time
+    from types import SimpleNamespace
+
+    portfoy = [{"sembol": f"S{i:03d}", "adet": 10 + i, "alis_fiyati": 12.5 + i,
+                "toplam_maliyet": round((10 + i) * (12.5 + i), 2)} for i in range(150)]
+    pdb = SimpleNamespace(user_id="u", getir=lambda: [dict(p) for p in portfoy], etag=lambda *p: "v1")
+    gecmis = []
+    for i in range(10):
+        gecmis.append({"role": "user", "content": f"Soru {i}: portföyümdeki riskleri değerlendirir misin?"})
+        gecmis.append({"role": "assistant", "content": "Detaylı bir değerlendirme. " * 60})
+
+    builder = ChatContextBuilder("Sen bir finans asistanısın.")
+    fiyat = lambda s: 20.0
+
+    eski = builder.system_prompt + "".join(
+        f"- {p['sembol']}: {p['adet']} adet, ort. {p['alis_fiyati']} TL, toplam {p['toplam_maliyet']} TL\n"
+        for p in portfoy) + "".join(m["content"] for m in gecmis[-10:])
+
+    t = time.perf_counter()
+    builder.portfolio_block(pdb, fiyat)
+    ilk = time.perf_counter() - t
+    t = time.perf_counter()
+    for _ in range(1000):
+        mesajlar = builder.build(builder.portfolio_block(pdb, fiyat), gecmis, "Dolar ne olur?")
+    tekrar = (time.perf_counter() - t) / 1000
+
+    yeni = sum(_message_tokens(m) for m in mesajlar)
+    print(f"Eski prompt : ~{estimate_tokens(eski)} token (bütçesiz)")
+    print(f"Yeni prompt : ~{yeni} token (bütçe {builder.token_budget}), "
+          f"{len(mesajlar) - 2} geçmiş mesaj{' + özet' if '🗂️' in mesajlar[0]['content'] else ''}")
+    print(f"Blok üretimi {ilk * 1e6:.0f} µs, önbellekten kurulum {tekrar * 1e6:.0f} µs")
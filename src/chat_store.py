@@ -0,0 +1,208 @@
+"""
+Finans Asistanı - Chatbot Oturum Deposu
+Sohbet geçmişi (kullanıcı + session_id) iki arka uçtan birinde tutulur:
+
+    memory    → süreç içi LRU: oturum sayısı ve toplam metin boyutu sınırlı,
+                CHAT_SESSION_TTL boyunca kullanılmayan oturumlar silinir
+    database  → PortfolioDB.sohbet_* (PostgreSQL/SQLite): tüm worker ve
+                instance'lar aynı geçmişi görür, süreç belleğinde tutulmaz
+
+CHAT_STORE ile seçilir (varsayılan: database). Veritabanı yapılandırılmamışsa
+veya o an ulaşılamıyorsa database deposu geçmişi uyarıyla bellekte tutar.
+Her iki arka uçta da oturum başına en fazla CHAT_HISTORY_LIMIT mesaj saklanır.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+from utils.env import load_env
+
+load_env()
+CHAT_STORE = os.environ.get("CHAT_STORE", "database").lower()
+CHAT_HISTORY_LIMIT = int(os.environ.get("CHAT_HISTORY_LIMIT", 20))
+CHAT_SESSION_TTL = float(os.environ.get("CHAT_SESSION_TTL", 6 * 3600))
+CHAT_MAX_SESSIONS = int(os.environ.get("CHAT_MAX_SESSIONS", 1000))
+CHAT_MAX_BYTES = int(os.environ.get("CHAT_MAX_BYTES", 8 * 1024 * 1024))
+
+# Süresi dolan veritabanı kayıtları en fazla bu aralıkla temizlenir (sn)
+CLEANUP_INTERVAL = 600
+
+logger = logging.getLogger("ChatStore")
+
+
+def _boyut(mesajlar: List[Dict]) -> int:
+    """Mesajların yaklaşık bellek payı (UTF-8 metin boyutu)"""
+    return sum(len(m["content"].encode("utf-8")) + len(m["role"]) for m in mesajlar)
+
+
+class MemorySessionStore:
+    """
+    Süreç içi, sınırlı oturum deposu.
+    En uzun süredir kullanılmayan oturum önce çıkarılır (OrderedDict LRU);
+    boşta kalma süresi TTL'yi aşan oturumlar okunurken ve eklemede silinir.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS, max_bytes: int = CHAT_MAX_BYTES,
+                 ttl: float = CHAT_SESSION_TTL, history_limit: int = CHAT_HISTORY_LIMIT):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.history_limit = history_limit
+        # (user_id, session_id) → (mesajlar, boyut, son erişim)
+        self._sessions: "OrderedDict[Tuple[str, str], Tuple[List[Dict], int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, user_id: str, session_id: str) -> List[Dict]:
+        key = (user_id, session_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return []
+            mesajlar, boyut, son = entry
+            if now - son > self.ttl:
+                self._remove(key)
+                return []
+            self._sessions[key] = (mesajlar, boyut, now)
+            self._sessions.move_to_end(key)
+            return list(mesajlar)
+
+    def append(self, user_id: str, session_id: str, mesajlar: List[Dict]):
+        key = (user_id, session_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(key)
+            onceki = entry[0] if entry is not None and now - entry[2] <= self.ttl else []
+            if entry is not None:
+                self._remove(key)
+            yeni = (onceki + list(mesajlar))[-self.history_limit:]
+            boyut = _boyut(yeni)
+            self._sessions[key] = (yeni, boyut, now)
+            self._bytes += boyut
+            self._evict(now)
+
+    def clear(self, user_id: str, session_id: str):
+        with self._lock:
+            self._remove((user_id, session_id))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"sessions": len(self._sessions), "bytes": self._bytes}
+
+    def _remove(self, key):
+        entry = self._sessions.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self, now: float):
+        """Süresi dolanları, sonra sınırlar aşılıyorsa en eski oturumları çıkar"""
+        while self._sessions:
+            key, (_, _, son) = next(iter(self._sessions.items()))
+            if now - son > self.ttl or len(self._sessions) > self.max_sessions or \
+                    (self._bytes > self.max_bytes and len(self._sessions) > 1):
+                self._remove(key)
+            else:
+                break
+
+
+class DatabaseSessionStore:
+    """
+    Veritabanı destekli oturum deposu (paylaşımlı).
+    Geçmiş her mesajda tek indeksli sorguyla okunur; süreçte önbellek
+    tutulmadığı için başka worker'ların eklediği mesajlar hemen görünür.
+    db_getter None döndürdüğü sürece (veritabanı yok) geçmiş süreç içi
+    MemorySessionStore'da tutulur; geçmiş kaybolmaz, sadece paylaşılmaz.
+    """
+
+    backend = "database"
+
+    def __init__(self, db_getter: Callable, ttl: float = CHAT_SESSION_TTL,
+                 history_limit: int = CHAT_HISTORY_LIMIT):
+        self.db_getter = db_getter
+        self.ttl = ttl
+        self.history_limit = history_limit
+        self._last_cleanup = time.time()
+        self._cleanup_lock = threading.Lock()
+        self._fallback = MemorySessionStore(ttl=ttl, history_limit=history_limit)
+        self._fallback_warned = False
+
+    def _db(self, user_id: str):
+        """Kullanıcının veritabanı görünümü; veritabanı yoksa None"""
+        db = self.db_getter()
+        if db is None:
+            if not self._fallback_warned:
+                self._fallback_warned = True
+                logger.warning("⚠️ Veritabanı yok: sohbet geçmişi bu süreçte bellekte tutulacak")
+            return None
+        self._fallback_warned = False
+        return db.for_user(user_id)
+
+    def get(self, user_id: str, session_id: str) -> List[Dict]:
+        db = self._db(user_id)
+        if db is None:
+            return self._fallback.get(user_id, session_id)
+        return db.sohbet_gecmisi(session_id, self.history_limit, time.time() - self.ttl)
+
+    def append(self, user_id: str, session_id: str, mesajlar: List[Dict]):
+        db = self._db(user_id)
+        if db is None:
+            self._fallback.append(user_id, session_id, mesajlar)
+            return
+        db.sohbet_ekle(session_id, mesajlar, self.history_limit)
+        self._cleanup()
+
+    def clear(self, user_id: str, session_id: str):
+        self._fallback.clear(user_id, session_id)
+        db = self._db(user_id)
+        if db is not None:
+            db.sohbet_temizle(session_id)
+
+    def stats(self) -> Dict:
+        # Bellek yedeğinde oturum varsa onun boyutu raporlanır
+        return self._fallback.stats() if len(self._fallback) else {}
+
+    def _cleanup(self):
+        """Süresi dolan mesajları en fazla CLEANUP_INTERVAL'de bir sil"""
+        now = time.time()
+        if now - self._last_cleanup < CLEANUP_INTERVAL or not self._cleanup_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_cleanup = now
+            silinen = self.db_getter().eski_sohbetleri_sil(now - self.ttl)
+            if silinen:
+                logger.debug("%s eski sohbet mesajı silindi", silinen)
+        except Exception as e:
+            logger.warning(f"⚠️ Eski sohbetler silinemedi: {e}")
+        finally:
+            self._cleanup_lock.release()
+
+
+def create_session_store(db_getter: Callable, backend: str = CHAT_STORE):
+    """CHAT_STORE ayarına göre oturum deposu oluştur"""
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "database":
+        return DatabaseSessionStore(db_getter)
+    raise ValueError(f"Bilinmeyen CHAT_STORE: {backend} (memory | database)")
+
+
+if __name__ == "__main__":
+    # Bellek sınırı: 50.000 farklı session_id ile gelen istekler
+    store = MemorySessionStore(max_sessions=1000, max_bytes=2 * 1024 * 1024)
+    cevap = "Portföyünüz dengeli görünüyor. " * 20
+    t = time.perf_counter()
+    for i in range(50_000):
+        store.append("u", f"s{i}", [{"role": "user", "content": "portföyümü analiz et"},
+                                   {"role": "assistant", "content": cevap}])
+    sure = time.perf_counter() - t
+    print(f"50.000 oturum → depoda {store.stats()} ({sure / 50_000 * 1e6:.1f} µs/ekleme)")
@@ -0,0 +1,146 @@
+"""
+Finans Asistanı - Chatbot Araçları (tool calling)
+Model güncel veriye ihtiyaç duyduğunda fonksiyon çağırır; fiyatlar ve
+portföy detayları her prompt'a gömülmez.
+
+    get_price          → sembolün güncel fiyatı
+    get_portfolio      → pozisyonlar, güncel fiyat ve kar/zarar
+    get_transactions   → son alım/satım işlemleri
+    get_price_history  → son N günün fiyat özeti
+
+Aynı turda istenen araçlar thread havuzunda eşzamanlı çalışır; fiyat
+kaynakları önbellekli olduğu için tekrar eden çağrılar dışarı çıkmaz.
+Araç işleyicileri web_app'te isteğin kullanıcısına bağlanarak oluşturulur.
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import Executor
+from typing import Callable, Dict, List
+
+from utils.env import load_env
+from utils.timing import propagate, span
+
+load_env()
+CHAT_TOOLS = os.environ.get("CHAT_TOOLS", "1") == "1"
+CHAT_TOOL_ROUNDS = int(os.environ.get("CHAT_TOOL_ROUNDS", 3))
+
+MAX_CALLS_PER_ROUND = 8
+MAX_RESULT_CHARS = 4000
+
+logger = logging.getLogger("ChatTools")
+
+TOOL_SCHEMAS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_price",
+            "description": "Bir hisse (BIST kodu, ör. THYAO), TEFAS fonu (3 harf), döviz (USD, EUR, GBP) "
+                           "veya altının (ALTIN, gram TL) güncel fiyatını döndürür.",
+            "parameters": {
+                "type": "object",
+                "properties": {"symbol": {"type": "string", "description": "Sembol, ör. THYAO, USD, ALTIN"}},
+                "required": ["symbol"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_portfolio",
+            "description": "Kullanıcının pozisyonlarını güncel fiyat, değer ve kar/zarar ile döndürür.",
+            "parameters": {"type": "object", "properties": {}},
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_transactions",
+            "description": "Kullanıcının son alım/satım işlemleri (en yeni önce).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "symbol": {"type": "string", "description": "Sadece bu sembolün işlemleri (opsiyonel)"},
+                    "limit": {"type": "integer", "description": "En fazla kayıt sayısı (varsayılan 10, en fazla 50)"},
+                },
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_price_history",
+            "description": "Sembolün son N gündeki fiyat özeti: ilk/son/en düşük/en yüksek fiyat, "
+                           "değişim yüzdesi ve seyrek örneklenmiş kapanışlar.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "symbol": {"type": "string"},
+                    "days": {"type": "integer", "description": "Gün sayısı (varsayılan 30, en fazla 365)"},
+                },
+                "required": ["symbol"],
+            },
+        },
+    },
+]
+
+
+def summarize_history(history: Dict, points: int = 12) -> Dict:
+    """Fiyat geçmişini modele gönderilecek kısa özete indir"""
+    if not history.get("success"):
+        return history
+    dates, prices = history["dates"], history["prices"]
+    step = max(1, len(prices) // points)
+    return {
+        "symbol": history["symbol"],
+        "from": dates[0], "to": dates[-1],
+        "first": round(prices[0], 4), "last": round(prices[-1], 4),
+        "min": round(min(prices), 4), "max": round(max(prices), 4),
+        "change_pct": round((prices[-1] / prices[0] - 1) * 100, 2) if prices[0] else None,
+        "closes": {d: round(p, 4) for d, p in list(zip(dates, prices))[::step]},
+    }
+
+
+class ToolRunner:
+    """Modelin istediği araç çağrılarını eşzamanlı çalıştırıp tool mesajlarına çevirir"""
+
+    def __init__(self, handlers: Dict[str, Callable], executor: Executor):
+        self.handlers = handlers
+        self.executor = executor
+
+    def _call(self, name: str, arguments: str):
+        handler = self.handlers.get(name)
+        if handler is None:
+            return {"error": f"Bilinmeyen araç: {name}"}
+        try:
+            kwargs = json.loads(arguments or "{}") or {}
+            with span(f"tool.{name}"):
+                return handler(**kwargs)
+        except Exception as e:
+            logger.warning(f"⚠️ Araç hatası ({name}): {e}")
+            return {"error": str(e)}
+
+    def run(self, tool_calls: List[Dict]) -> List[Dict]:
+        """
+        Args:
+            tool_calls: [{"id", "name", "arguments" (JSON metni)}, ...]
+
+        Returns:
+            Çağrı sırasıyla {"role": "tool", "tool_call_id", "content"} mesajları
+        """
+        calls = tool_calls[:MAX_CALLS_PER_ROUND]
+        call = propagate(self._call)
+        futures = [self.executor.submit(call, c["name"], c["arguments"]) for c in calls]
+        messages = []
+        for c, future in zip(calls, futures):
+            content = json.dumps(future.result(), ensure_ascii=False, default=str)
+            if len(content) > MAX_RESULT_CHARS:
+                content = content[:MAX_RESULT_CHARS] + "…"
+            messages.append({"role": "tool", "tool_call_id": c["id"], "content": content})
+        # Sınırı aşan çağrılar da yanıtlanmalı; aksi halde API mesaj dizisini reddeder
+        for c in tool_calls[MAX_CALLS_PER_ROUND:]:
+            messages.append({"role": "tool", "tool_call_id": c["id"],
+                             "content": json.dumps({"error": "Çağrı sınırı aşıldı"})})
+        logger.debug("%s araç çağrısı: %s", len(tool_calls), ", ".join(c["name"] for c in tool_calls))
+        return messages
@@ -1,26 +1,100 @@
 """
 Finans Asistanı - Gelişmiş Portföy Veritabanı
-PostgreSQL (Supabase) ile yatırım takibi
+PostgreSQL (Supabase) veya gömülü SQLite ile yatırım takibi
+
+Backend, DATABASE_URL şemasına göre seçilir:
+    postgresql://...      → PortfolioDB (psycopg2, Supabase)
+    sqlite:///portfoy.db  → SQLitePortfolioDB (yerel dosya, WAL modu)
+    sqlite:///:memory:    → SQLitePortfolioDB (bellek içi, test/benchmark)
 """
 
+import copy
 import os
-import psycopg2
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 import logging
 from datetime import datetime
+from functools import wraps
 from typing import List, Dict, Optional
-from dotenv import load_dotenv
 
-load_dotenv()
+from utils.db_pool import ConnectionPool
+from utils.env import load_env
+from utils.timing import span, timed
+
+load_env()
 
 logger = logging.getLogger("PortfolioDB")
 
+# Okuma önbelleğinin en uzun ömrü (saniye). Aynı veritabanını kullanan başka
+# bir instance'ın yaptığı değişiklikler en geç bu süre sonunda fark edilir.
+CACHE_TTL = float(os.environ.get("PORTFOLIO_CACHE_TTL", 30))
+
+# Kullanıcı belirtilmeyen isteklerin (ve eski tek kullanıcılı verinin) sahibi
+DEFAULT_USER_ID = os.environ.get("DEFAULT_USER_ID", "default")
+
+# Bellekte tutulan kullanıcı görünümü sayısı; en uzun süredir kullanılmayan
+# görünüm (ve okuma önbelleği) önce çıkarılır
+MAX_TENANTS = int(os.environ.get("MAX_TENANTS", 1000))
+
+
+def _cached_read(error_message: str):
+    """
+    Decorator: Okuma metodunu portföy versiyonuna bağlı önbellekle sar.
+
+    Yazma işlemleri (ekle, sat, guncelle, sil) versiyonu artırdığında
+    önbellek geçersiz olur. Hata durumunda boş liste döner ve
+    sonuç önbelleğe alınmaz.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+
+            with span("db.cache"), self._cache_lock:
+                version = self.version
+                entry = self._read_cache.get(key)
+                if entry and entry[0] == version and time.monotonic() - entry[1] < CACHE_TTL:
+                    return [dict(r) for r in entry[2]]
+
+            try:
+                with span(f"db.{method.__name__}"):
+                    data = method(self, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"{error_message}: {e}")
+                return []
+
+            with self._cache_lock:
+                # TTL dolmuş kayıt farklı veri döndürdüyse değişiklik başka
+                # bir instance'tan gelmiştir → versiyonu burada da artır
+                if entry and entry[0] == version == self.version and entry[2] != data:
+                    self._bump_version()
+                    version = self.version
+                if version == self.version:
+                    self._read_cache[key] = (version, time.monotonic(), data)
+
+            return [dict(r) for r in data]
+        return wrapper
+    return decorator
+
 class PortfolioDB:
     """
     PostgreSQL (Supabase) tabanlı portföy yönetim sistemi.
     Serverless ortama uygun olarak connection pooling kullanır.
+
+    Diğer backend'ler (SQLitePortfolioDB) bu sınıfın arayüzünü ve
+    SQL sorgularını paylaşır; sadece bağlantı yönetimini değiştirir.
+
+    Her tablo user_id kolonu taşır. Bir nesne tek bir kullanıcının
+    portföyüne bakar; diğer kullanıcılar için for_user() aynı bağlantı
+    havuzunu paylaşan, kendi önbelleğine sahip bir görünüm döndürür.
     """
+
+    # Backend'e özgü DDL parçası
+    ID_COLUMN = "SERIAL PRIMARY KEY"
     
     def __init__(self, db_url: str = None):
         """
@@ -28,6 +102,8 @@ class PortfolioDB:
             db_url: PostgreSQL veritabanı bağlantı adresi (URL)
         """
         self.db_url = db_url or os.environ.get("DATABASE_URL")
+        self._init_tenant()
+        self._init_cache()
         
         if not self.db_url:
             logger.error("❌ DATABASE_URL ortam değişkeni bulunamadı. Lütfen .env dosyasını kontrol edin.")
@@ -39,34 +115,145 @@ class PortfolioDB:
             self.db_url += f"{separator}sslmode=require"
             
         try:
-            # SimpleConnectionPool: Serverless ortamlar (Vercel) için daha uygun
-            # ThreadedConnectionPool çoklu thread gerektirir, serverless'ta sıkıntı çıkarır
-            self.connection_pool = pool.SimpleConnectionPool(1, 5, dsn=self.db_url)
+            # Thread-safe havuz: dolu olduğunda DB_POOL_TIMEOUT saniye bekler,
+            # checkout'ta düşmüş bağlantıları yeniler. İadede açık transaction
+            # geri alındığı için Supabase PgBouncer (transaction modu, 6543) ile uyumludur.
+            # psycopg2 sadece PostgreSQL backend'i kullanıldığında yüklenir
+            import psycopg2
+            self.connection_pool = ConnectionPool(
+                lambda: psycopg2.connect(dsn=self.db_url),
+                minconn=1,
+                maxconn=int(os.environ.get("DB_POOL_MAX", 5)),
+                timeout=float(os.environ.get("DB_POOL_TIMEOUT", 10))
+            )
             logger.info("📂 Supabase (PostgreSQL) bağlantı havuzu başarıyla kuruldu.")
             self._create_tables()
         except Exception as e:
             logger.error(f"❌ Veritabanına bağlanılamadı: {e}")
             raise
 
+    def _init_tenant(self):
+        """Varsayılan kullanıcıyı ve kullanıcı görünümleri sözlüğünü hazırla"""
+        self.user_id = DEFAULT_USER_ID
+        self._root = self
+        self._tenants: "OrderedDict[str, PortfolioDB]" = OrderedDict()
+        self._tenants_lock = threading.Lock()
+        # shared_connection() bloğundaki thread'in sabitlenmiş bağlantısı
+        # (kullanıcı görünümleri arasında paylaşılır)
+        self._pinned = threading.local()
+
+    def for_user(self, user_id: Optional[str]) -> "PortfolioDB":
+        """
+        Belirtilen kullanıcının portföy görünümünü döndür.
+
+        Görünümler bağlantı havuzunu paylaşır, okuma önbellekleri ve
+        versiyon sayaçları ise kullanıcıya özeldir; bir kullanıcının
+        yazması diğerlerinin önbelleğini boşaltmaz.
+        """
+        root = self._root
+        user_id = (user_id or DEFAULT_USER_ID).strip()
+        if user_id == root.user_id:
+            return root
+
+        with root._tenants_lock:
+            tenant = root._tenants.get(user_id)
+            if tenant is None:
+                tenant = copy.copy(root)
+                tenant.user_id = user_id
+                tenant._init_cache()
+                root._tenants[user_id] = tenant
+                while len(root._tenants) > MAX_TENANTS:
+                    root._tenants.popitem(last=False)
+            else:
+                root._tenants.move_to_end(user_id)
+        return tenant
+
+    def _init_cache(self):
+        """Okuma önbelleği ve portföy versiyon sayacını hazırla"""
+        self._read_cache = {}
+        self._cache_lock = threading.Lock()
+        self._instance_id = uuid.uuid4().hex[:8]
+        self.version = 0
+
+    def _bump_version(self):
+        """Versiyonu artır ve önbelleği boşalt (_cache_lock tutulurken çağrılır)"""
+        self.version += 1
+        self._read_cache.clear()
+
+    def invalidate_cache(self):
+        """Yazma işleminden sonra okuma önbelleğini geçersiz kıl"""
+        with self._cache_lock:
+            self._bump_version()
+
+    def etag(self, *parts) -> str:
+        """
+        Portföy versiyonuna dayalı ETag değeri.
+        Instance kimliği eklenir; farklı instance'ların sayaçları çakışmaz.
+        """
+        return "-".join([self._instance_id, str(self.version), *[str(p) for p in parts]])
+
     def get_connection(self):
-        """Havuzdan bir bağlantı alır"""
-        return self.connection_pool.getconn()
+        """Havuzdan bir bağlantı alır (shared_connection bloğunda sabitlenmiş bağlantıyı)"""
+        pinned = getattr(self._pinned, "conn", None)
+        if pinned is not None:
+            return pinned
+        with span("db.checkout"):
+            conn = self.connection_pool.getconn()
+        if getattr(self._pinned, "active", False):
+            self._pinned.conn = conn
+        return conn
 
     def release_connection(self, conn):
         """Bağlantıyı havuza geri verir"""
+        if conn is getattr(self._pinned, "conn", None):
+            return
         if self.connection_pool:
             self.connection_pool.putconn(conn)
 
+    @contextmanager
+    def shared_connection(self):
+        """
+        with bloğu boyunca bu thread'deki tüm sorgular tek bağlantıyı kullanır.
+        Birden fazla okuma yapan istekler (ör. dashboard) havuzdan en fazla bir
+        kez bağlantı alır. Bağlantı ilk gerçek sorguda alınır; tüm okumalar
+        önbellekten gelirse hiç alınmaz. İç içe kullanımda dıştaki blok geçerlidir.
+        """
+        if getattr(self._pinned, "active", False):
+            yield
+            return
+
+        self._pinned.active = True
+        try:
+            yield
+        finally:
+            conn = getattr(self._pinned, "conn", None)
+            self._pinned.active = False
+            self._pinned.conn = None
+            if conn is not None:
+                self.release_connection(conn)
+
+    def pool_stats(self) -> Dict:
+        """Bağlantı havuzu metrikleri (bekleme süresi, kullanımdaki bağlantı, hatalar)"""
+        stats = self.connection_pool.stats() if self.connection_pool else {}
+        return {"backend": "postgresql", **stats}
+
     def _create_tables(self):
         """Tabloları oluştur"""
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             
-            # Ana yatırımlar tablosu (SQLite'daki AUTOINCREMENT yerine SERIAL kullanılır)
-            cursor.execute("""
+            # Aylık özet tablosu türetilmiş veridir: user_id öncesi şemadaysa
+            # silinip aşağıda kullanıcı bazlı anahtarla yeniden doldurulur
+            if self._table_exists(cursor, "kar_zarar_aylik") and \
+                    not self._column_exists(cursor, "kar_zarar_aylik", "user_id"):
+                cursor.execute("DROP TABLE kar_zarar_aylik")
+            
+            # Ana yatırımlar tablosu (id kolonu backend'e göre SERIAL / AUTOINCREMENT)
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS yatirimlar (
-                    id SERIAL PRIMARY KEY,
+                    id {self.ID_COLUMN},
+                    user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER_ID}',
                     sembol TEXT NOT NULL,
                     miktar REAL NOT NULL,
                     maliyet REAL NOT NULL,
@@ -76,9 +263,10 @@ class PortfolioDB:
             """)
             
             # İşlem geçmişi tablosu
-            cursor.execute("""
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS islem_gecmisi (
-                    id SERIAL PRIMARY KEY,
+                    id {self.ID_COLUMN},
+                    user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER_ID}',
                     sembol TEXT NOT NULL,
                     islem_tipi TEXT NOT NULL,
                     miktar REAL NOT NULL,
@@ -89,6 +277,115 @@ class PortfolioDB:
                 )
             """)
             
+            # Satışta tüketilen her alış lotu (FIFO) — değer artış kazancı beyanı için
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS satis_lotlari (
+                    id {self.ID_COLUMN},
+                    user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER_ID}',
+                    sembol TEXT NOT NULL,
+                    miktar REAL NOT NULL,
+                    alis_fiyati REAL NOT NULL,
+                    alis_tarihi TEXT,
+                    satis_fiyati REAL NOT NULL,
+                    satis_tarihi TEXT NOT NULL,
+                    kar_zarar REAL NOT NULL
+                )
+            """)
+            
+            # Aylık gerçekleşen kar/zarar özeti (her satışta güncellenir).
+            # Raporlar bu tablodan okunduğu için süre geçmiş uzunluğundan bağımsızdır.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS kar_zarar_aylik (
+                    user_id TEXT NOT NULL,
+                    ay TEXT NOT NULL,
+                    sembol TEXT NOT NULL,
+                    kar_zarar REAL NOT NULL DEFAULT 0,
+                    satis_miktari REAL NOT NULL DEFAULT 0,
+                    satis_tutari REAL NOT NULL DEFAULT 0,
+                    islem_sayisi INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, ay, sembol)
+                )
+            """)
+            
+            # Günlük portföy değeri (sembol bazında) ve artımlı yenileme durumu.
+            # son_tarih: kesinleşmiş son gün, kirli_tarih: işlem nedeniyle yeniden
+            # hesaplanması gereken en erken gün
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS portfoy_gunluk (
+                    user_id TEXT NOT NULL,
+                    tarih TEXT NOT NULL,
+                    sembol TEXT NOT NULL,
+                    miktar REAL NOT NULL,
+                    fiyat REAL,
+                    deger REAL,
+                    PRIMARY KEY (user_id, tarih, sembol)
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS portfoy_gunluk_durum (
+                    user_id TEXT PRIMARY KEY,
+                    son_tarih TEXT,
+                    kirli_tarih TEXT
+                )
+            """)
+            
+            # Fiyat alarmları: her değişiklik tek satırı etkiler; tüm instance'lar paylaşır
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS fiyat_alarmlari (
+                    id {self.ID_COLUMN},
+                    user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER_ID}',
+                    sembol TEXT NOT NULL,
+                    kosul TEXT NOT NULL,
+                    hedef_fiyat REAL NOT NULL,
+                    olusturma TEXT NOT NULL,
+                    tetiklendi INTEGER NOT NULL DEFAULT 0,
+                    tetiklenme TEXT,
+                    tetik_fiyati REAL,
+                    bildirildi INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            
+            # Chatbot oturum geçmişi: her worker/instance aynı konuşmayı görür
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS sohbet_mesajlari (
+                    id {self.ID_COLUMN},
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    rol TEXT NOT NULL,
+                    icerik TEXT NOT NULL,
+                    zaman DOUBLE PRECISION NOT NULL
+                )
+            """)
+            
+            # Tek kullanıcılı şemadan geçiş: mevcut satırlar varsayılan kullanıcıya ait olur
+            for tablo in ("yatirimlar", "islem_gecmisi", "satis_lotlari"):
+                if not self._column_exists(cursor, tablo, "user_id"):
+                    cursor.execute(
+                        f"ALTER TABLE {tablo} ADD COLUMN user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER_ID}'"
+                    )
+            
+            # İndeksler user_id ile başlar: her sorgu tek kullanıcının satırlarını
+            # tarar, yeni kullanıcılar mevcut kullanıcıların sorgularını yavaşlatmaz
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_yatirimlar_user_sembol_tarih ON yatirimlar (user_id, sembol, tarih)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_islem_gecmisi_user_tarih ON islem_gecmisi (user_id, tarih)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_islem_gecmisi_user_sembol_tarih ON islem_gecmisi (user_id, sembol, tarih)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_satis_lotlari_user_tarih ON satis_lotlari (user_id, satis_tarihi)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_fiyat_alarmlari_user ON fiyat_alarmlari (user_id, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_fiyat_alarmlari_bekleyen ON fiyat_alarmlari (tetiklendi, sembol)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sohbet_mesajlari_oturum ON sohbet_mesajlari (user_id, session_id, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sohbet_mesajlari_zaman ON sohbet_mesajlari (zaman)")
+            
+            # Özet tablosu yeni oluşturulduysa mevcut satış geçmişinden doldur
+            cursor.execute("SELECT COUNT(*) FROM kar_zarar_aylik")
+            if cursor.fetchone()[0] == 0:
+                cursor.execute("""
+                    INSERT INTO kar_zarar_aylik (user_id, ay, sembol, kar_zarar, satis_miktari, satis_tutari, islem_sayisi)
+                    SELECT user_id, substr(tarih, 1, 7), sembol, SUM(kar_zarar), SUM(miktar), SUM(miktar * fiyat), COUNT(*)
+                    FROM islem_gecmisi
+                    WHERE islem_tipi = 'SATIS'
+                    GROUP BY user_id, substr(tarih, 1, 7), sembol
+                """)
+            
             conn.commit()
             cursor.close()
         except Exception as e:
@@ -97,6 +394,20 @@ class PortfolioDB:
         finally:
             self.release_connection(conn)
 
+    def _table_exists(self, cursor, tablo: str) -> bool:
+        """Tablo var mı? (PostgreSQL)"""
+        cursor.execute("SELECT 1 FROM information_schema.tables WHERE table_name = %s", (tablo,))
+        return cursor.fetchone() is not None
+
+    def _column_exists(self, cursor, tablo: str, kolon: str) -> bool:
+        """Tabloda kolon var mı? (PostgreSQL)"""
+        cursor.execute(
+            "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+            (tablo, kolon)
+        )
+        return cursor.fetchone() is not None
+
+    @timed("db.ekle")
     def ekle(self, sembol: str, miktar: float, maliyet: float, notlar: str = "") -> str:
         """Yeni yatırım ekle."""
         tarih = datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -106,12 +417,13 @@ class PortfolioDB:
         try:
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO yatirimlar (sembol, miktar, maliyet, tarih, notlar) VALUES (%s, %s, %s, %s, %s)",
-                (sembol, miktar, maliyet, tarih, notlar)
+                "INSERT INTO yatirimlar (user_id, sembol, miktar, maliyet, tarih, notlar) VALUES (%s, %s, %s, %s, %s, %s)",
+                (self.user_id, sembol, miktar, maliyet, tarih, notlar)
             )
             self._log_islem(cursor, sembol, "ALIS", miktar, maliyet)
             conn.commit()
             cursor.close()
+            self.invalidate_cache()
             logger.info(f"✅ Yatırım eklendi: {sembol} x{miktar} @ {maliyet} TL")
             return f"✅ {sembol} portföye eklendi: {miktar} adet, {maliyet} TL'den."
         except Exception as e:
@@ -121,36 +433,36 @@ class PortfolioDB:
         finally:
             self.release_connection(conn)
 
+    @timed("db.sat")
     def sat(self, sembol: str, miktar: float, satis_fiyati: float) -> str:
         """Kısmi veya tam satış yap."""
         sembol = sembol.upper().strip()
+        satis_tarihi = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             
             cursor.execute(
-                "SELECT id, miktar, maliyet FROM yatirimlar WHERE sembol = %s ORDER BY tarih ASC",
-                (sembol,)
+                "SELECT id, miktar, maliyet, tarih FROM yatirimlar WHERE user_id = %s AND sembol = %s ORDER BY tarih ASC",
+                (self.user_id, sembol)
             )
             pozisyonlar = cursor.fetchall()
             
             if not pozisyonlar:
                 cursor.close()
-                self.release_connection(conn)
                 return f"❌ {sembol} portföyünde bulunamadı."
             
             toplam_miktar = sum(p[1] for p in pozisyonlar)
             if miktar > toplam_miktar:
                 cursor.close()
-                self.release_connection(conn)
                 return f"❌ Yetersiz miktar. Portföyde {toplam_miktar} adet {sembol} var."
             
             kalan_satis = miktar
             toplam_kar_zarar = 0
             ortalama_maliyet = 0
             
-            for poz_id, poz_miktar, poz_maliyet in pozisyonlar:
+            for poz_id, poz_miktar, poz_maliyet, poz_tarih in pozisyonlar:
                 if kalan_satis <= 0:
                     break
                 
@@ -160,6 +472,11 @@ class PortfolioDB:
                 toplam_kar_zarar += kar_zarar
                 ortalama_maliyet += satilacak * poz_maliyet_float
                 
+                cursor.execute("""
+                    INSERT INTO satis_lotlari (user_id, sembol, miktar, alis_fiyati, alis_tarihi, satis_fiyati, satis_tarihi, kar_zarar)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """, (self.user_id, sembol, satilacak, poz_maliyet_float, poz_tarih, satis_fiyati, satis_tarihi, kar_zarar))
+                
                 if satilacak >= poz_miktar:
                     cursor.execute("DELETE FROM yatirimlar WHERE id = %s", (poz_id,))
                 else:
@@ -173,9 +490,20 @@ class PortfolioDB:
             
             ortalama_maliyet = ortalama_maliyet / miktar if miktar > 0 else 0
             
-            self._log_islem(cursor, sembol, "SATIS", miktar, satis_fiyati, toplam_kar_zarar)
+            self._log_islem(cursor, sembol, "SATIS", miktar, satis_fiyati, toplam_kar_zarar,
+                            tarih=satis_tarihi)
+            cursor.execute("""
+                INSERT INTO kar_zarar_aylik (user_id, ay, sembol, kar_zarar, satis_miktari, satis_tutari, islem_sayisi)
+                VALUES (%s, %s, %s, %s, %s, %s, 1)
+                ON CONFLICT (user_id, ay, sembol) DO UPDATE SET
+                    kar_zarar = kar_zarar_aylik.kar_zarar + EXCLUDED.kar_zarar,
+                    satis_miktari = kar_zarar_aylik.satis_miktari + EXCLUDED.satis_miktari,
+                    satis_tutari = kar_zarar_aylik.satis_tutari + EXCLUDED.satis_tutari,
+                    islem_sayisi = kar_zarar_aylik.islem_sayisi + 1
+            """, (self.user_id, satis_tarihi[:7], sembol, toplam_kar_zarar, miktar, miktar * satis_fiyati))
             conn.commit()
             cursor.close()
+            self.invalidate_cache()
             
             kar_zarar_str = f"+{toplam_kar_zarar:.2f}" if toplam_kar_zarar >= 0 else f"{toplam_kar_zarar:.2f}"
             emoji = "📈" if toplam_kar_zarar >= 0 else "📉"
@@ -189,6 +517,7 @@ class PortfolioDB:
         finally:
             self.release_connection(conn)
 
+    @timed("db.guncelle")
     def guncelle(self, sembol: str, yeni_miktar: Optional[float] = None, 
                  yeni_maliyet: Optional[float] = None) -> str:
         """Mevcut pozisyonu güncelle."""
@@ -199,14 +528,13 @@ class PortfolioDB:
             cursor = conn.cursor()
             
             cursor.execute(
-                "SELECT id, miktar, maliyet FROM yatirimlar WHERE sembol = %s LIMIT 1",
-                (sembol,)
+                "SELECT id, miktar, maliyet FROM yatirimlar WHERE user_id = %s AND sembol = %s LIMIT 1",
+                (self.user_id, sembol)
             )
             result = cursor.fetchone()
             
             if not result:
                 cursor.close()
-                self.release_connection(conn)
                 return f"❌ {sembol} portföyünde bulunamadı."
             
             poz_id, eski_miktar, eski_maliyet = result
@@ -224,6 +552,7 @@ class PortfolioDB:
             
             conn.commit()
             cursor.close()
+            self.invalidate_cache()
             
             logger.info(f"🔄 Güncelleme: {sembol} {eski_miktar}→{miktar} adet, {eski_maliyet}→{maliyet} TL")
             return f"🔄 {sembol} güncellendi: {miktar} adet, {maliyet} TL"
@@ -234,6 +563,7 @@ class PortfolioDB:
         finally:
             self.release_connection(conn)
 
+    @timed("db.sil")
     def sil(self, sembol: str) -> str:
         """Sembolü tamamen portföyden sil"""
         sembol = sembol.upper().strip()
@@ -242,15 +572,21 @@ class PortfolioDB:
         try:
             cursor = conn.cursor()
             
-            cursor.execute("SELECT miktar FROM yatirimlar WHERE sembol = %s", (sembol,))
-            if not cursor.fetchone():
+            cursor.execute("SELECT SUM(miktar), SUM(miktar * maliyet) FROM yatirimlar WHERE user_id = %s AND sembol = %s",
+                           (self.user_id, sembol))
+            toplam_miktar, toplam_maliyet = cursor.fetchone()
+            if not toplam_miktar:
                 cursor.close()
-                self.release_connection(conn)
                 return f"❌ {sembol} portföyünde bulunamadı."
             
-            cursor.execute("DELETE FROM yatirimlar WHERE sembol = %s", (sembol,))
+            cursor.execute("DELETE FROM yatirimlar WHERE user_id = %s AND sembol = %s",
+                           (self.user_id, sembol))
+            # Geçmişe yaz: performans analizi pozisyonun ne zaman çıktığını bilmeli
+            self._log_islem(cursor, sembol, "SIL", float(toplam_miktar),
+                            float(toplam_maliyet) / float(toplam_miktar), detay="Portföyden silindi")
             conn.commit()
             cursor.close()
+            self.invalidate_cache()
             
             logger.info(f"🗑️ Silindi: {sembol}")
             return f"🗑️ {sembol} portföyden silindi."
@@ -261,6 +597,7 @@ class PortfolioDB:
         finally:
             self.release_connection(conn)
 
+    @_cached_read("Getirme hatası")
     def getir(self) -> List[Dict]:
         """Tüm portföyü listele."""
         conn = self.get_connection()
@@ -271,9 +608,10 @@ class PortfolioDB:
                        SUM(miktar * maliyet) / SUM(miktar) as ort_maliyet,
                        MIN(tarih) as ilk_alis
                 FROM yatirimlar 
+                WHERE user_id = %s
                 GROUP BY sembol
                 ORDER BY sembol
-            """)
+            """, (self.user_id,))
             veriler = cursor.fetchall()
             cursor.close()
             
@@ -290,19 +628,18 @@ class PortfolioDB:
                 })
             
             return portfoy
-        except Exception as e:
-            logger.error(f"Getirme hatası: {e}")
-            return []
         finally:
             self.release_connection(conn)
 
+    @_cached_read("Getirme detay hatası")
     def getir_detayli(self) -> List[Dict]:
         """Her pozisyonu ayrı ayrı listele (FIFO görünümü)"""
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, sembol, miktar, maliyet, tarih, notlar FROM yatirimlar ORDER BY tarih"
+                "SELECT id, sembol, miktar, maliyet, tarih, notlar FROM yatirimlar WHERE user_id = %s ORDER BY tarih",
+                (self.user_id,)
             )
             veriler = cursor.fetchall()
             cursor.close()
@@ -318,12 +655,10 @@ class PortfolioDB:
                 }
                 for v in veriler
             ]
-        except Exception as e:
-            logger.error(f"Getirme detay hatası: {e}")
-            return []
         finally:
             self.release_connection(conn)
 
+    @_cached_read("İşlem geçmişi hatası")
     def islem_gecmisi(self, sembol: Optional[str] = None, limit: int = 20) -> List[Dict]:
         """İşlem geçmişini getir."""
         conn = self.get_connection()
@@ -334,17 +669,18 @@ class PortfolioDB:
                 cursor.execute("""
                     SELECT sembol, islem_tipi, miktar, fiyat, tarih, kar_zarar, detay
                     FROM islem_gecmisi 
-                    WHERE sembol = %s
+                    WHERE user_id = %s AND sembol = %s
                     ORDER BY tarih DESC
                     LIMIT %s
-                """, (sembol.upper(), limit))
+                """, (self.user_id, sembol.upper(), limit))
             else:
                 cursor.execute("""
                     SELECT sembol, islem_tipi, miktar, fiyat, tarih, kar_zarar, detay
                     FROM islem_gecmisi 
+                    WHERE user_id = %s
                     ORDER BY tarih DESC
                     LIMIT %s
-                """, (limit,))
+                """, (self.user_id, limit))
             
             rows = cursor.fetchall()
             cursor.close()
@@ -361,20 +697,534 @@ class PortfolioDB:
                 }
                 for r in rows
             ]
-        except Exception as e:
-            logger.error(f"İşlem geçmişi hatası: {e}")
-            return []
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.islem_sayisi")
+    def islem_sayisi(self) -> int:
+        """Toplam işlem sayısı"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM islem_gecmisi WHERE user_id = %s", (self.user_id,))
+            count = cursor.fetchone()[0]
+            cursor.close()
+            return int(count)
+        finally:
+            self.release_connection(conn)
+
+    @_cached_read("İşlem akışı hatası")
+    def islem_akisi(self, baslangic: Optional[str] = None) -> List[Dict]:
+        """
+        İşlemler, eskiden yeniye (performans analizi için nakit akışları).
+
+        Args:
+            baslangic: Sadece bu günden (YYYY-MM-DD) itibaren olan işlemler
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT sembol, islem_tipi, miktar, fiyat, tarih, detay
+                FROM islem_gecmisi
+                WHERE user_id = %s AND tarih >= %s
+                ORDER BY tarih, id
+            """, (self.user_id, baslangic or ""))
+            rows = cursor.fetchall()
+            cursor.close()
+            
+            return [
+                {
+                    "sembol": r[0],
+                    "islem": r[1],
+                    "miktar": float(r[2]),
+                    "fiyat": float(r[3]),
+                    "tarih": r[4],
+                    "detay": r[5]
+                }
+                for r in rows
+            ]
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.snapshot_durumu")
+    def snapshot_durumu(self) -> Dict:
+        """Günlük değer serisinin durumu: {"son_tarih", "kirli_tarih"}"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT son_tarih, kirli_tarih FROM portfoy_gunluk_durum WHERE user_id = %s",
+                (self.user_id,)
+            )
+            row = cursor.fetchone()
+            cursor.close()
+            return {"son_tarih": row[0] if row else None, "kirli_tarih": row[1] if row else None}
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.snapshot_gunu")
+    def snapshot_gunu(self, tarih: str) -> Dict[str, tuple]:
+        """Bir günün pozisyonları: {sembol: (miktar, fiyat)}"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT sembol, miktar, fiyat FROM portfoy_gunluk WHERE user_id = %s AND tarih = %s",
+                (self.user_id, tarih)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            return {r[0]: (float(r[1]), float(r[2]) if r[2] is not None else None) for r in rows}
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.snapshot_yaz")
+    def snapshot_yaz(self, baslangic: str, satirlar: List[tuple], son_tarih: str,
+                     kirli_tarih: Optional[str] = None):
+        """
+        baslangic gününden sonraki günlük satırları yenileriyle değiştir.
+
+        Args:
+            satirlar: (tarih, sembol, miktar, fiyat, deger) listesi
+            son_tarih: Kesinleşen son gün
+            kirli_tarih: Yenileme sırasında okunan kirli_tarih; bu arada yeni
+                bir işlem kaydedildiyse işaret korunur
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM portfoy_gunluk WHERE user_id = %s AND tarih >= %s",
+                (self.user_id, baslangic)
+            )
+            if satirlar:
+                cursor.executemany("""
+                    INSERT INTO portfoy_gunluk (user_id, tarih, sembol, miktar, fiyat, deger)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, [(self.user_id, *satir) for satir in satirlar])
+            cursor.execute("""
+                INSERT INTO portfoy_gunluk_durum (user_id, son_tarih, kirli_tarih)
+                VALUES (%s, %s, NULL)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    son_tarih = EXCLUDED.son_tarih,
+                    kirli_tarih = CASE
+                        WHEN portfoy_gunluk_durum.kirli_tarih IS NOT DISTINCT FROM %s THEN NULL
+                        ELSE portfoy_gunluk_durum.kirli_tarih
+                    END
+            """, (self.user_id, son_tarih, kirli_tarih))
+            conn.commit()
+            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.snapshot_serisi")
+    def snapshot_serisi(self, baslangic: Optional[str] = None, bitis: Optional[str] = None,
+                        sembol: Optional[str] = None) -> List[Dict]:
+        """
+        Günlük portföy değeri (tarih aralığı sorgusu).
+        Sembol verilirse o sembolün satırları, verilmezse günlük toplamlar döner.
+        """
+        params = [self.user_id, baslangic or "", bitis or "9999-12-31"]
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            if sembol:
+                params.append(sembol.upper())
+                cursor.execute("""
+                    SELECT tarih, miktar, fiyat, deger
+                    FROM portfoy_gunluk
+                    WHERE user_id = %s AND tarih >= %s AND tarih <= %s AND sembol = %s
+                    ORDER BY tarih
+                """, tuple(params))
+                return [
+                    {"tarih": r[0], "miktar": float(r[1]),
+                     "fiyat": float(r[2]) if r[2] is not None else None,
+                     "deger": round(float(r[3]), 2) if r[3] is not None else None}
+                    for r in cursor.fetchall()
+                ]
+            
+            cursor.execute("""
+                SELECT tarih, SUM(deger), COUNT(*)
+                FROM portfoy_gunluk
+                WHERE user_id = %s AND tarih >= %s AND tarih <= %s
+                GROUP BY tarih
+                ORDER BY tarih
+            """, tuple(params))
+            return [
+                {"tarih": r[0], "deger": round(float(r[1] or 0), 2), "sembol_sayisi": int(r[2])}
+                for r in cursor.fetchall()
+            ]
+        finally:
+            self.release_connection(conn)
+
+    # ============================================================
+    # FİYAT ALARMLARI
+    # ============================================================
+    #
+    # Alarmlar portföy önbelleğinden ve versiyonundan bağımsızdır: alarm
+    # eklemek/tetiklemek portföy ETag'lerini değiştirmez. Dönen kayıtlar
+    # API'deki alan adlarını kullanır (symbol, condition, target_price, ...).
+
+    _ALARM_KOLONLARI = """
+        id, user_id, sembol, kosul, hedef_fiyat, olusturma,
+        tetiklendi, tetiklenme, tetik_fiyati, bildirildi
+    """
+
+    @staticmethod
+    def _alarm_kaydi(r) -> Dict:
+        alarm = {
+            "id": int(r[0]),
+            "user_id": r[1],
+            "symbol": r[2],
+            "condition": r[3],
+            "target_price": float(r[4]),
+            "created_at": r[5],
+            "triggered": bool(r[6]),
+            "notified": bool(r[9]),
+        }
+        if r[6]:
+            alarm["triggered_at"] = r[7]
+            alarm["current_price"] = float(r[8]) if r[8] is not None else None
+        return alarm
+
+    @timed("db.alarm_ekle")
+    def alarm_ekle(self, sembol: str, kosul: str, hedef_fiyat: float,
+                   olusturma: Optional[str] = None) -> Dict:
+        """Kullanıcıya yeni fiyat alarmı ekle ve kaydı döndür"""
+        olusturma = olusturma or datetime.now().strftime("%Y-%m-%d %H:%M")
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                INSERT INTO fiyat_alarmlari (user_id, sembol, kosul, hedef_fiyat, olusturma)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING {self._ALARM_KOLONLARI}
+            """, (self.user_id, sembol, kosul, hedef_fiyat, olusturma))
+            alarm = self._alarm_kaydi(cursor.fetchone())
+            conn.commit()
+            cursor.close()
+            return alarm
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.alarm_sil")
+    def alarm_sil(self, alarm_id: int) -> bool:
+        """Kullanıcının alarmını sil; silindiyse True"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM fiyat_alarmlari WHERE id = %s AND user_id = %s",
+                           (alarm_id, self.user_id))
+            silindi = cursor.rowcount > 0
+            conn.commit()
+            cursor.close()
+            return silindi
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.alarmlar")
+    def alarmlar(self) -> List[Dict]:
+        """Kullanıcının tüm alarmları (eklenme sırasıyla)"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {self._ALARM_KOLONLARI} FROM fiyat_alarmlari
+                WHERE user_id = %s ORDER BY id
+            """, (self.user_id,))
+            rows = cursor.fetchall()
+            cursor.close()
+            return [self._alarm_kaydi(r) for r in rows]
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.bekleyen_alarmlar")
+    def bekleyen_alarmlar(self) -> List[Dict]:
+        """Tüm kullanıcıların tetiklenmemiş alarmları (alarm indeksini kurmak için)"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {self._ALARM_KOLONLARI} FROM fiyat_alarmlari WHERE tetiklendi = 0")
+            rows = cursor.fetchall()
+            cursor.close()
+            return [self._alarm_kaydi(r) for r in rows]
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.alarm_tetikle")
+    def alarm_tetikle(self, alarm_idleri: List[int], fiyat: float,
+                      tarih: Optional[str] = None) -> List[int]:
+        """
+        Alarmları tetiklendi olarak işaretle (kullanıcıdan bağımsız).
+        Sadece hâlâ bekleyen satırlar güncellenir; aynı fiyatı gören birden
+        fazla instance aynı alarmı iki kez tetikleyemez.
+
+        Returns:
+            Bu çağrıda tetiklenen alarm id'leri
+        """
+        tarih = tarih or datetime.now().strftime("%Y-%m-%d %H:%M")
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            tetiklenen = []
+            for alarm_id in alarm_idleri:
+                cursor.execute("""
+                    UPDATE fiyat_alarmlari
+                    SET tetiklendi = 1, tetiklenme = %s, tetik_fiyati = %s, bildirildi = 0
+                    WHERE id = %s AND tetiklendi = 0
+                """, (tarih, fiyat, alarm_id))
+                if cursor.rowcount:
+                    tetiklenen.append(alarm_id)
+            conn.commit()
+            cursor.close()
+            return tetiklenen
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.alarm_bildirimleri")
+    def alarm_bildirimleri(self) -> List[Dict]:
+        """
+        Kullanıcının tetiklenmiş ama henüz bildirilmemiş alarmlarını döndür
+        ve bildirildi olarak işaretle. Aynı anda gelen iki istekten sadece
+        biri bir alarmı alır.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                UPDATE fiyat_alarmlari SET bildirildi = 1
+                WHERE user_id = %s AND tetiklendi = 1 AND bildirildi = 0
+                RETURNING {self._ALARM_KOLONLARI}
+            """, (self.user_id,))
+            rows = cursor.fetchall()
+            conn.commit()
+            cursor.close()
+            return sorted((self._alarm_kaydi(r) for r in rows), key=lambda a: a["id"])
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+
+    # ============================================================
+    # SOHBET GEÇMİŞİ
+    # ============================================================
+    #
+    # Chatbot oturumları (chat_store.DatabaseSessionStore). Her oturumda en
+    # fazla 'limit' mesaj tutulur; 'zaman' Unix zaman damgasıdır (sn).
+
+    @timed("db.sohbet_gecmisi")
+    def sohbet_gecmisi(self, session_id: str, limit: int, en_eski: float = 0) -> List[Dict]:
+        """Oturumun son 'limit' mesajı (eskiden yeniye); en_eski'den eski mesajlar dahil edilmez"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT rol, icerik FROM sohbet_mesajlari
+                WHERE user_id = %s AND session_id = %s AND zaman >= %s
+                ORDER BY id DESC LIMIT %s
+            """, (self.user_id, session_id, en_eski, limit))
+            rows = cursor.fetchall()
+            cursor.close()
+            return [{"role": r[0], "content": r[1]} for r in reversed(rows)]
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.sohbet_ekle")
+    def sohbet_ekle(self, session_id: str, mesajlar: List[Dict], limit: int):
+        """Mesajları oturuma ekle ve oturumu son 'limit' mesaja kırp"""
+        zaman = time.time()
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            for mesaj in mesajlar:
+                cursor.execute("""
+                    INSERT INTO sohbet_mesajlari (user_id, session_id, rol, icerik, zaman)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (self.user_id, session_id, mesaj["role"], mesaj["content"], zaman))
+            cursor.execute("""
+                DELETE FROM sohbet_mesajlari
+                WHERE user_id = %s AND session_id = %s AND id NOT IN (
+                    SELECT id FROM sohbet_mesajlari
+                    WHERE user_id = %s AND session_id = %s
+                    ORDER BY id DESC LIMIT %s
+                )
+            """, (self.user_id, session_id, self.user_id, session_id, limit))
+            conn.commit()
+            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.sohbet_temizle")
+    def sohbet_temizle(self, session_id: str):
+        """Oturumun geçmişini sil"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM sohbet_mesajlari WHERE user_id = %s AND session_id = %s",
+                           (self.user_id, session_id))
+            conn.commit()
+            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+
+    @timed("db.eski_sohbetleri_sil")
+    def eski_sohbetleri_sil(self, en_eski: float) -> int:
+        """Tüm kullanıcılarda en_eski'den eski mesajları sil; silinen satır sayısını döndür"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM sohbet_mesajlari WHERE zaman < %s", (en_eski,))
+            silinen = cursor.rowcount
+            conn.commit()
+            cursor.close()
+            return silinen
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             self.release_connection(conn)
 
     def _log_islem(self, cursor, sembol: str, islem_tipi: str, miktar: float, 
-                   fiyat: float, kar_zarar: float = 0, detay: str = ""):
-        """İşlemi geçmişe kaydet"""
-        tarih = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                   fiyat: float, kar_zarar: float = 0, detay: str = "",
+                   tarih: Optional[str] = None):
+        """İşlemi geçmişe kaydet ve günlük değer serisini o günden itibaren kirli işaretle"""
+        tarih = tarih or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         cursor.execute("""
-            INSERT INTO islem_gecmisi (sembol, islem_tipi, miktar, fiyat, tarih, kar_zarar, detay)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (sembol, islem_tipi, miktar, fiyat, tarih, kar_zarar, detay))
+            INSERT INTO islem_gecmisi (user_id, sembol, islem_tipi, miktar, fiyat, tarih, kar_zarar, detay)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (self.user_id, sembol, islem_tipi, miktar, fiyat, tarih, kar_zarar, detay))
+        cursor.execute("""
+            INSERT INTO portfoy_gunluk_durum (user_id, son_tarih, kirli_tarih)
+            VALUES (%s, NULL, %s)
+            ON CONFLICT (user_id) DO UPDATE SET kirli_tarih = CASE
+                WHEN portfoy_gunluk_durum.kirli_tarih IS NULL
+                  OR EXCLUDED.kirli_tarih < portfoy_gunluk_durum.kirli_tarih
+                THEN EXCLUDED.kirli_tarih
+                ELSE portfoy_gunluk_durum.kirli_tarih
+            END
+        """, (self.user_id, tarih[:10]))
+
+    # Rapor gruplama ifadeleri (kar_zarar_aylik.ay = 'YYYY-MM')
+    RAPOR_GRUPLARI = {
+        "symbol": "sembol",
+        "month": "ay",
+        "year": "substr(ay, 1, 4)",
+    }
+
+    @_cached_read("Kar/zarar raporu hatası")
+    def gerceklesen_kar(self, grup: str = "symbol", yil: Optional[int] = None) -> List[Dict]:
+        """
+        Gerçekleşen kar/zararı sembol, ay veya yıl bazında topla.
+        Aylık özet tablosundan okunur; sorgu maliyeti işlem sayısına değil
+        ay × sembol sayısına bağlıdır.
+
+        Args:
+            grup: symbol, month veya year
+            yil: Sadece bu yılın satışları (opsiyonel)
+        """
+        ifade = self.RAPOR_GRUPLARI[grup]
+        where, params = "WHERE user_id = %s", (self.user_id,)
+        if yil:
+            where += " AND ay >= %s AND ay <= %s"
+            params += (f"{yil:04d}-01", f"{yil:04d}-12")
+        
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {ifade} AS grup, SUM(kar_zarar), SUM(satis_miktari),
+                       SUM(satis_tutari), SUM(islem_sayisi)
+                FROM kar_zarar_aylik
+                {where}
+                GROUP BY {ifade}
+                ORDER BY {ifade}
+            """, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            
+            return [
+                {
+                    "grup": r[0],
+                    "kar_zarar": round(float(r[1]), 2),
+                    "satis_miktari": round(float(r[2]), 4),
+                    "satis_tutari": round(float(r[3]), 2),
+                    "islem_sayisi": int(r[4])
+                }
+                for r in rows
+            ]
+        finally:
+            self.release_connection(conn)
+
+    @_cached_read("Satış lotları hatası")
+    def satis_lotlari(self, yil: Optional[int] = None, sembol: Optional[str] = None) -> List[Dict]:
+        """
+        Satışlarda tüketilen alış lotları (FIFO).
+        Değer artış kazancı beyanı için alış/satış tarihi, fiyatı ve
+        elde tutma süresini içerir.
+        """
+        kosullar, params = ["user_id = %s"], [self.user_id]
+        if yil:
+            kosullar.append("satis_tarihi >= %s AND satis_tarihi < %s")
+            params += [f"{yil:04d}-01-01", f"{yil + 1:04d}-01-01"]
+        if sembol:
+            kosullar.append("sembol = %s")
+            params.append(sembol.upper())
+        where = "WHERE " + " AND ".join(kosullar)
+        
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT sembol, miktar, alis_fiyati, alis_tarihi, satis_fiyati, satis_tarihi, kar_zarar
+                FROM satis_lotlari
+                {where}
+                ORDER BY satis_tarihi, id
+            """, tuple(params))
+            rows = cursor.fetchall()
+            cursor.close()
+            
+            lotlar = []
+            for r in rows:
+                elde_tutma = None
+                if r[3]:
+                    alis = datetime.strptime(r[3][:10], "%Y-%m-%d")
+                    satis = datetime.strptime(r[5][:10], "%Y-%m-%d")
+                    elde_tutma = (satis - alis).days
+                lotlar.append({
+                    "sembol": r[0],
+                    "miktar": float(r[1]),
+                    "alis_fiyati": float(r[2]),
+                    "alis_tarihi": r[3],
+                    "satis_fiyati": float(r[4]),
+                    "satis_tarihi": r[5],
+                    "alis_tutari": round(float(r[1]) * float(r[2]), 2),
+                    "satis_tutari": round(float(r[1]) * float(r[4]), 2),
+                    "kar_zarar": round(float(r[6]), 2),
+                    "elde_tutma_gun": elde_tutma
+                })
+            return lotlar
+        finally:
+            self.release_connection(conn)
 
     def ozet(self) -> Dict:
         """Portföy özeti"""
@@ -393,4 +1243,140 @@ class PortfolioDB:
         """Veritabanı bağlantı havuzunu kapat"""
         if self.connection_pool:
             self.connection_pool.closeall()
-            logger.info("📂 Veritabanı bağlantı havuzu kapatıldı")
\ No newline at end of file
+            logger.info("📂 Veritabanı bağlantı havuzu kapatıldı")
+
+
+# ============================================================
+# SQLITE BACKEND
+# ============================================================
+
+class _SQLiteCursor:
+    """
+    sqlite3 cursor sarmalayıcısı.
+    PortfolioDB sorguları psycopg2 stilinde (%s) yazıldığı için
+    parametre işaretlerini SQLite'ın beklediği '?' biçimine çevirir.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, sql: str, params=()):
+        return self._cursor.execute(sql.replace("%s", "?"), params)
+
+    def executemany(self, sql: str, seq_of_params):
+        return self._cursor.executemany(sql.replace("%s", "?"), seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _SQLiteConnection:
+    """sqlite3 bağlantısı; cursor() çağrısında _SQLiteCursor döndürür"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def cursor(self):
+        return _SQLiteCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class SQLitePortfolioDB(PortfolioDB):
+    """
+    Gömülü SQLite (WAL modu) tabanlı portföy yönetim sistemi.
+    Ağ gecikmesi olmadığı için tek kullanıcılı kurulumlarda, yerel
+    geliştirmede, testlerde ve benchmark'larda kullanılır.
+
+    Bağlantılar PostgreSQL backend'i gibi sınırlı bir havuzdan (DB_POOL_MAX)
+    alınır ve sorgudan sonra iade edilir; thread başına istek açan sunucularda
+    bağlantı sayısı büyümez. Bir bağlantıyı aynı anda tek thread kullanır;
+    WAL modu okuyucuların yazıcıyı beklememesini sağlar.
+    """
+
+    ID_COLUMN = "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    def __init__(self, db_url: str = None):
+        """
+        Args:
+            db_url: sqlite:///dosya.db, sqlite:////mutlak/yol.db veya sqlite:///:memory:
+        """
+        self.db_url = db_url or os.environ.get("DATABASE_URL") or "sqlite:///:memory:"
+        self.db_path = self.db_url.split("://", 1)[1][1:] if "://" in self.db_url else self.db_url
+
+        # Bellek içi veritabanı: tüm thread'ler aynı DB'yi görsün diye paylaşımlı önbellek
+        if self.db_path in ("", ":memory:"):
+            self._connect_target = f"file:portfoy_{id(self)}?mode=memory&cache=shared"
+            self._uri = True
+        else:
+            self._connect_target = self.db_path
+            self._uri = False
+
+        # Paylaşımlı bellek içi DB son bağlantı kapanınca silinir; havuz
+        # bağlantıları yenilense de veri kaybolmasın diye biri açık tutulur
+        self._keeper = self._connect() if self._uri else None
+        self.connection_pool = ConnectionPool(
+            self._connect,
+            minconn=1,
+            maxconn=int(os.environ.get("DB_POOL_MAX", 5)),
+            timeout=float(os.environ.get("DB_POOL_TIMEOUT", 10))
+        )
+        self._init_tenant()
+        self._init_cache()
+
+        try:
+            self._create_tables()
+            logger.info(f"📂 SQLite veritabanı hazır: {self.db_path or ':memory:'}")
+        except Exception as e:
+            logger.error(f"❌ SQLite veritabanı açılamadı: {e}")
+            raise
+
+    def _table_exists(self, cursor, tablo: str) -> bool:
+        """Tablo var mı? (SQLite)"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", (tablo,))
+        return cursor.fetchone() is not None
+
+    def _column_exists(self, cursor, tablo: str, kolon: str) -> bool:
+        """Tabloda kolon var mı? (SQLite)"""
+        cursor.execute(f"PRAGMA table_info({tablo})")
+        return any(row[1] == kolon for row in cursor.fetchall())
+
+    def _connect(self) -> _SQLiteConnection:
+        """Yeni bir SQLite bağlantısı aç ve pragmaları uygula"""
+        raw = sqlite3.connect(self._connect_target, uri=self._uri,
+                              check_same_thread=False, timeout=10)
+        if not self._uri:
+            raw.execute("PRAGMA journal_mode=WAL")
+            raw.execute("PRAGMA synchronous=NORMAL")
+        raw.execute("PRAGMA foreign_keys=ON")
+        return _SQLiteConnection(raw)
+
+    def pool_stats(self) -> Dict:
+        """Bağlantı havuzu metrikleri"""
+        return {"backend": "sqlite", **self.connection_pool.stats()}
+
+    def close(self):
+        """Havuzdaki bağlantıları (ve bellek içi DB'nin tutucu bağlantısını) kapat"""
+        super().close()
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+
+def create_db(db_url: str = None) -> PortfolioDB:
+    """
+    DATABASE_URL şemasına göre uygun backend'i oluştur.
+
+    Args:
+        db_url: Bağlantı adresi (verilmezse DATABASE_URL ortam değişkeni)
+
+    Returns:
+        PortfolioDB arayüzünü uygulayan backend nesnesi
+    """
+    db_url = db_url or os.environ.get("DATABASE_URL")
+
+    if db_url and db_url.startswith("sqlite:"):
+        return SQLitePortfolioDB(db_url)
+
+    return PortfolioDB(db_url)
@@ -0,0 +1,174 @@
+"""
+Finans Asistanı - LLM Çağrıları
+Groq çağrıları tek bir kapıdan geçer:
+
+    - Eşzamanlı çağrı sınırı (LLM_CONCURRENCY): sınır doluysa istek en fazla
+      LLM_QUEUE_TIMEOUT saniye sıra bekler, sonra LLMBusyError alır. Böylece
+      yavaş bir üretim tüm worker thread'lerini kilitleyemez.
+    - Zaman aşımı (LLM_TIMEOUT): tam yanıtta tüm çağrı için, akışta iki
+      parça arasındaki bekleme için geçerlidir.
+    - Akış: stream() token parçalarını geldikçe döndürür; ilk parçanın
+      gecikmesi (time-to-first-token) "llm.ttft" span'i olarak ölçülür.
+    - Araç çağrısı: tools verilirse model fonksiyon isteyebilir; istenen
+      araçlar run_tools ile çalıştırılıp sonuçlar bir sonraki tura eklenir.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from utils import acquire
+from utils.env import load_env
+from utils.timing import record, span
+
+load_env()
+LLM_MODEL = os.environ.get("LLM_MODEL", "llama-3.3-70b-versatile")
+LLM_MAX_TOKENS = int(os.environ.get("LLM_MAX_TOKENS", 1024))
+LLM_TEMPERATURE = 0.7
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", 4))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 30))
+LLM_QUEUE_TIMEOUT = float(os.environ.get("LLM_QUEUE_TIMEOUT", 5))
+
+_slots = threading.BoundedSemaphore(LLM_CONCURRENCY)
+
+
+class LLMBusyError(Exception):
+    """Eşzamanlı LLM çağrısı sınırı dolu"""
+
+
+@contextmanager
+def llm_slot(wait: float = LLM_QUEUE_TIMEOUT):
+    """LLM çağrısı için yer ayır (sınır doluysa 'wait' saniye bekle)"""
+    if not _slots.acquire(timeout=wait):
+        raise LLMBusyError("AI servisi şu an yoğun, lütfen biraz sonra tekrar deneyin.")
+    try:
+        acquire("groq")
+        yield
+    finally:
+        _slots.release()
+
+
+def _tool_args(tools: Optional[List[Dict]], final: bool) -> Dict:
+    """Araç parametreleri; son turda araç önerilir ama çağrılamaz (model yanıtlamak zorunda)"""
+    if not tools:
+        return {}
+    return {"tools": tools, "tool_choice": "none" if final else "auto"}
+
+
+def _tool_call_message(content: Optional[str], calls: List[Dict]) -> Dict:
+    """Modelin araç çağrısı isteğini geçmişe eklenecek assistant mesajına çevir"""
+    return {
+        "role": "assistant",
+        "content": content or None,
+        "tool_calls": [
+            {"id": c["id"], "type": "function",
+             "function": {"name": c["name"], "arguments": c["arguments"]}}
+            for c in calls
+        ],
+    }
+
+
+def complete(client, messages: List[Dict], tools: Optional[List[Dict]] = None,
+             run_tools: Optional[Callable[[List[Dict]], List[Dict]]] = None,
+             max_rounds: int = 3, stats: Optional[Dict] = None, **kwargs) -> str:
+    """
+    Tam yanıtı bekle ve metnini döndür.
+
+    Args:
+        tools: modele sunulan araç şemaları (OpenAI formatı)
+        run_tools: [{"id", "name", "arguments"}] → tool mesajları; araç turları
+            arasında LLM yeri bırakılır
+        max_rounds: en fazla araç turu; sonrasında model araçsız yanıtlar
+        stats: verilirse çalıştırılan araç çağrısı sayısı 'tool_calls' olarak yazılır
+    """
+    stats = {} if stats is None else stats
+    stats.setdefault("tool_calls", 0)
+    messages = list(messages)
+    for tur in range(max_rounds + 1):
+        with llm_slot(), span("llm.groq"):
+            response = client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=messages,
+                max_tokens=LLM_MAX_TOKENS,
+                temperature=LLM_TEMPERATURE,
+                timeout=LLM_TIMEOUT,
+                **_tool_args(tools, tur == max_rounds),
+                **kwargs
+            )
+        message = response.choices[0].message
+        tool_calls = getattr(message, "tool_calls", None)
+        if not tool_calls or run_tools is None:
+            return message.content or ""
+        calls = [{"id": c.id, "name": c.function.name, "arguments": c.function.arguments}
+                 for c in tool_calls]
+        stats["tool_calls"] += len(calls)
+        messages.append(_tool_call_message(message.content, calls))
+        messages.extend(run_tools(calls))
+    return ""
+
+
+def stream(client, messages: List[Dict], stats: Optional[Dict] = None,
+           tools: Optional[List[Dict]] = None,
+           run_tools: Optional[Callable[[List[Dict]], List[Dict]]] = None,
+           max_rounds: int = 3) -> Iterator[str]:
+    """
+    Yanıtı token parçaları olarak döndüren generator.
+    Yer her LLM çağrısı boyunca (veya generator kapatılana kadar) tutulur.
+    Model araç isterse parçalı gelen çağrılar birleştirilir, araçlar
+    çalıştırılır ve yanıt bir sonraki turda akmaya devam eder.
+
+    Args:
+        stats: verilirse 'ttft', 'total' (sn) ve 'tool_calls' buraya yazılır
+    """
+    stats = {} if stats is None else stats
+    stats.setdefault("tool_calls", 0)
+    messages = list(messages)
+    start = time.perf_counter()
+    try:
+        for tur in range(max_rounds + 1):
+            calls: Dict[int, Dict] = {}
+            text = []
+            with llm_slot():
+                chunks = None
+                try:
+                    chunks = client.chat.completions.create(
+                        model=LLM_MODEL,
+                        messages=messages,
+                        max_tokens=LLM_MAX_TOKENS,
+                        temperature=LLM_TEMPERATURE,
+                        timeout=LLM_TIMEOUT,
+                        stream=True,
+                        **_tool_args(tools, tur == max_rounds),
+                    )
+                    for chunk in chunks:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        for tc in getattr(delta, "tool_calls", None) or ():
+                            call = calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                            call["id"] = tc.id or call["id"]
+                            if tc.function is not None:
+                                call["name"] += tc.function.name or ""
+                                call["arguments"] += tc.function.arguments or ""
+                        if not delta.content:
+                            continue
+                        if "ttft" not in stats:
+                            stats["ttft"] = time.perf_counter() - start
+                            record("llm.ttft", stats["ttft"])
+                        text.append(delta.content)
+                        yield delta.content
+                finally:
+                    close = getattr(chunks, "close", None)
+                    if close:
+                        close()
+            if not calls or run_tools is None:
+                return
+            calls = [calls[i] for i in sorted(calls)]
+            stats["tool_calls"] += len(calls)
+            messages.append(_tool_call_message("".join(text), calls))
+            messages.extend(run_tools(calls))
+    finally:
+        stats["total"] = time.perf_counter() - start
+        record("llm.groq_stream", stats["total"])
@@ -0,0 +1,213 @@
+"""
+Finans Asistanı - Günlük Portföy Değeri
+İşlem geçmişinden günlük (sembol bazında) miktar/fiyat/değer satırları üretir
+ve portfoy_gunluk tablosunda saklar. Her yenilemede tüm geçmiş değil, sadece
+kirli işaretlenen günden (veya son kesinleşen günden) itibaren yeniden oynatılır.
+"""
+
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from datetime import date, timedelta
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from analytics import build_series
+
+logger = logging.getLogger("Snapshots")
+
+# Fiyat geçmişi, başlangıçtan bu kadar gün öncesinden istenir
+# (hafta sonu/tatil sonrası ilk gün için son kapanış bulunsun)
+HISTORY_LOOKBACK_DAYS = 7
+
+# Kullanıcı başına: son yenileme anahtarı ve eşzamanlı yenilemeyi önleyen kilit.
+# En fazla MAX_TRACKED_USERS kullanıcı tutulur; en uzun süredir kullanılmayan
+# (kilidi o an tutulmayan) kullanıcı önce çıkarılır.
+MAX_TRACKED_USERS = 1000
+_refresh_keys: Dict[str, tuple] = {}
+_refresh_locks: "OrderedDict[str, Lock]" = OrderedDict()
+_locks_guard = Lock()
+
+
+def _user_lock(user_id: str) -> Lock:
+    with _locks_guard:
+        lock = _refresh_locks.get(user_id)
+        if lock is None:
+            lock = _refresh_locks[user_id] = Lock()
+        _refresh_locks.move_to_end(user_id)
+        if len(_refresh_locks) > MAX_TRACKED_USERS:
+            for eski in list(_refresh_locks)[:-1]:
+                if not _refresh_locks[eski].locked():
+                    del _refresh_locks[eski]
+                    _refresh_keys.pop(eski, None)
+                    break
+        return lock
+
+
+def replay_rows(islemler: List[Dict], fiyat_gecmisi: Dict[str, tuple],
+                baslangic: date, bugun: date,
+                acilis: Optional[Dict[str, tuple]] = None) -> List[tuple]:
+    """
+    [baslangic, bugun] aralığı için günlük satırları hesapla.
+
+    Args:
+        islemler: baslangic gününden itibaren olan işlemler (artan)
+        fiyat_gecmisi: {sembol: (tarihler, fiyatlar)}
+        acilis: baslangic gününden önceki son satırlar {sembol: (miktar, fiyat)}
+
+    Returns:
+        (tarih, sembol, miktar, fiyat, deger) listesi; sıfır pozisyonlar yazılmaz
+    """
+    acilis = acilis or {}
+    if not islemler and not acilis:
+        return []
+
+    # Önceki günün fiyatı, yeni piyasa verisi gelene kadar ileri doldurulur
+    gecmis = dict(fiyat_gecmisi)
+    onceki_gun = (baslangic - timedelta(days=1)).isoformat()
+    for sembol, (_, fiyat) in acilis.items():
+        if fiyat is None:
+            continue
+        tarihler, fiyatlar = gecmis.get(sembol, ([], []))
+        gecmis[sembol] = ([onceki_gun] + list(tarihler), [fiyat] + list(fiyatlar))
+
+    seri = build_series(
+        islemler, gecmis, bugun=bugun, baslangic=baslangic,
+        baslangic_miktar={s: m for s, (m, _) in acilis.items()}
+    )
+
+    miktar, fiyat = seri["miktar"], seri["fiyat"]
+    gun_idx, sembol_idx = np.nonzero(miktar)
+    deger = miktar[gun_idx, sembol_idx] * fiyat[gun_idx, sembol_idx]
+
+    gunler = seri["gunler"].astype(str)
+    semboller = seri["semboller"]
+    return [
+        (gunler[d], semboller[s], m, None if f != f else f, None if v != v else v)
+        for d, s, m, f, v in zip(
+            gun_idx.tolist(), sembol_idx.tolist(), miktar[gun_idx, sembol_idx].tolist(),
+            fiyat[gun_idx, sembol_idx].tolist(), deger.tolist()
+        )
+    ]
+
+
+def refresh_snapshots(pdb, histories_lookup: Callable[[List[str], date], Dict[str, dict]],
+                      prices_lookup: Callable[[List[str]], Dict[str, dict]],
+                      bugun: Optional[date] = None) -> Dict:
+    """
+    Kullanıcının günlük değer serisini güncelle.
+
+    Yeniden oynatma başlangıcı: min(kirli_tarih, son_tarih + 1). Bugün her
+    zaman yeniden hesaplanır (son_tarih = dün), çünkü bugünün fiyatı henüz
+    kesinleşmemiştir.
+
+    Returns:
+        {"baslangic", "gun_sayisi", "satir_sayisi", "sure_ms"} (yenileme
+        gerekmediyse baslangic None)
+    """
+    bugun = bugun or date.today()
+    t0 = time.perf_counter()
+
+    with _user_lock(pdb.user_id):
+        durum = pdb.snapshot_durumu()
+        son_tarih, kirli_tarih = durum["son_tarih"], durum["kirli_tarih"]
+
+        if son_tarih:
+            baslangic = date.fromisoformat(son_tarih) + timedelta(days=1)
+            if kirli_tarih:
+                baslangic = min(baslangic, date.fromisoformat(kirli_tarih))
+        else:
+            ilk = pdb.islem_akisi()
+            if not ilk:
+                return {"baslangic": None, "gun_sayisi": 0, "satir_sayisi": 0, "sure_ms": 0.0}
+            baslangic = date.fromisoformat(ilk[0]["tarih"][:10])
+        baslangic = min(baslangic, bugun)
+
+        islemler = pdb.islem_akisi(baslangic.isoformat())
+        acilis = pdb.snapshot_gunu((baslangic - timedelta(days=1)).isoformat())
+        semboller = sorted({i["sembol"] for i in islemler} | set(acilis))
+
+        # Anlık fiyatlar bugünün satırına yazılır; değişmedikçe yeniden hesaplanmaz
+        guncel = {
+            sembol: price_data["price"]
+            for sembol, price_data in prices_lookup(semboller).items()
+            if price_data.get("success")
+        }
+
+        anahtar = (pdb.etag(), bugun.isoformat(), son_tarih, kirli_tarih,
+                   zlib.crc32(repr(sorted(guncel.items())).encode()))
+        if _refresh_keys.get(pdb.user_id) == anahtar:
+            return {"baslangic": None, "gun_sayisi": 0, "satir_sayisi": 0, "sure_ms": 0.0}
+
+        gecmis = {}
+        gecmis_baslangic = baslangic - timedelta(days=HISTORY_LOOKBACK_DAYS)
+        gecmisler = histories_lookup(semboller, gecmis_baslangic)
+        for sembol in semboller:
+            h = gecmisler.get(sembol, {})
+            tarihler, fiyatlar = (h["dates"], h["prices"]) if h.get("success") else ([], [])
+            if sembol in guncel:
+                tarihler, fiyatlar = list(tarihler) + [bugun.isoformat()], list(fiyatlar) + [guncel[sembol]]
+            if tarihler:
+                gecmis[sembol] = (tarihler, fiyatlar)
+
+        satirlar = replay_rows(islemler, gecmis, baslangic, bugun, acilis)
+        pdb.snapshot_yaz(baslangic.isoformat(), satirlar,
+                         (bugun - timedelta(days=1)).isoformat(), kirli_tarih)
+
+        # Yazımdan sonraki durumla anahtarla: aynı gün/fiyatlarla tekrar yenilenmez
+        durum = pdb.snapshot_durumu()
+        _refresh_keys[pdb.user_id] = (anahtar[0], anahtar[1], durum["son_tarih"],
+                                      durum["kirli_tarih"], anahtar[4])
+
+    sure_ms = (time.perf_counter() - t0) * 1000
+    gun_sayisi = (bugun - baslangic).days + 1
+    logger.info(f"📅 Günlük değer serisi yenilendi: {baslangic} → {bugun} ({gun_sayisi} gün, {sure_ms:.1f} ms)")
+    return {
+        "baslangic": baslangic.isoformat(),
+        "gun_sayisi": gun_sayisi,
+        "satir_sayisi": len(satirlar),
+        "sure_ms": round(sure_ms, 1),
+    }
+
+
+if __name__ == "__main__":
+    # Benchmark: tam yeniden oynatma vs son günün artımlı yenilenmesi
+    rng = np.random.default_rng(7)
+    N, K = 5_000, 20
+    semboller_ = [f"SYM{i:02d}" for i in range(K)]
+    baslangic_ = date(2021, 1, 1)
+    bugun_ = date(2025, 12, 31)
+    gun_sayisi_ = (bugun_ - baslangic_).days + 1
+    tarihler_ = np.sort(np.datetime64(baslangic_) + rng.integers(0, gun_sayisi_, N))
+    islemler_ = [
+        {"sembol": semboller_[s], "islem": "ALIS", "miktar": float(m), "fiyat": float(f),
+         "tarih": f"{g} 10:00:00", "detay": ""}
+        for s, m, f, g in zip(rng.integers(0, K, N), rng.uniform(1, 10, N),
+                              rng.uniform(50, 150, N), tarihler_.astype(str))
+    ]
+    eksen = np.arange(np.datetime64(baslangic_), np.datetime64(bugun_) + 1, dtype="datetime64[D]")
+    gecmis_ = {
+        s: (eksen.astype(str).tolist(), (100 * np.cumprod(1 + rng.normal(0.0003, 0.02, len(eksen)))).tolist())
+        for s in semboller_
+    }
+
+    t0 = time.perf_counter()
+    tam = replay_rows(islemler_, gecmis_, baslangic_, bugun_)
+    t1 = time.perf_counter()
+
+    dun = (bugun_ - timedelta(days=1)).isoformat()
+    acilis_ = {s: (m, f) for d, s, m, f, _ in tam if d == dun}
+    bugunku = [i for i in islemler_ if i["tarih"][:10] >= bugun_.isoformat()]
+    t2 = time.perf_counter()
+    artimli = replay_rows(bugunku, gecmis_, bugun_, bugun_, acilis_)
+    t3 = time.perf_counter()
+
+    son_gun = {s: v for d, s, _, _, v in tam if d == bugun_.isoformat()}
+    fark = max(abs(son_gun[s] - v) for _, s, _, _, v in artimli)
+    print(f"İşlem: {N:,} | Sembol: {K} | Gün: {gun_sayisi_}")
+    print(f"Tam yeniden oynatma: {(t1 - t0) * 1000:8.1f} ms ({len(tam):,} satır)")
+    print(f"Artımlı (1 gün):     {(t3 - t2) * 1000:8.1f} ms ({len(artimli)} satır)")
+    print(f"Son gün farkı:       {fark:.6f}")
@@ -2,8 +2,11 @@
 Finans Asistanı - Utility Modülleri
 """
 
-from .logger import setup_logger, main_logger, info, warning, error, debug
+from .logger import setup_logger, main_logger, info, warning, error, debug, init_request_logging, flush_logs
 from .rate_limiter import rate_limited, acquire, status, RateLimiter
+from .db_pool import ConnectionPool, PoolTimeoutError
+from .env import load_env
+from .compression import init_compression
 
 __all__ = [
     "setup_logger",
@@ -12,8 +15,14 @@ __all__ = [
     "warning", 
     "error", 
     "debug",
+    "init_request_logging",
+    "flush_logs",
     "rate_limited",
     "acquire",
     "status",
-    "RateLimiter"
+    "RateLimiter",
+    "ConnectionPool",
+    "PoolTimeoutError",
+    "load_env",
+    "init_compression"
 ]
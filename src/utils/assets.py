@@ -0,0 +1,193 @@
+"""
+Statik Dosyalar - Küçültme, paketleme ve içerik hash'li dosya adları
+
+Derleme adımı (src dizininden):
+    python -m utils.assets            # web/static/dist/ altına yazar
+    python -m utils.assets --check    # dist güncel değilse çıkış kodu 1
+
+CSS ve JS dosyaları küçültülür, ortak scriptler tek pakette birleştirilir,
+dosya adlarına içerik hash'i eklenir ve manifest.json yazılır. Her dosyanın
+yanına .gz (ve brotli kuruluysa .br) sıkıştırılmış kopyası bırakılır.
+
+Şablonlarda:
+    {% for url in asset_urls('js/core.js') %}<script src="{{ url }}"></script>{% endfor %}
+    <link rel="stylesheet" href="{{ asset_url('css/style.css') }}">
+
+Manifest yoksa (veya ASSETS_DEBUG=1 ise) kaynak dosyalar olduğu gibi kullanılır.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+STATIC_DIR = Path(__file__).resolve().parent.parent.parent / "web" / "static"
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST_FILE = DIST_DIR / "manifest.json"
+
+# Paket adı → kaynak dosyalar (static klasörüne göre, sırası önemli)
+BUNDLES = {
+    "css/style.css": ["css/style.css"],
+    "js/core.js": ["js/common.js", "js/chatbot.js", "js/theme.js"],
+    "js/dashboard.js": ["js/dashboard.js"],
+    "js/portfolio.js": ["js/portfolio.js"],
+    "js/market.js": ["js/market.js"],
+    "js/history.js": ["js/history.js"],
+}
+
+# Hash'li dosyalar içerikleri değişince adları da değiştiği için süresiz önbelleklenir
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+# ============================================================
+# DERLEME
+# ============================================================
+
+def _minify(source: str, kind: str) -> str:
+    if kind == "css":
+        import rcssmin
+        return rcssmin.cssmin(source)
+    import rjsmin
+    return rjsmin.jsmin(source)
+
+
+def build_bundle(files: List[str]) -> bytes:
+    """Kaynak dosyaları küçültüp tek gövdede birleştir"""
+    kind = "css" if files[0].endswith(".css") else "js"
+    parts = [_minify((STATIC_DIR / f).read_text(encoding="utf-8"), kind) for f in files]
+    # Ayrı scriptler birleşince ifadeler birbirine karışmasın
+    separator = "\n" if kind == "css" else ";\n"
+    return separator.join(parts).encode("utf-8")
+
+
+def hashed_name(name: str, body: bytes) -> str:
+    """css/style.css → style.<hash>.css"""
+    stem, ext = os.path.splitext(os.path.basename(name))
+    return f"{stem}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+
+
+def build(dist_dir: Path = DIST_DIR, write: bool = True) -> Dict[str, str]:
+    """
+    Tüm paketleri derle.
+
+    Returns:
+        Manifest: paket adı → static klasörüne göre hash'li yol
+    """
+    outputs = {}
+    for name, files in BUNDLES.items():
+        body = build_bundle(files)
+        outputs[name] = (hashed_name(name, body), body)
+    manifest = {name: f"dist/{filename}" for name, (filename, _) in outputs.items()}
+    if not write:
+        return manifest
+
+    try:
+        import brotli
+    except ImportError:  # opsiyonel bağımlılık
+        brotli = None
+
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    keep = {"manifest.json"}
+    for filename, body in outputs.values():
+        (dist_dir / filename).write_bytes(body)
+        # mtime=0: aynı girdi her derlemede aynı .gz çıktısını üretir
+        (dist_dir / f"{filename}.gz").write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+        keep.update({filename, f"{filename}.gz"})
+        if brotli is not None:
+            (dist_dir / f"{filename}.br").write_bytes(brotli.compress(body, quality=11))
+            keep.add(f"{filename}.br")
+
+    # Eski derlemelerden kalan dosyaları temizle
+    for path in dist_dir.iterdir():
+        if path.name not in keep:
+            path.unlink()
+
+    (dist_dir / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n",
+                                            encoding="utf-8")
+    return manifest
+
+
+def load_manifest(path: Path = MANIFEST_FILE) -> Dict[str, str]:
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# ============================================================
+# FLASK ENTEGRASYONU
+# ============================================================
+
+def init_assets(app, manifest: Dict[str, str] = None):
+    """
+    Şablonlara asset_url/asset_urls yardımcılarını ekle ve hash'li dosyaları
+    süresiz önbellek başlığı ve hazır sıkıştırılmış kopyalarıyla sun.
+    """
+    from flask import request, send_from_directory, url_for
+    from .compression import choose_encoding
+
+    if manifest is None:
+        manifest = {} if os.environ.get("ASSETS_DEBUG") == "1" else load_manifest()
+    if not manifest:
+        app.logger.info("ℹ️ Asset manifest bulunamadı, kaynak dosyalar kullanılıyor")
+
+    def asset_urls(name: str) -> List[str]:
+        if name in manifest:
+            return [url_for("static", filename=manifest[name])]
+        return [url_for("static", filename=f) for f in BUNDLES.get(name, [name])]
+
+    def asset_url(name: str) -> str:
+        return asset_urls(name)[0]
+
+    app.add_template_global(asset_urls)
+    app.add_template_global(asset_url)
+
+    @app.route("/static/dist/<path:filename>")
+    def static_dist(filename):
+        encoding = choose_encoding(request.accept_encodings)
+        suffix = {"br": ".br", "gzip": ".gz"}.get(encoding)
+        mimetype = "text/css" if filename.endswith(".css") else "text/javascript"
+
+        if suffix and (DIST_DIR / f"{filename}{suffix}").is_file():
+            response = send_from_directory(DIST_DIR, f"{filename}{suffix}", mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+        else:
+            response = send_from_directory(DIST_DIR, filename, mimetype=mimetype)
+        response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        return response
+
+    return asset_urls
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Statik dosya derlemesi")
+    parser.add_argument("--check", action="store_true", help="dist güncel mi kontrol et, yazma")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        expected = build(write=False)
+        if expected != load_manifest():
+            print("❌ web/static/dist güncel değil: python -m utils.assets çalıştırın")
+            return 1
+        print("✅ web/static/dist güncel")
+        return 0
+
+    manifest = build()
+    total_src = total_out = total_gz = 0
+    print(f"{'Paket':20} {'kaynak B':>10} {'küçük B':>10} {'gzip B':>8}  dosya")
+    for name, path in manifest.items():
+        src = sum((STATIC_DIR / f).stat().st_size for f in BUNDLES[name])
+        out = (STATIC_DIR / path).stat().st_size
+        gz = (STATIC_DIR / f"{path}.gz").stat().st_size
+        total_src, total_out, total_gz = total_src + src, total_out + out, total_gz + gz
+        print(f"{name:20} {src:10} {out:10} {gz:8}  {path}")
+    print(f"{'Toplam':20} {total_src:10} {total_out:10} {total_gz:8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
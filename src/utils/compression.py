@@ -0,0 +1,86 @@
+"""
+Yanıt Sıkıştırma - Accept-Encoding'e göre brotli/gzip
+
+Belirli boyutun üzerindeki metin yanıtları (JSON, HTML, CSS, JS) istemcinin
+desteklediği en iyi kodlamayla sıkıştırılır. brotli paketi kurulu değilse
+sadece gzip kullanılır. Akış (streaming) yanıtlarına ve dosya yanıtlarına
+dokunulmaz.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # opsiyonel bağımlılık
+    brotli = None
+
+# Bu boyutun altındaki gövdeler sıkıştırılmaz (başlık maliyeti kazançtan fazla)
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", 5))
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "image/svg+xml",
+}
+
+
+def choose_encoding(accept_encoding) -> str:
+    """
+    İstemcinin kabul ettiği kodlamalardan en iyisini seç.
+
+    Args:
+        accept_encoding: request.accept_encodings (werkzeug MIMEAccept)
+    """
+    if brotli is not None and accept_encoding["br"] > 0:
+        return "br"
+    if accept_encoding["gzip"] > 0:
+        return "gzip"
+    return ""
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Gövdeyi verilen kodlamayla sıkıştır"""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def init_compression(app, min_size: int = COMPRESS_MIN_SIZE):
+    """Uygulamaya sıkıştırma after_request kancasını ekle"""
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        # Sıkıştırılmış gövde bayt bayt aynı değil: ETag zayıf olarak işaretlenir
+        # (If-None-Match karşılaştırması zayıf yapıldığı için 304 çalışmaya devam eder)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress_response
@@ -0,0 +1,271 @@
+"""
+Connection Pool - Thread-safe veritabanı bağlantı havuzu
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger("ConnectionPool")
+
+
+class PoolTimeoutError(Exception):
+    """Belirlenen sürede boş bağlantı bulunamadı"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe bağlantı havuzu.
+
+    - Havuz doluysa hata fırlatmak yerine `timeout` saniye boyunca bekler
+    - Checkout sırasında bağlantının sağlığını kontrol eder (kapanmış veya
+      Supabase/PgBouncer tarafından düşürülmüş bağlantıları yeniler)
+    - İade edilen bağlantıdaki açık transaction'ı geri alır; böylece
+      PgBouncer transaction modunda sunucu bağlantısı hemen serbest kalır
+    - Checkout bekleme süresi, kullanımdaki bağlantı ve hata metrikleri tutar
+    """
+
+    def __init__(self, connect: Callable, minconn: int = 1, maxconn: int = 5,
+                 timeout: float = 10.0, health_check_interval: float = 30.0):
+        """
+        Args:
+            connect: Yeni bağlantı açan fonksiyon
+            minconn: Başlangıçta açılacak bağlantı sayısı
+            maxconn: Aynı anda açık olabilecek en fazla bağlantı
+            timeout: Boş bağlantı için en fazla bekleme süresi (saniye)
+            health_check_interval: Bu süreden uzun boşta kalan bağlantılar
+                checkout'ta `SELECT 1` ile doğrulanır (0 = her checkout'ta)
+        """
+        self._connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = Condition()
+        self._idle = deque()          # (bağlantı, boşa çıkma zamanı)
+        self._in_use = set()
+        self._size = 0
+        self._closed = False
+
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "health_check_failures": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+        for _ in range(minconn):
+            self._idle.append((self._new_connection(), time.monotonic()))
+
+    def _new_connection(self):
+        """Yeni bağlantı aç ve havuz boyutunu artır"""
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._metrics["errors"] += 1
+            raise
+        with self._cond:
+            self._size += 1
+        return conn
+
+    @staticmethod
+    def _is_closed(conn) -> bool:
+        return bool(getattr(conn, "closed", False))
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        """Bağlantı kullanılabilir mi?"""
+        if self._is_closed(conn):
+            return False
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        """Bozuk bağlantıyı kapat ve havuz boyutundan düş"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Havuzdan bağlantı al.
+
+        Args:
+            timeout: Bekleme süresi (verilmezse havuz varsayılanı)
+
+        Raises:
+            PoolTimeoutError: Süre dolduğunda boş bağlantı yoksa
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            conn = None
+            idle_since = None
+            create = False
+
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Bağlantı havuzu kapatılmış")
+
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        logger.warning(f"⏳ Bağlantı havuzu dolu: {timeout}s içinde boş bağlantı bulunamadı")
+                        raise PoolTimeoutError(f"{timeout}s içinde boş bağlantı bulunamadı")
+                    waited = True
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                else:
+                    # Yer ayır; bağlantı kilit dışında açılır
+                    self._size += 1
+                    create = True
+
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._metrics["errors"] += 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn, idle_since):
+                with self._cond:
+                    self._metrics["health_check_failures"] += 1
+                logger.warning("🔌 Düşmüş veritabanı bağlantısı yenileniyor")
+                self._discard(conn)
+                continue
+
+            wait_time = time.monotonic() - start
+            with self._cond:
+                self._in_use.add(conn)
+                self._metrics["checkouts"] += 1
+                self._metrics["wait_time_total"] += wait_time
+                self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], wait_time)
+                if waited:
+                    self._metrics["waits"] += 1
+            return conn
+
+    def putconn(self, conn, close: bool = False):
+        """
+        Bağlantıyı havuza iade et.
+        Aynı bağlantının ikinci kez iadesi sessizce yok sayılır.
+        """
+        with self._cond:
+            if conn not in self._in_use:
+                return
+            self._in_use.discard(conn)
+
+        if close or self._closed or self._is_closed(conn):
+            self._discard(conn)
+            return
+
+        try:
+            # Yarım kalan transaction'ı kapat (PgBouncer transaction modu)
+            conn.rollback()
+        except Exception:
+            with self._cond:
+                self._metrics["errors"] += 1
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """with bloğu için bağlantı al/iade et"""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        """Tüm bağlantıları kapat"""
+        with self._cond:
+            self._closed = True
+            conns = [c for c, _ in self._idle] + list(self._in_use)
+            self._idle.clear()
+            self._in_use.clear()
+            self._size = 0
+            self._cond.notify_all()
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        """Havuz metrikleri"""
+        with self._cond:
+            m = dict(self._metrics)
+            checkouts = m["checkouts"]
+            return {
+                "size": self._size,
+                "max_size": self.maxconn,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "waits": m["waits"],
+                "timeouts": m["timeouts"],
+                "errors": m["errors"],
+                "health_check_failures": m["health_check_failures"],
+                "avg_wait_ms": round(m["wait_time_total"] / checkouts * 1000, 3) if checkouts else 0.0,
+                "max_wait_ms": round(m["wait_time_max"] * 1000, 3),
+            }
+
+
+if __name__ == "__main__":
+    # Test
+    import threading
+    logging.basicConfig(level=logging.DEBUG)
+
+    class FakeConn:
+        closed = 0
+        def cursor(self): return self
+        def execute(self, sql): pass
+        def fetchone(self): return (1,)
+        def rollback(self): pass
+        def close(self): self.closed = 1
+
+    p = ConnectionPool(FakeConn, minconn=1, maxconn=3, timeout=2)
+
+    def worker():
+        with p.connection() as conn:
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print("Durum:", p.stats())
@@ -0,0 +1,28 @@
+"""
+Ortam Değişkenleri - .env dosyasını (varsa) bir kez yükler
+"""
+
+import os
+from pathlib import Path
+
+# Aranan konumlar: çalışma dizini ve proje kökü
+_ENV_PATHS = [Path.cwd() / ".env", Path(__file__).resolve().parent.parent.parent / ".env"]
+_loaded = False
+
+
+def load_env():
+    """
+    .env dosyasını ortam değişkenlerine yükle.
+    Dosya yoksa (Vercel gibi ortam değişkenlerinin panelden geldiği
+    kurulumlarda) python-dotenv import edilmez.
+    """
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+
+    for path in _ENV_PATHS:
+        if path.is_file():
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
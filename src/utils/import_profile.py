@@ -0,0 +1,142 @@
+"""
+Import Profili - Soğuk başlangıç (cold start) maliyetini ölçer
+
+`python -X importtime` çıktısını modül bazında özetler ve her ölçümü
+geçmiş dosyasına ekler; böylece import süresindeki artışlar zamanla izlenir.
+
+Kullanım (src dizininden):
+    python -m utils.import_profile                 # web_app, 5 ölçüm
+    python -m utils.import_profile --target database --runs 10
+    python -m utils.import_profile --budget-ms 400 # bütçe aşılırsa çıkış kodu 1
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+HISTORY_FILE = SRC_DIR.parent / "logs" / "import_time.jsonl"
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(target: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Hedef modülü yeni bir yorumlayıcıda import et.
+
+    Returns:
+        (modül, derinlik, self µs, kümülatif µs) listesi
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=SRC_DIR, capture_output=True, text=True, env=os.environ.copy()
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{target} import edilemedi:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cum_us, indent, name = m.groups()
+            rows.append((name, (len(indent) - 1) // 2, int(self_us), int(cum_us)))
+    return rows
+
+
+def summarize(runs: List[List[Tuple[str, int, int, int]]], target: str, top: int) -> Dict:
+    """Ölçümlerin medyanı: toplam süre, hedefin doğrudan bağımlılıkları, en pahalı modüller"""
+    totals, direct, self_times = [], {}, {}
+    for rows in runs:
+        total = next((cum for name, _, _, cum in rows if name == target), 0)
+        totals.append(total)
+        # Hedefin hemen altındaki (bir seviye içerideki) importlar
+        target_depth = next((d for name, d, _, _ in rows if name == target), 0)
+        for name, depth, self_us, cum_us in rows:
+            if depth == target_depth + 1:
+                direct.setdefault(name, []).append(cum_us)
+            self_times.setdefault(name, []).append(self_us)
+
+    median_ms = lambda values: round(statistics.median(values) / 1000, 1)
+    return {
+        "toplam_ms": median_ms(totals),
+        "dogrudan": dict(sorted(
+            ((name, median_ms(v)) for name, v in direct.items()), key=lambda x: -x[1]
+        )[:top]),
+        "en_pahali": dict(sorted(
+            ((name, median_ms(v)) for name, v in self_times.items()), key=lambda x: -x[1]
+        )[:top]),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _last_record(path: Path, target: str):
+    if not path.exists():
+        return None
+    last = None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("hedef") == target:
+            last = record
+    return last
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import süresi profili")
+    parser.add_argument("--target", default="web_app", help="Ölçülecek modül")
+    parser.add_argument("--runs", type=int, default=5, help="Ölçüm sayısı (medyan alınır)")
+    parser.add_argument("--top", type=int, default=10, help="Listelenecek modül sayısı")
+    parser.add_argument("--history", default=str(HISTORY_FILE), help="Geçmiş dosyası (JSON lines)")
+    parser.add_argument("--no-history", action="store_true", help="Geçmişe kaydetme")
+    parser.add_argument("--budget-ms", type=float, help="Toplam süre bütçesi")
+    args = parser.parse_args(argv)
+
+    summary = summarize([measure(args.target) for _ in range(args.runs)], args.target, args.top)
+    history = Path(args.history)
+    previous = _last_record(history, args.target)
+
+    print(f"📦 {args.target} import süresi (medyan, {args.runs} ölçüm): {summary['toplam_ms']} ms", end="")
+    if previous:
+        delta = summary["toplam_ms"] - previous["toplam_ms"]
+        print(f"  (önceki {previous.get('commit') or '?'}: {previous['toplam_ms']} ms, {delta:+.1f} ms)")
+    else:
+        print()
+
+    print("\nDoğrudan importlar (kümülatif ms):")
+    for name, ms in summary["dogrudan"].items():
+        print(f"  {name:40} {ms:8.1f}")
+    print("\nEn pahalı modüller (self ms):")
+    for name, ms in summary["en_pahali"].items():
+        print(f"  {name:40} {ms:8.1f}")
+
+    if not args.no_history:
+        history.parent.mkdir(parents=True, exist_ok=True)
+        record = {"tarih": datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+                  "hedef": args.target, "python": sys.version.split()[0], **summary}
+        with history.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if args.budget_ms is not None and summary["toplam_ms"] > args.budget_ms:
+        print(f"\n❌ Bütçe aşıldı: {summary['toplam_ms']} ms > {args.budget_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
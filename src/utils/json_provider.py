@@ -0,0 +1,103 @@
+"""
+JSON Sağlayıcı - Flask için hızlı JSON serileştirme
+
+orjson kuruluysa jsonify/response ve request.json onunla çalışır; kurulu
+değilse Flask'ın varsayılan (stdlib json) sağlayıcısı kullanılır.
+Tarih, Decimal, UUID gibi tipler Flask'taki biçimleriyle aynı çıkar.
+"""
+
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # opsiyonel bağımlılık
+    orjson = None
+
+logger = logging.getLogger("JSONProvider")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    orjson tabanlı JSON sağlayıcısı.
+    Yanıt gövdesi doğrudan bytes olarak üretilir (str'ye çevrilmez).
+    Anahtarlar sıralanmaz; sort_keys=True verilirse sıralanır.
+    """
+
+    sort_keys = False
+
+    def _options(self, indent: bool = False) -> int:
+        # datetime/date Flask'taki gibi HTTP tarih biçimine, sözlükteki
+        # str olmayan anahtarlar str'ye çevrilir
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options(bool(kwargs.get("indent")))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default,
+                            option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app) -> str:
+    """
+    Uygulamaya en hızlı uygun JSON sağlayıcısını kaydet.
+
+    Returns:
+        Kullanılan sağlayıcının adı ("orjson" veya "json")
+    """
+    if orjson is None:
+        logger.info("ℹ️ orjson kurulu değil, standart json kullanılıyor")
+        return "json"
+    app.json_provider_class = OrjsonProvider
+    app.json = OrjsonProvider(app)
+    return "orjson"
+
+
+if __name__ == "__main__":
+    # Benchmark: örnek portföyde JSON serileştirme süresi ve yanıt boyutları
+    #   DATABASE_URL=sqlite:///:memory: python -m utils.json_provider   (src dizininden)
+    import json
+    import random
+    import time
+
+    import web_app
+    from utils import compression
+
+    random.seed(42)
+    SEMBOLLER = [f"S{i:02d}" for i in range(40)]
+    web_app.get_price_for_symbol = lambda s: {"success": True, "symbol": s, "price": 12.5, "change_percent": 1.2}
+    pdb = web_app.get_db()
+    for _ in range(300):
+        pdb.ekle(random.choice(SEMBOLLER), random.randint(1, 50), round(random.uniform(5, 500), 2))
+
+    client = web_app.app.test_client()
+    endpoints = ["/api/history", "/api/portfolio/performance"]
+    payloads = {url: client.get(url).get_json() for url in endpoints}
+
+    def olc(fn, obj, tekrar=500):
+        t = time.perf_counter()
+        for _ in range(tekrar):
+            fn(obj)
+        return (time.perf_counter() - t) / tekrar * 1e6
+
+    print(f"{'Endpoint':30} {'json µs':>9} {'orjson µs':>10} {'ham B':>8} {'gzip B':>8} {'br B':>8}")
+    for url, obj in payloads.items():
+        std = olc(lambda o: json.dumps(o, ensure_ascii=False).encode(), obj)
+        hizli = olc(orjson.dumps, obj) if orjson else float("nan")
+        ham = client.get(url, headers={"Accept-Encoding": "identity"}).data
+        gz = client.get(url, headers={"Accept-Encoding": "gzip"}).data
+        br = client.get(url, headers={"Accept-Encoding": "br"}).data if compression.brotli else b""
+        print(f"{url:30} {std:9.0f} {hizli:10.0f} {len(ham):8} {len(gz):8} {len(br) or '-':>8}")
@@ -1,14 +1,34 @@
 """
 Finans Asistanı - Profesyonel Logging Sistemi
+
+Ortam değişkenleri:
+    LOG_LEVEL   → setup_logger'a verilen seviyeyi ezer (DEBUG, INFO, ...)
+    LOG_FORMAT  → text (renkli konsol, varsayılan) | json (satır başına bir JSON kaydı)
+    LOG_ASYNC   → 1 (varsayılan, Vercel'de 0): kayıtlar kuyruğa yazılır, konsol/dosya
+                  yazımını arka plandaki tek bir thread yapar; 0: istek thread'inde senkron yazım
+    LOG_SAMPLE  → Logger bazlı DEBUG örnekleme oranı, ör. "WebAPI=0.1,PortfolioDB=0.5"
+                  (0.1 → her 10 debug satırından biri yazılır)
+
+Ayarlar .env yüklendikten sonra, her setup_logger çağrısında okunur.
 """
 
+import atexit
+import contextvars
+import json
 import logging
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
+import uuid
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
 
 import os
+
+from .env import load_env
+
 # Log dosyası konumu
 if os.environ.get("VERCEL") or os.environ.get("VERCEL_REGION"):
     LOG_DIR = Path("/tmp")
@@ -16,6 +36,7 @@ else:
     LOG_DIR = Path(__file__).parent.parent.parent / "logs"
     LOG_DIR.mkdir(exist_ok=True)
 
+
 # Renkli terminal çıktısı için ANSI kodları
 class Colors:
     RESET = "\033[0m"
@@ -28,9 +49,18 @@ class Colors:
     GRAY = "\033[90m"
 
 
+LEVEL_EMOJI = {
+    logging.DEBUG: "🔍",
+    logging.INFO: "ℹ️",
+    logging.WARNING: "⚠️",
+    logging.ERROR: "❌",
+    logging.CRITICAL: "💀",
+}
+
+
 class ColoredFormatter(logging.Formatter):
     """Renkli log formatter - terminal için"""
-    
+
     LEVEL_COLORS = {
         logging.DEBUG: Colors.GRAY,
         logging.INFO: Colors.GREEN,
@@ -38,64 +68,211 @@ class ColoredFormatter(logging.Formatter):
         logging.ERROR: Colors.RED,
         logging.CRITICAL: Colors.MAGENTA,
     }
-    
+
     def format(self, record):
         # Seviyeye göre renk seç
         color = self.LEVEL_COLORS.get(record.levelno, Colors.RESET)
-        
-        # Zaman formatı
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
+
+        # Zaman: kaydın oluşturulduğu an (arka plan thread'inde yazılsa da)
+        timestamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+
         # Log mesajını formatla
         level_short = record.levelname[0]  # I, W, E, D, C
-        
-        # Emoji ekle
-        emoji = {
-            logging.DEBUG: "🔍",
-            logging.INFO: "ℹ️",
-            logging.WARNING: "⚠️",
-            logging.ERROR: "❌",
-            logging.CRITICAL: "💀",
-        }.get(record.levelno, "")
-        
+        emoji = LEVEL_EMOJI.get(record.levelno, "")
+
         formatted = f"{Colors.GRAY}{timestamp}{Colors.RESET} {color}[{level_short}]{Colors.RESET} {emoji} {record.getMessage()}"
-        
+
         return formatted
 
 
 class FileFormatter(logging.Formatter):
     """Dosya için log formatter - renksiz, detaylı"""
-    
+
     def format(self, record):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
         return f"{timestamp} | {record.levelname:8} | {record.name:20} | {record.getMessage()}"
 
 
-def setup_logger(name: str = "FinansAsistan", level: int = logging.INFO) -> logging.Logger:
+class JsonFormatter(logging.Formatter):
+    """Satır başına bir JSON kaydı (log toplama servisleri için)"""
+
+    # Kayda extra= veya istek bağlamından eklenen alanlar
+    FIELDS = ("request_id", "route", "method", "status", "latency_ms")
+
+    def format(self, record):
+        data = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+                  + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+# ============================================================
+# İSTEK BAĞLAMI & ÖRNEKLEME
+# ============================================================
+
+# Aktif isteğin kimliği ve route'u (istek dışında None)
+_request_context: contextvars.ContextVar = contextvars.ContextVar("log_request", default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    """Kayda aktif isteğin request_id ve route bilgisini ekle (kaydı üreten thread'de çalışır)"""
+
+    def filter(self, record):
+        context = _request_context.get()
+        if context and not hasattr(record, "request_id"):
+            record.request_id, record.route = context
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    INFO altındaki kayıtların sadece belirli oranını geçir.
+    Sayaç tabanlıdır: oran 0.1 ise her 10 kayıttan ilki yazılır.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._count = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.INFO:
+            return True
+        if not self.every:
+            return False
+        self._count += 1
+        return (self._count - 1) % self.every == 0
+
+
+def _sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+def log_settings() -> Dict:
+    """LOG_* ayarları (.env dosyası yüklendikten sonra okunur)"""
+    load_env()
+    on_vercel = bool(os.environ.get("VERCEL") or os.environ.get("VERCEL_REGION"))
+    level = logging.getLevelName(os.environ.get("LOG_LEVEL", "").upper())   # tanımsızsa str döner
+    return {
+        "level": level if isinstance(level, int) else None,
+        "format": os.environ.get("LOG_FORMAT", "text").lower(),
+        # Serverless'ta istek bitince süreç donar; kuyrukta kalan kayıtlar kaybolabilir
+        "async": os.environ.get("LOG_ASYNC", "0" if on_vercel else "1") != "0",
+        "sample": _sample_rates(os.environ.get("LOG_SAMPLE", "")),
+    }
+
+
+# ============================================================
+# ASENKRON YAZIM
+# ============================================================
+
+class _Dispatcher(logging.Handler):
+    """Kuyruktan gelen kaydı, logger adına kayıtlı handler'lara iletir"""
+
+    def __init__(self):
+        super().__init__()
+        self.routes: Dict[str, list] = {}
+
+    def handle(self, record):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """
+    Mesajı kayıt anında (args ile) birleştirir ama formatlamayı yazıcı
+    thread'e bırakır; extra alanlar korunur, exception metne çevrilir.
+    """
+
+    def prepare(self, record):
+        # Kayıt kopyalanmaz: logger'ın tek handler'ı bu ve propagate kapalı
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Traceback nesneleri thread'ler arası taşınmadan önce metne çevrilir
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_dispatcher = _Dispatcher()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _start_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_queue, _dispatcher)
+            _listener.start()
+            atexit.register(flush_logs)
+
+
+def flush_logs():
+    """Kuyruktaki kayıtları yaz ve yazıcı thread'i durdur (çıkışta otomatik)"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def setup_logger(name: str = "FinansAsistan", level: int = logging.INFO,
+                 asynchronous: Optional[bool] = None) -> logging.Logger:
     """
     Logger'ı yapılandır ve döndür.
-    
+
     Args:
         name: Logger adı
         level: Log seviyesi (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-    
+        asynchronous: Kuyruk + arka plan yazıcı kullan (verilmezse LOG_ASYNC)
+
     Returns:
         Yapılandırılmış logger nesnesi
     """
     logger = logging.getLogger(name)
-    
+
     # Zaten yapılandırılmışsa tekrar yapma
     if logger.handlers:
         return logger
-    
+
+    settings = log_settings()
+    if settings["level"] is not None:
+        level = settings["level"]
+    json_format = settings["format"] == "json"
     logger.setLevel(level)
-    
-    # 1. Konsol Handler (Renkli)
+
+    # 1. Konsol Handler (Renkli veya JSON)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
-    console_handler.setFormatter(ColoredFormatter())
-    logger.addHandler(console_handler)
-    
+    console_handler.setFormatter(JsonFormatter() if json_format else ColoredFormatter())
+
     # 2. Dosya Handler (Rotating - max 5MB, 3 yedek)
     log_file = LOG_DIR / f"{name.lower()}.log"
     file_handler = RotatingFileHandler(
@@ -105,17 +282,67 @@ def setup_logger(name: str = "FinansAsistan", level: int = logging.INFO) -> logg
         encoding="utf-8"
     )
     file_handler.setLevel(logging.DEBUG)  # Dosyaya her şeyi yaz
-    file_handler.setFormatter(FileFormatter())
-    logger.addHandler(file_handler)
-    
+    file_handler.setFormatter(JsonFormatter() if json_format else FileFormatter())
+
+    if settings["async"] if asynchronous is None else asynchronous:
+        # İstek thread'i sadece kuyruğa ekler; yazımı arka plan thread'i yapar
+        _dispatcher.routes[name] = [console_handler, file_handler]
+        queue_handler = _PreparedQueueHandler(_queue)
+        queue_handler.addFilter(RequestContextFilter())
+        logger.addHandler(queue_handler)
+        _start_listener()
+    else:
+        for handler in (console_handler, file_handler):
+            handler.addFilter(RequestContextFilter())
+            logger.addHandler(handler)
+
+    # Gürültülü debug satırları için örnekleme (kuyruğa girmeden elenir)
+    if name in settings["sample"]:
+        logger.addFilter(SamplingFilter(settings["sample"][name]))
+
     # Propagation'ı kapat (üst logger'a iletme)
     logger.propagate = False
-    
+
     logger.info(f"Logger başlatıldı: {name}")
-    
+
     return logger
 
 
+def init_request_logging(app, logger_name: str = "Access"):
+    """
+    Her isteğe request_id ata (X-Request-Id başlığı varsa o kullanılır) ve
+    yanıta ekle. JSON modunda her istek için route, durum ve süreyi içeren
+    bir erişim kaydı yazılır.
+    """
+    from flask import g, request
+
+    access = setup_logger(logger_name) if log_settings()["format"] == "json" else None
+
+    @app.before_request
+    def bind_request_id():
+        request_id = (request.headers.get("X-Request-Id") or uuid.uuid4().hex[:16])[:64]
+        route = request.url_rule.rule if request.url_rule else request.path
+        g._log_start = time.perf_counter()
+        g._log_token = _request_context.set((request_id, route))
+
+    @app.after_request
+    def log_request(response):
+        context = _request_context.get()
+        token = g.pop("_log_token", None)
+        if context is None or token is None:
+            return response
+        response.headers["X-Request-Id"] = context[0]
+        if access is not None:
+            latency = round((time.perf_counter() - g.pop("_log_start")) * 1000, 1)
+            access.info(f"{request.method} {request.path} {response.status_code}",
+                        extra={"method": request.method, "status": response.status_code,
+                               "latency_ms": latency})
+        _request_context.reset(token)
+        return response
+
+    return log_request
+
+
 # Ana logger instance
 main_logger = setup_logger("FinansAsistan")
 
@@ -135,3 +362,18 @@ if __name__ == "__main__":
     logger.warning("Bu bir uyarı mesajı")
     logger.error("Bu bir hata mesajı")
     logger.critical("Bu kritik bir mesaj")
+
+    # Benchmark: istek thread'inde log çağrısı başına maliyet (konsol çıktısı kapalı)
+    N = 20_000
+    for asenkron in (False, True):
+        bench = setup_logger(f"Bench{'Async' if asenkron else 'Sync'}", logging.INFO, asynchronous=asenkron)
+        handlers = _dispatcher.routes.get(bench.name, bench.handlers)
+        for h in list(handlers):
+            if type(h) is logging.StreamHandler:
+                handlers.remove(h) if asenkron else bench.removeHandler(h)
+        t = time.perf_counter()
+        for i in range(N):
+            bench.info("Fiyat güncellendi: %s = %s TL", "THYAO", i)
+        sure = (time.perf_counter() - t) / N * 1e6
+        print(f"{'asenkron' if asenkron else 'senkron':9} {sure:6.1f} µs/kayıt")
+    flush_logs()
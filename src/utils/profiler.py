@@ -0,0 +1,221 @@
+"""
+Profil Çıkarma - Tek bir isteği örnekleyici (sampling) profiler ile ölçer
+
+PROFILE_TOKEN tanımlı değilse hiçbir kanca ya da route eklenmez (sıfır maliyet).
+Tanımlıysa şu isteklerden biri profillenir:
+
+    curl -H "X-Profile: <anahtar>" https://.../api/portfolio/performance
+    https://.../api/dashboard?__profile=<anahtar>
+
+İstek süresince ayrı bir thread, isteği işleyen thread'in çağrı yığınını
+PROFILE_INTERVAL_MS aralıklarla örnekler. Sonuç iki formatta kaydedilir:
+    .speedscope.json  → https://www.speedscope.app adresinde açılır
+    .folded           → flamegraph.pl / inferno için katlanmış yığınlar
+
+Kayıtlar /debug/profiles adresinde listelenir (aynı anahtar gerekir).
+"""
+
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "/tmp/finans-profiles"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 2))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 20))
+
+SRC_DIR = str(Path(__file__).resolve().parent.parent)
+_SAFE_NAME = re.compile(r"^[\w.-]+$")
+
+
+class SamplingProfiler:
+    """Belirli bir thread'in çağrı yığınını arka planda periyodik olarak örnekler"""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()     # (kök → yaprak çerçeveler) → örnek sayısı
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[tuple(reversed(stack))] += 1
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(SRC_DIR):
+        filename = filename[len(SRC_DIR) + 1:]
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[-1]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+# ============================================================
+# ÇIKTI FORMATLARI
+# ============================================================
+
+def to_folded(samples: Counter) -> str:
+    """Katlanmış yığınlar: 'kök;...;yaprak <sayı>' (flamegraph.pl girdisi)"""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in samples.most_common())
+
+
+def to_speedscope(samples: Counter, name: str, interval: float) -> Dict:
+    """speedscope 'sampled' profil formatı (ağırlıklar milisaniye)"""
+    frames, index = [], {}
+    stacks, weights = [], []
+    for stack, count in samples.items():
+        ids = []
+        for label in stack:
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            ids.append(index[label])
+        stacks.append(ids)
+        weights.append(round(count * interval * 1000, 3))
+    total = sum(weights)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "milliseconds",
+            "startValue": 0, "endValue": total,
+            "samples": stacks, "weights": weights,
+        }],
+        "name": name,
+        "exporter": "finans-asistani",
+    }
+
+
+# ============================================================
+# KAYIT
+# ============================================================
+
+def save_profile(profiler: SamplingProfiler, method: str, path: str, status: int,
+                 directory: Path = PROFILE_DIR) -> str:
+    """Profili kaydet, eski kayıtları PROFILE_KEEP sınırına indir; kayıt adını döndür"""
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^\w]+", "_", path).strip("_")[:60] or "root"
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{method.lower()}-{slug}"
+    title = f"{method} {path} ({profiler.duration * 1000:.0f} ms)"
+
+    (directory / f"{name}.speedscope.json").write_text(
+        json.dumps(to_speedscope(profiler.samples, title, profiler.interval)), encoding="utf-8")
+    (directory / f"{name}.folded").write_text(to_folded(profiler.samples), encoding="utf-8")
+    (directory / f"{name}.meta.json").write_text(json.dumps({
+        "name": name, "method": method, "path": path, "status": status,
+        "duration_ms": round(profiler.duration * 1000, 1),
+        "samples": sum(profiler.samples.values()),
+        "interval_ms": profiler.interval * 1000,
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }), encoding="utf-8")
+
+    for old in list_profiles(directory)[PROFILE_KEEP:]:
+        for suffix in (".speedscope.json", ".folded", ".meta.json"):
+            (directory / f"{old['name']}{suffix}").unlink(missing_ok=True)
+    return name
+
+
+def list_profiles(directory: Path = PROFILE_DIR) -> List[Dict]:
+    """Kayıtlı profiller (en yeni önce)"""
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for meta in directory.glob("*.meta.json"):
+        try:
+            profiles.append(json.loads(meta.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda p: p["name"], reverse=True)
+
+
+# ============================================================
+# FLASK ENTEGRASYONU
+# ============================================================
+
+def init_profiling(app, token: Optional[str] = None) -> bool:
+    """
+    Anahtar verilmişse profil kancalarını ve /debug/profiles route'larını ekle.
+
+    Returns:
+        Profil modu etkin mi
+    """
+    token = token or os.environ.get("PROFILE_TOKEN")
+    if not token:
+        return False
+
+    from flask import abort, g, jsonify, request, send_from_directory, url_for
+
+    def authorized() -> bool:
+        given = request.headers.get("X-Profile") or request.args.get("__profile") or ""
+        return hmac.compare_digest(given.encode(), token.encode())
+
+    @app.before_request
+    def start_profile():
+        if request.path.startswith("/debug/profiles") or not authorized():
+            return
+        g._profiler = SamplingProfiler(threading.get_ident()).start()
+
+    @app.after_request
+    def finish_profile(response):
+        profiler = g.pop("_profiler", None)
+        if profiler is None:
+            return response
+        profiler.stop()
+        try:
+            name = save_profile(profiler, request.method, request.path, response.status_code)
+            response.headers["X-Profile-Id"] = name
+        except OSError as e:
+            app.logger.warning(f"⚠️ Profil kaydedilemedi: {e}")
+        return response
+
+    @app.route("/debug/profiles")
+    def debug_profiles():
+        """Kayıtlı profillerin listesi"""
+        if not authorized():
+            abort(404)
+        profiles = list_profiles()
+        for p in profiles:
+            p["speedscope"] = url_for("debug_profile_file", filename=f"{p['name']}.speedscope.json",
+                                      __profile=request.args.get("__profile"))
+            p["folded"] = url_for("debug_profile_file", filename=f"{p['name']}.folded",
+                                  __profile=request.args.get("__profile"))
+        return jsonify({"success": True, "profiles": profiles})
+
+    @app.route("/debug/profiles/<filename>")
+    def debug_profile_file(filename):
+        """Profil dosyasını indir"""
+        if not authorized() or not _SAFE_NAME.match(filename) or filename.endswith(".meta.json"):
+            abort(404)
+        return send_from_directory(PROFILE_DIR, filename, as_attachment=True)
+
+    app.logger.info("🔬 Profil modu etkin (X-Profile başlığı veya ?__profile=)")
+    return True
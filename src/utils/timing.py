@@ -0,0 +1,245 @@
+"""
+Zamanlama - İstek bazlı süre ölçümü (span), Server-Timing ve Prometheus metrikleri
+
+Kullanım:
+    from utils.timing import span, timed
+
+    with span("price.yahoo"):
+        ...
+
+    @timed("db.ekle")
+    def ekle(...): ...
+
+Bir istek sırasında ölçülen span'ler yanıtın Server-Timing başlığına
+eklenir (tarayıcı geliştirici araçlarında görünür). Tüm ölçümler ayrıca
+süre histogramlarında toplanır ve /metrics üzerinden Prometheus metin
+formatında okunur.
+
+Span listesi contextvars ile taşınır; thread havuzunda çalışan işlerin
+ölçümlerinin isteğe eklenmesi için fonksiyon propagate() ile sarılmalıdır.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Saniye cinsinden histogram sınırları (DB sorgusundan LLM çağrısına kadar)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Aktif isteğin span listesi: [(ad, süre sn), ...]; istek dışında None
+_spans: contextvars.ContextVar = contextvars.ContextVar("timing_spans", default=None)
+
+
+class Histogram:
+    """Thread-safe kümülatif histogram (Prometheus 'histogram' tipi)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # son eleman: +Inf
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.total
+
+
+class Registry:
+    """Metrik adı + etiketlere göre histogramlar"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, **labels) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram())
+                self._help.setdefault(name, help_text)
+        return hist
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, Dict[Tuple, float]]]] = None) -> str:
+        """
+        Prometheus metin formatı (0.0.4).
+
+        Args:
+            gauges: {metrik adı: (açıklama, {etiket demeti: değer})}
+        """
+        lines = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+            helps = dict(self._help)
+
+        current = None
+        for (name, labels), hist in items:
+            if name != current:
+                lines.append(f"# HELP {name} {helps[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                current = name
+            counts, total = hist.snapshot()
+            cumulative = 0
+            for bound, count in zip(hist.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+        for name, (help_text, values) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in values.items():
+                lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+registry = Registry()
+
+
+# ============================================================
+# SPAN'LER
+# ============================================================
+
+def record(name: str, seconds: float):
+    """Ölçümü histogram'a ve (varsa) aktif isteğin span listesine ekle"""
+    registry.histogram("finans_span_duration_seconds", "İşlem süresi (DB, fiyat kaynağı, LLM)",
+                       span=name).observe(seconds)
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(name: str):
+    """with bloğunun süresini ölç (hata olsa bile kaydedilir)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator: fonksiyonun her çağrısını span olarak ölç"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Fonksiyonu çağıranın context'iyle sar (executor.submit/map için).
+    Böylece worker thread'deki span'ler de aynı isteğe yazılır.
+    """
+    context = contextvars.copy_context()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Aynı Context nesnesine iki thread aynı anda giremez → her çağrıda kopya
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def server_timing(spans: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """
+    Span'leri Server-Timing başlığına çevir.
+    Aynı adlı span'ler toplanır; birden fazlaysa adet desc olarak eklenir.
+    """
+    grouped: Dict[str, List[float]] = {}
+    for name, seconds in spans:
+        grouped.setdefault(name, []).append(seconds)
+
+    parts = []
+    for name, values in grouped.items():
+        part = f"{name};dur={sum(values) * 1000:.1f}"
+        if len(values) > 1:
+            part += f';desc="{len(values)}x"'
+        parts.append(part)
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+# ============================================================
+# FLASK ENTEGRASYONU
+# ============================================================
+
+def init_timing(app):
+    """
+    Her isteğe span listesi aç; yanıta Server-Timing başlığını ekle ve
+    istek süresini endpoint/method/status etiketli histograma yaz.
+
+    after_request kancaları ters sırada çalıştığı için diğer kancalardan
+    (ör. sıkıştırma) önce çağrılmalıdır; böylece onların süresi de ölçülür.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_timing():
+        g._timing_start = time.perf_counter()
+        g._timing_token = _spans.set([])
+
+    @app.after_request
+    def finish_timing(response):
+        start = g.pop("_timing_start", None)
+        token = g.pop("_timing_token", None)
+        if start is None:
+            return response
+
+        total = time.perf_counter() - start
+        spans = _spans.get() or []
+        if token is not None:
+            _spans.reset(token)
+
+        response.headers["Server-Timing"] = server_timing(spans, total)
+        endpoint = request.url_rule.endpoint if request.url_rule else "unmatched"
+        registry.histogram("finans_http_request_duration_seconds", "HTTP istek süresi",
+                           endpoint=endpoint, method=request.method,
+                           status=str(response.status_code)).observe(total)
+        return response
+
+    return finish_timing
+
+
+if __name__ == "__main__":
+    # Span başına ek maliyet (istek içinde ve dışında)
+    N = 100_000
+
+    def olc(n=N):
+        t = time.perf_counter()
+        for _ in range(n):
+            with span("bench"):
+                pass
+        return (time.perf_counter() - t) / n * 1e6
+
+    disarida = olc()
+    token = _spans.set([])
+    iceride = olc()
+    header = server_timing(_spans.get())
+    _spans.reset(token)
+    print(f"span maliyeti: istek dışı {disarida:.2f} µs, istek içi {iceride:.2f} µs")
+    print(f"Server-Timing: {header[:60]}")
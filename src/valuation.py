@@ -0,0 +1,253 @@
+"""
+Finans Asistanı - Lot Bazlı Değerleme Motoru
+Açık alış lotlarını NumPy kolon dizilerine yükleyip vektörel değerleme yapar
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("Valuation")
+
+# Kullanıcı başına son yüklenen lot dizileri: {user_id: (etag, diziler)}
+# Portföy versiyonu değişmedikçe diziler yeniden oluşturulmaz; en uzun
+# süredir kullanılmayan kullanıcı önce çıkarılır.
+MAX_CACHED_USERS = 256
+_arrays_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_arrays_lock = Lock()
+
+
+def build_lot_arrays(lots: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    getir_detayli() çıktısını kolon dizilerine çevir.
+
+    Returns:
+        {
+            "id", "adet", "alis_fiyati": sayısal diziler,
+            "tarih": datetime64[D] dizisi (tarihi olmayan lot = NaT),
+            "semboller": tekil sembol listesi (sıralı),
+            "sembol_idx": her lotun semboller içindeki indeksi
+        }
+    """
+    n = len(lots)
+    semboller, sembol_idx = np.unique(
+        np.array([lot["sembol"] for lot in lots], dtype=str), return_inverse=True
+    )
+
+    return {
+        "id": np.fromiter((lot["id"] for lot in lots), dtype=np.int64, count=n),
+        "adet": np.fromiter((lot["adet"] for lot in lots), dtype=np.float64, count=n),
+        "alis_fiyati": np.fromiter((lot["alis_fiyati"] for lot in lots), dtype=np.float64, count=n),
+        "tarih": np.array([(lot["tarih"] or "NaT")[:10] for lot in lots], dtype="datetime64[D]"),
+        "semboller": semboller.tolist(),
+        "sembol_idx": sembol_idx.astype(np.int64),
+    }
+
+
+def load_lot_arrays(pdb) -> Dict[str, np.ndarray]:
+    """Kullanıcının lotlarını dizilere yükle (portföy versiyonu başına bir kez)"""
+    etag = pdb.etag()
+    with _arrays_lock:
+        cached = _arrays_cache.get(pdb.user_id)
+        if cached and cached[0] == etag:
+            _arrays_cache.move_to_end(pdb.user_id)
+            return cached[1]
+
+    arrays = build_lot_arrays(pdb.getir_detayli())
+
+    with _arrays_lock:
+        _arrays_cache[pdb.user_id] = (etag, arrays)
+        _arrays_cache.move_to_end(pdb.user_id)
+        while len(_arrays_cache) > MAX_CACHED_USERS:
+            _arrays_cache.popitem(last=False)
+    return arrays
+
+
+def value_lots(arrays: Dict[str, np.ndarray], fiyatlar: Dict[str, float],
+               bugun: Optional[date] = None) -> Dict[str, np.ndarray]:
+    """
+    Tüm lotları tek seferde fiyat vektörüne karşı değerle.
+
+    Args:
+        arrays: build_lot_arrays() çıktısı
+        fiyatlar: {sembol: güncel fiyat}; fiyatı olmayan semboller NaN kalır
+        bugun: Elde tutma süresi için referans gün (varsayılan: bugün)
+
+    Returns:
+        Lot bazlı diziler ve sembol bazlı toplamlar
+    """
+    semboller = arrays["semboller"]
+    idx = arrays["sembol_idx"]
+    adet = arrays["adet"]
+    alis = arrays["alis_fiyati"]
+    k = len(semboller)
+
+    # Sembol fiyat vektörü → lot başına fiyat (fancy indexing)
+    fiyat_vektor = np.array([fiyatlar.get(s, np.nan) for s in semboller], dtype=np.float64)
+    guncel_fiyat = fiyat_vektor[idx] if k else np.empty(0)
+
+    maliyet = adet * alis
+    guncel_deger = adet * guncel_fiyat
+    kar_zarar = guncel_deger - maliyet
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yuzde = np.where(maliyet > 0, kar_zarar / maliyet * 100, np.nan)
+
+    bugun = np.datetime64(bugun or date.today(), "D")
+    elde_tutma = (bugun - arrays["tarih"]).astype("timedelta64[D]").astype(np.float64)
+    elde_tutma[np.isnat(arrays["tarih"])] = np.nan
+
+    # Sembol bazlı toplamlar (bincount = gruplu toplam)
+    s_adet = np.bincount(idx, weights=adet, minlength=k)
+    s_maliyet = np.bincount(idx, weights=maliyet, minlength=k)
+    s_deger = s_adet * fiyat_vektor
+    s_kar = s_deger - s_maliyet
+    s_lot = np.bincount(idx, minlength=k)
+    gecerli_gun = ~np.isnan(elde_tutma)
+    s_gun_agirlik = np.bincount(idx[gecerli_gun], weights=(adet * elde_tutma)[gecerli_gun], minlength=k)
+    s_gun_adet = np.bincount(idx[gecerli_gun], weights=adet[gecerli_gun], minlength=k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s_yuzde = np.where(s_maliyet > 0, s_kar / s_maliyet * 100, np.nan)
+        s_ort_gun = np.where(s_gun_adet > 0, s_gun_agirlik / s_gun_adet, np.nan)
+
+    return {
+        "guncel_fiyat": guncel_fiyat,
+        "maliyet": maliyet,
+        "guncel_deger": guncel_deger,
+        "kar_zarar": kar_zarar,
+        "kar_zarar_yuzde": yuzde,
+        "elde_tutma_gun": elde_tutma,
+        "sembol": {
+            "fiyat": fiyat_vektor,
+            "adet": s_adet,
+            "maliyet": s_maliyet,
+            "guncel_deger": s_deger,
+            "kar_zarar": s_kar,
+            "kar_zarar_yuzde": s_yuzde,
+            "lot_sayisi": s_lot,
+            "ort_elde_tutma_gun": s_ort_gun,
+        },
+    }
+
+
+def _json_list(values: np.ndarray, decimals: int) -> list:
+    """Diziyi yuvarlayıp JSON uyumlu listeye çevir (NaN → None)"""
+    rounded = np.round(values, decimals)
+    return [None if v != v else v for v in rounded.tolist()]
+
+
+def portfolio_lots(pdb, prices_lookup: Callable[[List[str]], Dict[str, dict]],
+                   bugun: Optional[date] = None) -> Dict:
+    """
+    /api/portfolio/lots yanıtını oluştur.
+
+    Args:
+        pdb: Kullanıcının PortfolioDB görünümü
+        prices_lookup: get_prices benzeri toplu fiyat fonksiyonu ({sembol: sonuç})
+    """
+    arrays = load_lot_arrays(pdb)
+    semboller = arrays["semboller"]
+
+    # Her sembol için tek fiyat sorgusu (lot sayısından bağımsız)
+    fiyatlar = {
+        sembol: price_data["price"]
+        for sembol, price_data in prices_lookup(semboller).items()
+        if price_data.get("success")
+    }
+
+    v = value_lots(arrays, fiyatlar, bugun)
+    s = v["sembol"]
+
+    sembol_listesi = [semboller[i] for i in arrays["sembol_idx"].tolist()]
+    tarih_listesi = [None if t is None else str(t) for t in arrays["tarih"].tolist()]
+    lots = [
+        {
+            "id": lot_id, "sembol": sembol, "adet": adet, "alis_fiyati": alis, "tarih": tarih,
+            "guncel_fiyat": fiyat, "maliyet": maliyet, "guncel_deger": deger,
+            "kar_zarar": kar, "kar_zarar_yuzde": yuzde,
+            "elde_tutma_gun": None if gun is None else int(gun)
+        }
+        for lot_id, sembol, adet, alis, tarih, fiyat, maliyet, deger, kar, yuzde, gun in zip(
+            arrays["id"].tolist(), sembol_listesi, arrays["adet"].tolist(),
+            arrays["alis_fiyati"].tolist(), tarih_listesi,
+            _json_list(v["guncel_fiyat"], 4), _json_list(v["maliyet"], 2),
+            _json_list(v["guncel_deger"], 2), _json_list(v["kar_zarar"], 2),
+            _json_list(v["kar_zarar_yuzde"], 2), _json_list(v["elde_tutma_gun"], 0)
+        )
+    ]
+
+    symbols = [
+        {
+            "sembol": sembol, "guncel_fiyat": fiyat, "adet": adet, "maliyet": maliyet,
+            "guncel_deger": deger, "kar_zarar": kar, "kar_zarar_yuzde": yuzde,
+            "lot_sayisi": lot_sayisi, "ort_elde_tutma_gun": gun
+        }
+        for sembol, fiyat, adet, maliyet, deger, kar, yuzde, lot_sayisi, gun in zip(
+            semboller, _json_list(s["fiyat"], 4), _json_list(s["adet"], 4),
+            _json_list(s["maliyet"], 2), _json_list(s["guncel_deger"], 2),
+            _json_list(s["kar_zarar"], 2), _json_list(s["kar_zarar_yuzde"], 2),
+            s["lot_sayisi"].tolist(), _json_list(s["ort_elde_tutma_gun"], 1)
+        )
+    ]
+
+    fiyatli = ~np.isnan(s["fiyat"])
+    toplam_maliyet = float(s["maliyet"].sum())
+    toplam_deger = float(s["guncel_deger"][fiyatli].sum())
+    fiyatli_maliyet = float(s["maliyet"][fiyatli].sum())
+    toplam_kar = toplam_deger - fiyatli_maliyet
+
+    return {
+        "lots": lots,
+        "symbols": symbols,
+        "total": {
+            "lot_sayisi": len(lots),
+            "toplam_maliyet": round(toplam_maliyet, 2),
+            "toplam_guncel": round(toplam_deger, 2) if fiyatli.any() else None,
+            "toplam_kar_zarar": round(toplam_kar, 2) if fiyatli.any() else None,
+            "kar_zarar_yuzde": round(toplam_kar / fiyatli_maliyet * 100, 2) if fiyatli_maliyet > 0 else None,
+        },
+    }
+
+
+if __name__ == "__main__":
+    # Benchmark: 100.000 lot, 50 sembol
+    rng = np.random.default_rng(42)
+    N, K = 100_000, 50
+    sembol_havuzu = [f"SYM{i:02d}" for i in range(K)]
+    gunler = np.datetime64("2020-01-01") + rng.integers(0, 2000, N)
+    lotlar = [
+        {"id": i, "sembol": sembol_havuzu[s], "adet": float(a), "alis_fiyati": float(f),
+         "tarih": f"{g} 10:00", "notlar": ""}
+        for i, (s, a, f, g) in enumerate(zip(
+            rng.integers(0, K, N), rng.uniform(1, 100, N), rng.uniform(5, 500, N), gunler.astype(str)
+        ))
+    ]
+    fiyat_tablosu = {s: float(rng.uniform(5, 500)) for s in sembol_havuzu}
+
+    t0 = time.perf_counter()
+    diziler = build_lot_arrays(lotlar)
+    t1 = time.perf_counter()
+    for _ in range(10):
+        sonuc = value_lots(diziler, fiyat_tablosu)
+    t2 = time.perf_counter()
+
+    # Karşılaştırma: lot başına Python döngüsü
+    bugun_d = date.today()
+    t3 = time.perf_counter()
+    for lot in lotlar:
+        fiyat = fiyat_tablosu[lot["sembol"]]
+        maliyet = lot["adet"] * lot["alis_fiyati"]
+        kar = lot["adet"] * fiyat - maliyet
+        yuzde = kar / maliyet * 100
+        gun = (bugun_d - date.fromisoformat(lot["tarih"][:10])).days
+    t4 = time.perf_counter()
+
+    print(f"Lot sayısı: {N:,} | Sembol: {K}")
+    print(f"Dizi oluşturma:        {(t1 - t0) * 1000:8.1f} ms (versiyon başına bir kez)")
+    print(f"Vektörel değerleme:    {(t2 - t1) / 10 * 1000:8.1f} ms")
+    print(f"Python döngüsü:        {(t4 - t3) * 1000:8.1f} ms")
+    print(f"Toplam kar/zarar:      {sonuc['sembol']['kar_zarar'].sum():,.2f}")
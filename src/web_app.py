@@ -8,33 +8,54 @@ import os
 import sys
 import json
 import logging
+import re
 import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from flask_cors import CORS
-from dotenv import load_dotenv
 
 # Proje modüllerini ekle
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import PortfolioDB
-from utils import setup_logger
-
-# Veri çekme
-import yfinance as yf
-from tefas import Crawler
-import urllib3
-urllib3.disable_warnings()
-
-# Groq AI
-try:
-    from groq import Groq
-    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
-    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-    groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-except Exception:
-    groq_client = None
+from database import create_db, PortfolioDB, DEFAULT_USER_ID
+from alerts import AlertIndex, AlertEvaluator, post_webhook
+from chat_store import create_session_store
+from chat_context import ChatContextBuilder
+from chat_cache import ResponseCache, history_digest, normalize_question, price_bucket
+from chat_tools import CHAT_TOOLS, CHAT_TOOL_ROUNDS, TOOL_SCHEMAS, ToolRunner, summarize_history
+import llm
+from utils import setup_logger, load_env, init_compression, init_request_logging
+from utils.json_provider import init_json
+from utils.assets import init_assets
+from utils.profiler import init_profiling
+from utils import timing
+from utils.timing import span, timed, propagate
+
+# Ağır bağımlılıklar (yfinance → pandas/numpy, tefas, groq, psycopg2) ve
+# istemciler ilk kullanımda yüklenir; şablon/favicon gibi istekler ve
+# soğuk başlangıç bunların maliyetini ödemez.
+load_env()
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+_groq_client = None
+_groq_lock = threading.Lock()
+
+
+def get_groq_client():
+    """Groq istemcisi (ilk chat isteğinde oluşturulur; anahtar yoksa None)"""
+    global _groq_client
+    if _groq_client is None and GROQ_API_KEY:
+        with _groq_lock:
+            if _groq_client is None:
+                try:
+                    from groq import Groq
+                    _groq_client = Groq(api_key=GROQ_API_KEY)
+                except Exception as e:
+                    logger.error(f"Groq istemcisi oluşturulamadı: {e}")
+    return _groq_client
 
 # Flask
 app = Flask(__name__, 
@@ -43,6 +64,18 @@ app = Flask(__name__,
     static_url_path='/static'
 )
 CORS(app)
+# request_id ataması (X-Request-Id) ve LOG_FORMAT=json ise erişim kayıtları
+init_request_logging(app)
+# İsteğe bağlı profil çıkarma: sadece PROFILE_TOKEN tanımlıysa kanca eklenir
+init_profiling(app)
+# İstek süreleri: Server-Timing başlığı + /metrics histogramları
+# (after_request ters sırada çalışır; diğer kancaların süresi de ölçülsün diye ilk kaydedilir)
+timing.init_timing(app)
+# Hızlı JSON (orjson varsa) ve Accept-Encoding'e göre gzip/brotli sıkıştırma
+init_json(app)
+init_compression(app)
+# Hash'li, küçültülmüş statik dosyalar (python -m utils.assets ile derlenir)
+init_assets(app)
 
 # --- ALT DİZİN (SUBDIRECTORY) DESTEĞİ ---
 # Bu bölge, uygulamanın erenmente.com/finans altında çalışmasını sağlar.
@@ -68,48 +101,140 @@ app.wsgi_app = PrefixMiddleware(app.wsgi_app, prefix='/finans')
 # Logger & DB
 logger = setup_logger("WebAPI", logging.INFO)
 
-# Veritabanı - Supabase (PostgreSQL) URL üzerinden çalışır
+# Veritabanı - DATABASE_URL şemasına göre Supabase (PostgreSQL) veya SQLite.
+# Bağlantı havuzu ilk veritabanı isteğinde kurulur.
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-try:
-    db = PortfolioDB()
-except Exception as e:
-    logger.error(f"Veritabanı başlatılamadı: {e}")
-    db = None
+_db = None
+_db_lock = threading.Lock()
+# Başarısız bağlantı denemesinden sonra bu süre (sn) yeniden denenmez;
+# veritabanı kapalıyken her istek create_db'yi _db_lock altında beklemez
+DB_RETRY_INTERVAL = float(os.environ.get("DB_RETRY_INTERVAL", 10))
+_db_failed_at = 0.0
 
-# Chat geçmişi (session bazlı, basit in-memory)
-chat_sessions = {}
 
-# Fiyat alarmları (in-memory, JSON dosyasıyla persist)
-ALERTS_FILE = os.path.join("/tmp", "alarmlar.json") if os.environ.get("VERCEL") or os.environ.get("VERCEL_REGION") else os.path.join(BASE_DIR, "alarmlar.json")
-price_alerts = []
+def get_db():
+    """
+    Veritabanı (ilk çağrıda oluşturulur).
+    Başarısızsa None döner; DB_RETRY_INTERVAL geçtikten sonraki istek tekrar dener.
+    """
+    global _db, _db_failed_at
+    if _db is None and time.monotonic() - _db_failed_at >= DB_RETRY_INTERVAL:
+        with _db_lock:
+            if _db is None and time.monotonic() - _db_failed_at >= DB_RETRY_INTERVAL:
+                try:
+                    db = create_db()
+                    migrate_legacy_alerts(db)
+                    _db = db
+                except Exception as e:
+                    _db_failed_at = time.monotonic()
+                    logger.error(f"Veritabanı başlatılamadı (en erken {DB_RETRY_INTERVAL:g} sn sonra tekrar denenecek): {e}")
+    return _db
 
-def load_alerts():
-    global price_alerts
-    try:
-        if os.path.exists(ALERTS_FILE):
-            with open(ALERTS_FILE, 'r', encoding='utf-8') as f:
-                price_alerts = json.load(f)
-    except Exception:
-        price_alerts = []
 
-def save_alerts():
-    try:
-        with open(ALERTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(price_alerts, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Alarm kayıt hatası: {e}")
 
-load_alerts()
+# Kullanıcı kimliği istemciden doğrulanmadan alınmaz:
+#   - X-User-Id başlığı sadece TRUST_USER_HEADER=1 iken (kimlik doğrulayan
+#     ters proxy başlığı kendisi yazıyorsa) dikkate alınır
+#   - user_id çerezi SECRET_KEY ile imzalanmış olmalıdır (sign_user_id)
+# İkisi de yoksa veya geçersizse varsayılan kullanıcı kullanılır.
+TRUST_USER_HEADER = os.environ.get("TRUST_USER_HEADER", "0") == "1"
+SECRET_KEY = os.environ.get("SECRET_KEY")
+_USER_ID_PATTERN = re.compile(r"^[\w.@-]{1,64}$")
+
+
+def _user_signer():
+    from itsdangerous import Signer
+    return Signer(SECRET_KEY, salt="user_id")
+
+
+def sign_user_id(user_id: str) -> str:
+    """user_id çerezine yazılacak imzalı değer (SECRET_KEY gerekir)"""
+    if not SECRET_KEY:
+        raise RuntimeError("SECRET_KEY tanımlı değil")
+    return _user_signer().sign(user_id).decode()
+
+
+def current_user_id() -> str:
+    """
+    İsteği yapan kullanıcı.
+    Ekip kurulumlarında kimlik doğrulayan ters proxy X-User-Id başlığını
+    ekler (TRUST_USER_HEADER=1); yoksa imzalı user_id çerezi, o da yoksa
+    varsayılan kullanıcı kullanılır.
+    """
+    user_id = None
+    if TRUST_USER_HEADER:
+        user_id = request.headers.get("X-User-Id")
+    cookie = request.cookies.get("user_id")
+    if not user_id and cookie and SECRET_KEY:
+        from itsdangerous import BadSignature
+        try:
+            user_id = _user_signer().unsign(cookie).decode()
+        except BadSignature:
+            logger.debug("İmzası geçersiz user_id çerezi yok sayıldı")
+    user_id = (user_id or "").strip()
+    return user_id if _USER_ID_PATTERN.match(user_id) else DEFAULT_USER_ID
+
+
+def user_db():
+    """İsteği yapan kullanıcının portföy görünümü (kendi okuma önbelleğiyle)"""
+    return get_db().for_user(current_user_id())
+
+
+# Chat geçmişi (kullanıcı + session bazlı): CHAT_STORE=database ile tüm
+# worker'lar paylaşır, memory ile süreç içinde LRU + TTL sınırlı tutulur
+chat_store = create_session_store(get_db)
+
+# Eski sürümlerin alarm dosyası (ilk açılışta veritabanına aktarılır)
+ALERTS_FILE = os.path.join("/tmp", "alarmlar.json") if os.environ.get("VERCEL") or os.environ.get("VERCEL_REGION") else os.path.join(BASE_DIR, "alarmlar.json")
 
 
 # ============================================================
 # VERİ ÇEKME FONKSİYONLARI
 # ============================================================
 
+# Dış kaynak çağrıları (Yahoo, TEFAS, scraping) için paylaşılan thread havuzu.
+# Birden fazla sembol gerektiren istekler fiyatları sırayla değil eşzamanlı çeker.
+IO_WORKERS = int(os.environ.get("IO_WORKERS", 8))
+io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+
+_stderr_lock = threading.Lock()
+_stderr_state = {"depth": 0, "original": None}
+
+
+@contextmanager
+def quiet_stderr():
+    """
+    yfinance'in stderr'e bastığı uyarıları sustur.
+    Eşzamanlı çağrılarda güvenlidir: stderr ilk girişte kapatılır,
+    son çıkışta (hata olsa bile) geri yüklenir.
+    """
+    with _stderr_lock:
+        if _stderr_state["depth"] == 0:
+            _stderr_state["original"] = sys.stderr
+            sys.stderr = open(os.devnull, 'w')
+        _stderr_state["depth"] += 1
+    try:
+        yield
+    finally:
+        with _stderr_lock:
+            _stderr_state["depth"] -= 1
+            if _stderr_state["depth"] == 0:
+                sys.stderr.close()
+                sys.stderr = _stderr_state["original"]
+
+def tefas_crawler():
+    """TEFAS istemcisi (tefas ve urllib3 ilk kullanımda yüklenir)"""
+    import urllib3
+    from tefas import Crawler
+    urllib3.disable_warnings()
+    return Crawler()
+
+
+@timed("price.tefas")
 def get_tefas_price(code: str) -> dict:
     """TEFAS fon fiyatı"""
     try:
-        crawler = Crawler()
+        crawler = tefas_crawler()
         today = datetime.now()
         start = today - timedelta(days=5)
         
@@ -135,18 +260,17 @@ def get_tefas_price(code: str) -> dict:
     return {"success": False, "error": f"{code} bulunamadı"}
 
 
+@timed("price.yahoo")
 def get_stock_price(symbol: str) -> dict:
     """Hisse fiyatı"""
+    import yfinance as yf
+    
     try:
         bist_symbol = f"{symbol}.IS" if "." not in symbol else symbol
         
-        old_stderr = sys.stderr
-        sys.stderr = open(os.devnull, 'w')
-        
-        ticker = yf.Ticker(bist_symbol)
-        price = getattr(ticker.fast_info, 'last_price', None)
-        
-        sys.stderr = old_stderr
+        with quiet_stderr():
+            ticker = yf.Ticker(bist_symbol)
+            price = getattr(ticker.fast_info, 'last_price', None)
         
         if price:
             return {
@@ -162,8 +286,11 @@ def get_stock_price(symbol: str) -> dict:
     return {"success": False, "error": f"{symbol} bulunamadı"}
 
 
+@timed("price.yahoo_fx")
 def get_currency_rate(currency: str) -> dict:
     """Döviz kuru"""
+    import yfinance as yf
+    
     mapping = {
         "USD": "USDTRY=X",
         "EUR": "EURTRY=X",
@@ -179,13 +306,9 @@ def get_currency_rate(currency: str) -> dict:
     try:
         yahoo_symbol = mapping.get(currency.upper(), f"{currency.upper()}TRY=X")
         
-        old_stderr = sys.stderr
-        sys.stderr = open(os.devnull, 'w')
-        
-        ticker = yf.Ticker(yahoo_symbol)
-        price = getattr(ticker.fast_info, 'last_price', None)
-        
-        sys.stderr = old_stderr
+        with quiet_stderr():
+            ticker = yf.Ticker(yahoo_symbol)
+            price = getattr(ticker.fast_info, 'last_price', None)
         
         if price:
             return {
@@ -205,14 +328,16 @@ def get_currency_rate(currency: str) -> dict:
 def get_gold_price() -> dict:
     """Gram altın fiyatı - Çoklu kaynak"""
     import requests
+    import yfinance as yf
     from bs4 import BeautifulSoup
     
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
     
     # Kaynak 1: Bigpara (en güvenilir Türk kaynağı)
     try:
-        r = requests.get("https://bigpara.hurriyet.com.tr/altin/gram-altin-fiyati/", 
-                        headers=headers, timeout=8)
+        with span("price.bigpara"):
+            r = requests.get("https://bigpara.hurriyet.com.tr/altin/gram-altin-fiyati/", 
+                            headers=headers, timeout=8)
         if r.status_code == 200:
             soup = BeautifulSoup(r.content, "html.parser")
             price_elem = soup.find("span", class_="value")
@@ -229,12 +354,13 @@ def get_gold_price() -> dict:
                         "source": "Bigpara"
                     }
     except Exception as e:
-        logger.debug(f"Bigpara altın hatası: {e}")
+        logger.debug("Bigpara altın hatası: %s", e)
     
     # Kaynak 2: Doviz.com
     try:
-        r = requests.get("https://www.doviz.com/altin/gram-altin", 
-                        headers=headers, timeout=8)
+        with span("price.doviz"):
+            r = requests.get("https://www.doviz.com/altin/gram-altin", 
+                            headers=headers, timeout=8)
         if r.status_code == 200:
             soup = BeautifulSoup(r.content, "html.parser")
             price_div = soup.find("div", class_="value")
@@ -251,20 +377,16 @@ def get_gold_price() -> dict:
                         "source": "Doviz.com"
                     }
     except Exception as e:
-        logger.debug(f"Doviz.com altın hatası: {e}")
+        logger.debug("Doviz.com altın hatası: %s", e)
     
     # Kaynak 3: Yahoo Finance hesaplama (fallback)
     try:
-        old_stderr = sys.stderr
-        sys.stderr = open(os.devnull, 'w')
-        
-        gold = yf.Ticker("GC=F")
-        usd = yf.Ticker("USDTRY=X")
-        
-        gold_price = getattr(gold.fast_info, 'last_price', None)
-        usd_price = getattr(usd.fast_info, 'last_price', None)
-        
-        sys.stderr = old_stderr
+        with span("price.yahoo_gold"), quiet_stderr():
+            gold = yf.Ticker("GC=F")
+            usd = yf.Ticker("USDTRY=X")
+            
+            gold_price = getattr(gold.fast_info, 'last_price', None)
+            usd_price = getattr(usd.fast_info, 'last_price', None)
         
         if gold_price and usd_price:
             gram_try = (gold_price * usd_price) / 31.1035
@@ -285,6 +407,9 @@ def get_gold_price() -> dict:
 # FİYAT ÖNBELLEĞİ (CACHE)
 # ============================================================
 #
+# Fiyatlar kullanıcıdan bağımsızdır: önbellek tüm kullanıcılar
+# arasında paylaşılır, aynı sembolü izleyen her kullanıcı aynı kaydı okur.
+#
 # Amaç: Aynı sembol kısa sürede tekrar sorulduğunda dış API'ye
 # gitmek yerine bellekteki sonucu döndürmek.
 #
@@ -316,11 +441,11 @@ def get_price_for_symbol(symbol: str) -> dict:
     # Eğer sembol önbellekte varsa VE son çekilme zamanı 60sn'den yakınsa → döndür
     cached = price_cache.get(symbol)
     if cached and (time.time() - cached["timestamp"]) < CACHE_TTL:
-        logger.debug(f"Cache HIT: {symbol} ({CACHE_TTL}sn önbellek)")
+        logger.debug("Cache HIT: %s (%ssn önbellek)", symbol, CACHE_TTL)
         return cached["data"]
 
     # --- CACHE MISS: Dış API'den fiyatı çek ---
-    logger.debug(f"Cache MISS: {symbol} → API'den çekiliyor")
+    logger.debug("Cache MISS: %s → API'den çekiliyor", symbol)
 
     if symbol in ["ALTIN", "GOLD", "XAU"]:
         result = get_gold_price()
@@ -345,10 +470,262 @@ def get_price_for_symbol(symbol: str) -> dict:
             "data": result,
             "timestamp": time.time()    # Şu anki zamanı kaydet
         }
+        # Yeni fiyat → bu sembolü izleyen alarmlar değerlendirilir
+        on_price_update(symbol, result["price"])
+
+    return result
+
+
+def get_prices(symbols) -> dict:
+    """
+    Birden fazla sembolün fiyatını eşzamanlı çek (io_pool).
+    Önbellekteki semboller için dış çağrı yapılmaz.
+
+    Returns:
+        {sembol: get_price_for_symbol sonucu}
+    """
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols))
+
+    def fetch(symbol):
+        try:
+            return get_price_for_symbol(symbol)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    if len(symbols) <= 1:
+        return {s: fetch(s) for s in symbols}
+    return dict(zip(symbols, io_pool.map(propagate(fetch), symbols)))
+
+
+# ============================================================
+# FİYAT GEÇMİŞİ (Analitik için günlük kapanışlar)
+# ============================================================
+#
+# Günlük kapanışlar gün içinde değişmediği için anlık fiyatlardan
+# çok daha uzun süre önbellekte tutulur.
 
+history_cache = {}        # {sembol: {"data": {...}, "start": date, "timestamp": ...}}
+HISTORY_CACHE_TTL = 6 * 60 * 60
+
+
+def _yahoo_history(yahoo_symbol: str, start) -> tuple:
+    """Yahoo Finance günlük kapanışları → (tarihler, fiyatlar)"""
+    import yfinance as yf
+    
+    with span("price.yahoo_history"), quiet_stderr():
+        hist = yf.Ticker(yahoo_symbol).history(start=start.strftime("%Y-%m-%d"), interval="1d")
+    if hist.empty:
+        return [], []
+    return [d.strftime("%Y-%m-%d") for d in hist.index], [float(p) for p in hist["Close"]]
+
+
+def get_price_history(symbol: str, start) -> dict:
+    """
+    Sembolün start gününden bugüne günlük kapanış fiyatları.
+    Sembol eşlemesi get_price_for_symbol ile aynıdır.
+    """
+    symbol = symbol.upper().strip()
+    
+    cached = history_cache.get(symbol)
+    if cached and cached["start"] <= start and (time.time() - cached["timestamp"]) < HISTORY_CACHE_TTL:
+        return cached["data"]
+    
+    dates, prices = [], []
+    try:
+        if symbol in ["ALTIN", "GOLD", "XAU"]:
+            g_dates, g_prices = _yahoo_history("GC=F", start)
+            u_dates, u_prices = _yahoo_history("USDTRY=X", start)
+            usd = dict(zip(u_dates, u_prices))
+            for d, p in zip(g_dates, g_prices):
+                if d in usd:
+                    dates.append(d)
+                    prices.append(round(p * usd[d] / 31.1035, 2))
+        
+        elif symbol in ["USD", "EUR", "GBP", "DOLAR", "EURO"]:
+            code = {"DOLAR": "USD", "EURO": "EUR"}.get(symbol, symbol)
+            dates, prices = _yahoo_history(f"{code}TRY=X", start)
+        
+        else:
+            if len(symbol) == 3:
+                with span("price.tefas_history"):
+                    data = tefas_crawler().fetch(
+                        start=start.strftime("%Y-%m-%d"),
+                        end=datetime.now().strftime("%Y-%m-%d"),
+                        name=symbol,
+                        columns=["date", "price"]
+                    )
+                if not data.empty:
+                    data = data.sort_values("date")
+                    dates = [str(d)[:10] for d in data["date"]]
+                    prices = [float(p) for p in data["price"]]
+            if not dates:
+                bist_symbol = f"{symbol}.IS" if "." not in symbol else symbol
+                dates, prices = _yahoo_history(bist_symbol, start)
+    except Exception as e:
+        logger.warning(f"Fiyat geçmişi hatası ({symbol}): {e}")
+    
+    if not dates:
+        return {"success": False, "error": f"{symbol} fiyat geçmişi bulunamadı"}
+    
+    result = {"success": True, "symbol": symbol, "dates": dates, "prices": prices}
+    history_cache[symbol] = {"data": result, "start": start, "timestamp": time.time()}
     return result
 
 
+def get_price_histories(symbols, start) -> dict:
+    """Birden fazla sembolün fiyat geçmişini eşzamanlı çek → {sembol: sonuç}"""
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols))
+
+    def fetch(symbol):
+        try:
+            return get_price_history(symbol, start)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    return dict(zip(symbols, io_pool.map(propagate(fetch), symbols)))
+
+
+# ============================================================
+# PİYASA ÖZETİ & DÖVİZ ÇAPRAZ KURLARI
+# ============================================================
+#
+# Piyasa sayfasındaki tüm kartlar tek bir toplu Yahoo Finance isteğiyle
+# (yf.download) çekilir ve CACHE_TTL boyunca önbellekte tutulur. Aynı
+# istekten gelen kurlarla TRY bazlı çapraz kur matrisi kurulur; çevirici
+# bu matrisi kullandığı için çevirme başına dış API çağrısı yapılmaz.
+
+MARKET_BOARD = {
+    "currencies": [("USD", "Amerikan Doları"), ("EUR", "Euro")],
+    "commodities": [("ALTIN", "Gram Altın")],
+    "stocks": [("THYAO", "Türk Hava Yolları"), ("ASELS", "Aselsan"),
+               ("KCHOL", "Koç Holding"), ("SISE", "Şişecam")],
+}
+FX_CURRENCIES = ["TRY", "USD", "EUR", "GBP", "ALTIN"]
+FX_ALIASES = {"DOLAR": "USD", "EURO": "EUR", "GOLD": "ALTIN", "XAU": "ALTIN", "TL": "TRY"}
+
+market_cache = {}         # {"data": {...}, "timestamp": ...}
+market_lock = threading.Lock()
+
+
+def _yahoo_batch(tickers: list) -> dict:
+    """Birden fazla Yahoo sembolünün son fiyatı tek istekte → {ticker: fiyat}"""
+    import yfinance as yf
+    
+    with span("price.yahoo_batch"), quiet_stderr():
+        data = yf.download(tickers, period="5d", interval="1d", progress=False,
+                           group_by="column", auto_adjust=False, threads=True)
+    
+    prices = {}
+    if data is None or data.empty:
+        return prices
+    closes = data["Close"]
+    for ticker in tickers:
+        try:
+            series = closes[ticker].dropna()
+            if not series.empty:
+                prices[ticker] = float(series.iloc[-1])
+        except Exception:
+            pass
+    return prices
+
+
+def get_market_overview() -> dict:
+    """
+    Piyasa panosu + çapraz kur matrisi (önbellekli).
+    Önbellek doluysa dış API'ye gidilmez.
+    """
+    with market_lock:
+        cached = market_cache.get("data")
+        if cached and (time.time() - market_cache["timestamp"]) < CACHE_TTL:
+            return cached
+        
+        fx = [c for c in FX_CURRENCIES if c not in ("TRY", "ALTIN")]
+        stocks = [symbol for symbol, _ in MARKET_BOARD["stocks"]]
+        tickers = [f"{c}TRY=X" for c in fx] + [f"{s}.IS" for s in stocks] + ["GC=F"]
+        
+        # Toplu Yahoo isteği ve gram altın kaynağı aynı anda çekilir
+        gold_future = io_pool.submit(propagate(get_price_for_symbol), "ALTIN")
+        try:
+            quotes = _yahoo_batch(tickers)
+        except Exception as e:
+            logger.warning(f"Toplu piyasa verisi hatası: {e}")
+            quotes = {}
+        
+        # Toplu istekten gelen fiyatlar tekil fiyat önbelleğini de doldurur
+        now = time.time()
+        names = dict(pair for group in MARKET_BOARD.values() for pair in group)
+        fetched = {}
+        for c in fx:
+            if f"{c}TRY=X" in quotes:
+                fetched[c] = {"price": round(quotes[f"{c}TRY=X"], 4), "source": "Yahoo Finance"}
+        for symbol in stocks:
+            if f"{symbol}.IS" in quotes:
+                fetched[symbol] = {"price": round(quotes[f"{symbol}.IS"], 2), "source": "Yahoo Finance"}
+        for symbol, item in fetched.items():
+            result = {"success": True, "symbol": symbol, "name": names.get(symbol, symbol),
+                      "price": item["price"], "currency": "TRY", "source": item["source"]}
+            price_cache[symbol] = {"data": result, "timestamp": now}
+            on_price_update(symbol, item["price"])
+        
+        # Gram altın: tekil kaynak (önbellekten), olmazsa toplu istekteki ons × USD
+        try:
+            gold = gold_future.result()
+        except Exception:
+            gold = {"success": False}
+        if gold.get("success"):
+            fetched["ALTIN"] = {"price": gold["price"], "source": gold.get("source", "")}
+        elif "GC=F" in quotes and "USD" in fetched:
+            fetched["ALTIN"] = {"price": round(quotes["GC=F"] * fetched["USD"]["price"] / 31.1035, 2),
+                                "source": "Hesaplanan (Yahoo Finance)"}
+        
+        board = {}
+        for group, items in MARKET_BOARD.items():
+            board[group] = [
+                {"symbol": symbol, "name": name, "price": fetched[symbol]["price"],
+                 "currency": "TRY", "source": fetched[symbol]["source"]}
+                for symbol, name in items if symbol in fetched
+            ]
+        
+        # Çapraz kur: 1 birim A = rates[A] / rates[B] birim B
+        rates = {"TRY": 1.0, **{c: fetched[c]["price"] for c in FX_CURRENCIES if c in fetched}}
+        matrix = {a: {b: round(rates[a] / rates[b], 6) for b in rates} for a in rates}
+        
+        data = {
+            **board,
+            "fx": {"rates": rates, "matrix": matrix},
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        
+        # Hiç veri gelmediyse önbelleğe alma; bir sonraki istek tekrar denesin
+        if fetched:
+            market_cache["data"] = data
+            market_cache["timestamp"] = now
+        return data
+
+
+def convert_currency(amount: float, source: str, target: str) -> dict:
+    """Çapraz kur matrisiyle çevir (USD/EUR/GBP/ALTIN/TRY)"""
+    source, target = source.upper().strip(), target.upper().strip()
+    source, target = FX_ALIASES.get(source, source), FX_ALIASES.get(target, target)
+    
+    if source not in FX_CURRENCIES or target not in FX_CURRENCIES:
+        return {"success": False, "error": f"Desteklenen birimler: {', '.join(FX_CURRENCIES)}"}
+    
+    fx = get_market_overview()["fx"]
+    rate = fx["matrix"].get(source, {}).get(target)
+    if rate is None:
+        return {"success": False, "error": "Kur bilgisi alınamadı"}
+    
+    return {
+        "success": True,
+        "from": source,
+        "to": target,
+        "amount": amount,
+        "rate": rate,
+        "result": round(amount * rate, 4)
+    }
+
+
 # ============================================================
 # PAGE ROUTES
 # ============================================================
@@ -394,6 +771,52 @@ def internal_error(error):
     return jsonify({"success": False, "error": "Sunucu hatası oluştu"}), 500
 
 
+@app.route('/api/health/db')
+def api_health_db():
+    """Veritabanı bağlantı havuzu metrikleri"""
+    db = get_db()
+    if not db:
+        return jsonify({"success": False, "error": "Veritabanı bağlantısı yok"})
+    return jsonify({"success": True, "pool": db.pool_stats()})
+
+
+# /metrics için opsiyonel erişim anahtarı (Authorization: Bearer <anahtar>)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrikleri: istek/span süre histogramları, havuz ve önbellek durumu"""
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+
+    gauges = {
+        "finans_cache_entries": ("Önbellekteki kayıt sayısı", {
+            (("cache", "price"),): len(price_cache),
+            (("cache", "history"),): len(history_cache),
+        }),
+    }
+    chat_stats = chat_store.stats()
+    if chat_stats:
+        gauges["finans_cache_entries"][1][(("cache", "chat_sessions"),)] = chat_stats["sessions"]
+        gauges["finans_chat_store_bytes"] = ("Bellekteki sohbet geçmişi boyutu", {(): chat_stats["bytes"]})
+    cache_stats = chat_cache.stats()
+    gauges["finans_cache_entries"][1][(("cache", "chat_responses"),)] = cache_stats["entries"]
+    gauges["finans_chat_cache"] = ("Chat yanıt önbelleği (isabet/ıska sayısı ve oranı)", {
+        (("stat", key),): cache_stats[key] for key in ("hits", "misses", "hit_rate")
+    })
+    # Veritabanı henüz oluşturulmadıysa /metrics onu başlatmaz
+    if _db is not None:
+        stats = _db.pool_stats()
+        backend = stats.pop("backend", "")
+        gauges["finans_db_pool"] = ("Bağlantı havuzu durumu", {
+            (("backend", backend), ("stat", key)): value
+            for key, value in stats.items() if isinstance(value, (int, float))
+        })
+
+    return Response(timing.registry.render(gauges), mimetype="text/plain; version=0.0.4")
+
+
 @app.route('/api/price/<symbol>')
 def api_price(symbol: str):
     """Fiyat sorgula"""
@@ -404,15 +827,52 @@ def api_price(symbol: str):
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route('/api/market/overview')
+def api_market_overview():
+    """Piyasa panosu (döviz, emtia, hisse) ve çapraz kur matrisi tek istekte"""
+    try:
+        return jsonify({"success": True, "data": get_market_overview()})
+    except Exception as e:
+        logger.error(f"Piyasa özeti hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
+@app.route('/api/convert')
+def api_convert():
+    """Döviz çevirici: /api/convert?from=USD&to=TRY&amount=100"""
+    try:
+        amount = request.args.get('amount', 1, type=float)
+        if amount is None or amount <= 0:
+            return jsonify({"success": False, "error": "Geçersiz parametreler"})
+        return jsonify(convert_currency(amount, request.args.get('from', 'USD'), request.args.get('to', 'TRY')))
+    except Exception as e:
+        logger.error(f"Çevirici hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
+def conditional_json(payload: dict, etag: str):
+    """
+    JSON yanıtına ETag ekle.
+    İstemcinin If-None-Match başlığı eşleşirse gövdesiz 304 Not Modified döner.
+    """
+    response = jsonify(payload)
+    response.set_etag(etag)
+    # Tarayıcı her istekte ETag ile doğrulama yapsın
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
 @app.route('/api/portfolio', methods=['GET'])
 def api_portfolio():
     """Portföy listesi"""
     try:
-        return jsonify({
+        pdb = user_db()
+        payload = {
             "success": True,
-            "data": db.getir(),
-            "summary": db.ozet()
-        })
+            "data": pdb.getir(),
+            "summary": pdb.ozet()
+        }
+        return conditional_json(payload, pdb.etag("portfolio"))
     except Exception as e:
         logger.error(f"Portföy API hatası: {e}")
         return jsonify({"success": False, "error": str(e), "data": [], "summary": {}})
@@ -430,7 +890,7 @@ def api_portfolio_add():
         if not sembol or miktar <= 0 or maliyet <= 0:
             return jsonify({"success": False, "error": "Geçersiz parametreler"})
         
-        result = db.ekle(sembol, miktar, maliyet)
+        result = user_db().ekle(sembol, miktar, maliyet)
         return jsonify({"success": True, "message": result})
     except Exception as e:
         logger.error(f"Ekleme hatası: {e}")
@@ -449,7 +909,7 @@ def api_portfolio_sell():
         if not sembol or miktar <= 0 or fiyat <= 0:
             return jsonify({"success": False, "error": "Geçersiz parametreler"})
         
-        result = db.sat(sembol, miktar, fiyat)
+        result = user_db().sat(sembol, miktar, fiyat)
         return jsonify({"success": True, "message": result})
     except Exception as e:
         logger.error(f"Satış hatası: {e}")
@@ -460,7 +920,7 @@ def api_portfolio_sell():
 def api_portfolio_delete(symbol: str):
     """Sembol sil"""
     try:
-        result = db.sil(symbol.upper())
+        result = user_db().sil(symbol.upper())
         return jsonify({"success": True, "message": result})
     except Exception as e:
         logger.error(f"Silme hatası: {e}")
@@ -471,15 +931,69 @@ def api_portfolio_delete(symbol: str):
 def api_history():
     """İşlem geçmişi"""
     try:
-        return jsonify({
+        pdb = user_db()
+        payload = {
             "success": True,
-            "data": db.islem_gecmisi(limit=100)
-        })
+            "data": pdb.islem_gecmisi(limit=100)
+        }
+        return conditional_json(payload, pdb.etag("history"))
     except Exception as e:
         logger.error(f"Geçmiş API hatası: {e}")
         return jsonify({"success": False, "error": str(e), "data": []})
 
 
+# ============================================================
+# GERÇEKLEŞEN KAR/ZARAR RAPORLARI
+# ============================================================
+#
+# Toplamalar veritabanında, her satışta güncellenen aylık özet
+# tablosu (kar_zarar_aylik) üzerinden yapılır.
+
+@app.route('/api/reports/realized')
+def api_reports_realized():
+    """Gerçekleşen kar/zarar: ?group=symbol|month|year&year=2026"""
+    try:
+        grup = request.args.get('group', 'symbol')
+        yil = request.args.get('year', type=int)
+        
+        if grup not in PortfolioDB.RAPOR_GRUPLARI:
+            return jsonify({"success": False, "error": "Geçersiz parametreler"})
+        
+        pdb = user_db()
+        data = pdb.gerceklesen_kar(grup, yil)
+        payload = {
+            "success": True,
+            "group": grup,
+            "year": yil,
+            "data": data,
+            "total": {
+                "kar_zarar": round(sum(d["kar_zarar"] for d in data), 2),
+                "satis_tutari": round(sum(d["satis_tutari"] for d in data), 2),
+                "islem_sayisi": sum(d["islem_sayisi"] for d in data)
+            }
+        }
+        return conditional_json(payload, pdb.etag("realized", grup, yil))
+    except Exception as e:
+        logger.error(f"Rapor API hatası: {e}")
+        return jsonify({"success": False, "error": str(e), "data": []})
+
+
+@app.route('/api/reports/lots')
+def api_reports_lots():
+    """Satılan lotlar (değer artış kazancı beyanı için): ?year=2026&symbol=THYAO"""
+    try:
+        yil = request.args.get('year', type=int)
+        sembol = request.args.get('symbol')
+        
+        pdb = user_db()
+        data = pdb.satis_lotlari(yil, sembol)
+        return conditional_json({"success": True, "year": yil, "data": data},
+                                pdb.etag("lots", yil, sembol))
+    except Exception as e:
+        logger.error(f"Lot raporu API hatası: {e}")
+        return jsonify({"success": False, "error": str(e), "data": []})
+
+
 # ============================================================
 # CSV DIŞA AKTARMA
 # ============================================================
@@ -499,7 +1013,7 @@ def api_export_csv():
     import csv       # CSV dosyası oluşturmak için Python standart modülü
     import io        # StringIO: bellekte dosya gibi davranan nesne
 
-    if not db:
+    if not get_db():
         return jsonify({"success": False, "error": "Veritabanı bağlantısı yok"})
 
     try:
@@ -521,8 +1035,9 @@ def api_export_csv():
         writer.writerow(['=== PORTFÖY ==='])
         writer.writerow(['Sembol', 'Adet', 'Ortalama Maliyet (TL)', 'Toplam Maliyet (TL)', 'İlk Alış Tarihi'])
 
-        # 5) Veritabanından portföy verilerini çek
-        portfolio = db.getir()
+        # 5) Veritabanından (isteği yapan kullanıcının) portföy verilerini çek
+        pdb = user_db()
+        portfolio = pdb.getir()
 
         if portfolio:
             for item in portfolio:
@@ -547,7 +1062,7 @@ def api_export_csv():
         writer.writerow(['Tarih', 'İşlem', 'Sembol', 'Miktar', 'Fiyat (TL)', 'Kar/Zarar (TL)'])
 
         # 7) İşlem geçmişini çek (en son 500 işlem)
-        history = db.islem_gecmisi(limit=500)
+        history = pdb.islem_gecmisi(limit=500)
 
         if history:
             for item in history:
@@ -609,11 +1124,135 @@ CHAT_SYSTEM_PROMPT = """Sen Eren'in akıllı Finans Asistanısın. Web arayüzü
 - Bunlara dayanarak analiz ve yorum yap
 """
 
+chat_context = ChatContextBuilder(CHAT_SYSTEM_PROMPT, compact=CHAT_TOOLS)
+chat_cache = ResponseCache()
+# Araçlar kendi havuzunda çalışır: get_portfolio içindeki get_prices io_pool'u
+# kullandığı için aynı havuzda beklemek tıkanmaya yol açabilir
+tool_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
+
+
+def chat_session_id(data: dict) -> tuple:
+    """Oturumlar kullanıcıya özel: farklı kullanıcılar aynı session_id'yi paylaşmaz"""
+    return current_user_id(), str(data.get('session_id') or 'default')[:64]
+
+
+def cached_price(symbol: str, max_age: float = 15 * 60):
+    """Sembolün önbellekteki fiyatı (dış çağrı yapmaz; yoksa veya eskiyse None)"""
+    cached = price_cache.get(alert_symbol(symbol))
+    if cached and (time.time() - cached["timestamp"]) < max_age:
+        return cached["data"]["price"]
+    return None
+
+
+def chat_history(session_id: tuple) -> list:
+    """Oturumun sohbet geçmişi (okunamazsa boş)"""
+    try:
+        return chat_store.get(*session_id)
+    except Exception as e:
+        logger.error(f"Sohbet geçmişi okunamadı: {e}")
+        return []
+
+
+def build_chat_messages(history: list, user_message: str) -> list:
+    """Sistem mesajı + portföy context'i + geçmiş + yeni soru (CHAT_TOKEN_BUDGET içinde)"""
+    portfolio_block = ""
+    try:
+        if get_db():
+            portfolio_block = chat_context.portfolio_block(user_db(), cached_price)
+    except Exception as e:
+        logger.error(f"Portföy context'i oluşturulamadı: {e}")
+    
+    return chat_context.build(portfolio_block, history, user_message)
+
+
+def chat_cache_key(user_message: str, history: list):
+    """
+    Yanıt önbelleği anahtarı: normalize soru + geçmiş özeti + portföy versiyonu + fiyat kovaları.
+    Fiyat kovası portföydeki ve soruda geçen (önbellekte fiyatı olan) sembolleri kapsar.
+    Veritabanı yoksa portföy versiyonu bilinmediği için yanıt önbelleğe alınmaz.
+    """
+    if not get_db():
+        return None
+    try:
+        pdb = user_db()
+        symbols = {p["sembol"] for p in pdb.getir()}
+        symbols |= {alert_symbol(w) for w in normalize_question(user_message).upper().split()
+                    if alert_symbol(w) in price_cache}
+        prices = tuple(sorted((s, price_bucket(cached_price(s))) for s in symbols))
+        return chat_cache.key(user_message, history_digest(history), pdb.etag("chat"), prices)
+    except Exception as e:
+        logger.error(f"Chat önbellek anahtarı oluşturulamadı: {e}")
+        return None
+
+
+def chat_tool_handlers(pdb) -> dict:
+    """Chatbot araçları (isteğin kullanıcısına bağlı; istek dışında thread havuzunda çalışır)"""
+
+    def price_tool(symbol: str):
+        return get_price_for_symbol(alert_symbol(symbol))
+
+    def portfolio_tool():
+        portfolio = pdb.getir()
+        prices = get_prices(p["sembol"] for p in portfolio)
+        for p in portfolio:
+            result = prices.get(p["sembol"].upper(), {})
+            if result.get("success"):
+                p["guncel_fiyat"] = result["price"]
+                p["guncel_deger"] = round(p["adet"] * result["price"], 2)
+                p["kar_zarar"] = round(p["guncel_deger"] - p["toplam_maliyet"], 2)
+        return portfolio
+
+    def transactions_tool(symbol: str = None, limit: int = 10):
+        return pdb.islem_gecmisi(symbol or None, max(1, min(int(limit), 50)))
+
+    def history_tool(symbol: str, days: int = 30):
+        start = (datetime.now() - timedelta(days=max(2, min(int(days), 365)))).date()
+        return summarize_history(get_price_history(alert_symbol(symbol), start))
+
+    return {
+        "get_price": price_tool,
+        "get_portfolio": portfolio_tool,
+        "get_transactions": transactions_tool,
+        "get_price_history": history_tool,
+    }
+
+
+# Veritabanı gerektiren araçlar (veritabanı yoksa modele sunulmaz)
+DB_TOOLS = {"get_portfolio", "get_transactions"}
+
+
+def chat_llm_options() -> dict:
+    """
+    llm.complete/stream için araç parametreleri (CHAT_TOOLS kapalıysa boş).
+    Veritabanı yoksa sadece fiyat araçları verilir.
+    """
+    if not CHAT_TOOLS:
+        return {}
+    if get_db():
+        handlers = chat_tool_handlers(user_db())
+    else:
+        handlers = {name: tool for name, tool in chat_tool_handlers(None).items() if name not in DB_TOOLS}
+    schemas = [tool for tool in TOOL_SCHEMAS if tool["function"]["name"] in handlers]
+    runner = ToolRunner(handlers, tool_pool)
+    return {"tools": schemas, "run_tools": runner.run, "max_rounds": CHAT_TOOL_ROUNDS}
+
+
+def save_chat_turn(session_id: tuple, user_message: str, ai_reply: str):
+    """Soru-cevabı oturum geçmişine ekle (oturum başına CHAT_HISTORY_LIMIT mesaj)"""
+    try:
+        chat_store.append(*session_id, [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": ai_reply},
+        ])
+    except Exception as e:
+        logger.error(f"Sohbet geçmişi kaydedilemedi: {e}")
+
 
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
     """AI Chatbot endpoint"""
     try:
+        groq_client = get_groq_client()
         if not groq_client:
             return jsonify({
                 "success": False, 
@@ -622,144 +1261,477 @@ def api_chat():
         
         data = request.json
         user_message = data.get('message', '').strip()
-        session_id = data.get('session_id', 'default')
+        session_id = chat_session_id(data)
         
         if not user_message:
             return jsonify({"success": False, "error": "Mesaj boş olamaz"})
         
-        # Portföy bilgilerini context olarak ekle
-        portfolio_context = ""
-        try:
-            portfolio = db.getir()
-            summary = db.ozet()
-            if portfolio:
-                portfolio_context = f"\n\n📊 Kullanıcının Portföyü:\n"
-                portfolio_context += f"Toplam Maliyet: {summary.get('toplam_maliyet', 0)} TL\n"
-                portfolio_context += f"Sembol Sayısı: {summary.get('sembol_sayisi', 0)}\n"
-                for p in portfolio:
-                    portfolio_context += f"- {p['sembol']}: {p['adet']} adet, ort. {p['alis_fiyati']} TL, toplam {p['toplam_maliyet']} TL\n"
-        except Exception:
-            pass
-        
-        # Chat geçmişini al veya oluştur
-        if session_id not in chat_sessions:
-            chat_sessions[session_id] = []
-        
-        messages = [
-            {"role": "system", "content": CHAT_SYSTEM_PROMPT + portfolio_context}
-        ]
-        
-        # Son 10 mesajı ekle (context window'u aşmasın)
-        messages.extend(chat_sessions[session_id][-10:])
-        messages.append({"role": "user", "content": user_message})
-        
-        # Groq API çağrısı
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=messages,
-            max_tokens=1024,
-            temperature=0.7
-        )
-        
-        ai_reply = response.choices[0].message.content
-        
-        # Geçmişe kaydet
-        chat_sessions[session_id].append({"role": "user", "content": user_message})
-        chat_sessions[session_id].append({"role": "assistant", "content": ai_reply})
-        
-        # Max 20 mesaj tut
-        if len(chat_sessions[session_id]) > 20:
-            chat_sessions[session_id] = chat_sessions[session_id][-20:]
+        history = chat_history(session_id)
+        cache_key = chat_cache_key(user_message, history)
+        ai_reply = chat_cache.get(cache_key)
+        cached = ai_reply is not None
+        if not cached:
+            stats = {}
+            ai_reply = llm.complete(groq_client, build_chat_messages(history, user_message),
+                                    stats=stats, **chat_llm_options())
+            # Araç verisiyle üretilen yanıt anahtarda olmayan canlı veriye dayanır; önbelleğe alınmaz
+            if not stats["tool_calls"]:
+                chat_cache.set(cache_key, ai_reply)
+        save_chat_turn(session_id, user_message, ai_reply)
         
         return jsonify({
             "success": True,
-            "reply": ai_reply
+            "reply": ai_reply,
+            "cached": cached
         })
+    except llm.LLMBusyError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     except Exception as e:
         logger.error(f"Chat API hatası: {e}")
         return jsonify({"success": False, "error": f"AI hatası: {str(e)}"})
 
 
+def sse_event(event: str, data) -> str:
+    """Server-Sent Events mesajı (veri JSON; satır sonları güvenli)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route('/api/chat/stream', methods=['POST'])
+def api_chat_stream():
+    """
+    AI Chatbot - akışlı yanıt (SSE).
+    Olaylar: 'token' {"t": parça}, 'done' {"ttft_ms", "total_ms", "cached"}, 'error' {"error"}.
+    Yanıt tamamlandığında oturum geçmişine kaydedilir; yarıda kesilen yanıt kaydedilmez.
+    Önbellekteki yanıt tek 'token' olayıyla hemen gönderilir.
+    """
+    groq_client = get_groq_client()
+    if not groq_client:
+        return jsonify({
+            "success": False,
+            "error": "AI servisi yapılandırılmamış. .env dosyasında GROQ_API_KEY olmalı."
+        })
+    
+    data = request.json or {}
+    user_message = data.get('message', '').strip()
+    if not user_message:
+        return jsonify({"success": False, "error": "Mesaj boş olamaz"})
+    
+    session_id = chat_session_id(data)
+    history = chat_history(session_id)
+    cache_key = chat_cache_key(user_message, history)
+    cached_reply = chat_cache.get(cache_key)
+    if cached_reply is not None:
+        save_chat_turn(session_id, user_message, cached_reply)
+        body = sse_event("token", {"t": cached_reply}) + \
+            sse_event("done", {"ttft_ms": 0, "total_ms": 0, "cached": True})
+        return Response(body, mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+    
+    messages = build_chat_messages(history, user_message)
+    options = chat_llm_options()
+
+    def events():
+        stats, parts = {}, []
+        try:
+            for delta in llm.stream(groq_client, messages, stats, **options):
+                parts.append(delta)
+                yield sse_event("token", {"t": delta})
+        except llm.LLMBusyError as e:
+            yield sse_event("error", {"error": str(e)})
+            return
+        except Exception as e:
+            logger.error(f"Chat stream hatası: {e}")
+            yield sse_event("error", {"error": f"AI hatası: {str(e)}"})
+            return
+        
+        reply = "".join(parts)
+        if not stats["tool_calls"]:
+            chat_cache.set(cache_key, reply)
+        save_chat_turn(session_id, user_message, reply)
+        ttft = stats.get("ttft")
+        logger.info("💬 Chat akışı: ilk token %s ms, toplam %.0f ms, %s araç çağrısı",
+                    f"{ttft * 1000:.0f}" if ttft is not None else "-", stats["total"] * 1000,
+                    stats["tool_calls"])
+        yield sse_event("done", {
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "total_ms": round(stats["total"] * 1000, 1),
+            "tool_calls": stats["tool_calls"],
+            "cached": False,
+        })
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route('/api/chat/clear', methods=['POST'])
 def api_chat_clear():
     """Chat geçmişini temizle"""
-    session_id = request.json.get('session_id', 'default')
-    chat_sessions[session_id] = []
-    return jsonify({"success": True})
+    try:
+        chat_store.clear(*chat_session_id(request.json or {}))
+        return jsonify({"success": True})
+    except Exception as e:
+        logger.error(f"Sohbet temizleme hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
 
 
 # ============================================================
 # PORTFÖY PERFORMANS API
 # ============================================================
 
+def portfolio_performance(portfolio: list) -> dict:
+    """
+    Pozisyonları anlık fiyatlarla değerle.
+    Her sembol için tek fiyat sorgusu yapılır; sorgular eşzamanlıdır.
+
+    Returns:
+        {"data": pozisyon listesi, "total": toplamlar, "etag": fiyat özeti}
+    """
+    performance_data = []
+    toplam_maliyet = 0
+    toplam_guncel = 0
+    prices = get_prices(p["sembol"] for p in portfolio)
+    
+    for p in portfolio:
+        item = {
+            "sembol": p["sembol"],
+            "adet": p["adet"],
+            "alis_fiyati": p["alis_fiyati"],
+            "toplam_maliyet": p["toplam_maliyet"],
+            "guncel_fiyat": None,
+            "guncel_deger": None,
+            "kar_zarar": None,
+            "kar_zarar_yuzde": None
+        }
+        
+        # Anlık fiyat (eşzamanlı çekildi)
+        try:
+            price_data = prices.get(p["sembol"].upper().strip(), {})
+            if price_data.get("success"):
+                guncel = price_data["price"]
+                item["guncel_fiyat"] = guncel
+                item["guncel_deger"] = round(guncel * p["adet"], 2)
+                item["kar_zarar"] = round(item["guncel_deger"] - p["toplam_maliyet"], 2)
+                if p["toplam_maliyet"] > 0:
+                    item["kar_zarar_yuzde"] = round((item["kar_zarar"] / p["toplam_maliyet"]) * 100, 2)
+                
+                toplam_guncel += item["guncel_deger"]
+        except Exception:
+            pass
+        
+        toplam_maliyet += p["toplam_maliyet"]
+        performance_data.append(item)
+    
+    if not performance_data:
+        return {"data": [], "total": {}, "etag": "0"}
+    
+    toplam_kar = round(toplam_guncel - toplam_maliyet, 2) if toplam_guncel > 0 else None
+    toplam_yuzde = round((toplam_kar / toplam_maliyet) * 100, 2) if toplam_maliyet > 0 and toplam_kar is not None else None
+    
+    # Yanıt fiyatlara da bağlı: ETag'e kullanılan fiyatların özeti eklenir
+    fiyatlar = repr([item["guncel_fiyat"] for item in performance_data]).encode()
+    return {
+        "data": performance_data,
+        "total": {
+            "toplam_maliyet": round(toplam_maliyet, 2),
+            "toplam_guncel": round(toplam_guncel, 2) if toplam_guncel > 0 else None,
+            "toplam_kar_zarar": toplam_kar,
+            "kar_zarar_yuzde": toplam_yuzde
+        },
+        "etag": format(zlib.crc32(fiyatlar), "x")
+    }
+
+
 @app.route('/api/portfolio/performance')
 def api_portfolio_performance():
     """Portföy performans verileri - anlık fiyatlarla karşılaştırma"""
     try:
-        portfolio = db.getir()
-        if not portfolio:
-            return jsonify({"success": True, "data": [], "total": {}})
+        pdb = user_db()
+        perf = portfolio_performance(pdb.getir())
+        payload = {"success": True, "data": perf["data"], "total": perf["total"]}
+        return conditional_json(payload, pdb.etag("performance", perf["etag"]))
+    except Exception as e:
+        logger.error(f"Performans API hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    """
+    Dashboard'un ihtiyaç duyduğu her şey tek istekte: portföy, özet,
+    performans, son işlemler ve alarmlar. Sorgular tek bağlantıyla,
+    fiyatlar sembol başına bir kez alınır.
+    """
+    if not get_db():
+        return jsonify({"success": False, "error": "Veritabanı bağlantısı yok"})
+    
+    try:
+        pdb = user_db()
+        with pdb.shared_connection():
+            portfolio = pdb.getir()
+            summary = pdb.ozet()
+            recent = pdb.islem_gecmisi(limit=5)
+            islem_sayisi = pdb.islem_sayisi()
+            alerts = pdb.alarmlar()
         
-        performance_data = []
-        toplam_maliyet = 0
-        toplam_guncel = 0
+        perf = portfolio_performance(portfolio)
         
-        for p in portfolio:
-            item = {
-                "sembol": p["sembol"],
-                "adet": p["adet"],
-                "alis_fiyati": p["alis_fiyati"],
-                "toplam_maliyet": p["toplam_maliyet"],
-                "guncel_fiyat": None,
-                "guncel_deger": None,
-                "kar_zarar": None,
-                "kar_zarar_yuzde": None
-            }
-            
-            # Anlık fiyat çek
-            try:
-                price_data = get_price_for_symbol(p["sembol"])
-                if price_data.get("success"):
-                    guncel = price_data["price"]
-                    item["guncel_fiyat"] = guncel
-                    item["guncel_deger"] = round(guncel * p["adet"], 2)
-                    item["kar_zarar"] = round(item["guncel_deger"] - p["toplam_maliyet"], 2)
-                    if p["toplam_maliyet"] > 0:
-                        item["kar_zarar_yuzde"] = round((item["kar_zarar"] / p["toplam_maliyet"]) * 100, 2)
-                    
-                    toplam_guncel += item["guncel_deger"]
-            except Exception:
-                pass
-            
-            toplam_maliyet += p["toplam_maliyet"]
-            performance_data.append(item)
+        payload = {
+            "success": True,
+            "portfolio": portfolio,
+            "summary": summary,
+            "performance": {"data": perf["data"], "total": perf["total"]},
+            "history": {"recent": recent, "count": islem_sayisi},
+            "alerts": alerts
+        }
+        alarm_ozeti = format(zlib.crc32(repr(alerts).encode()), "x")
+        return conditional_json(payload, pdb.etag("dashboard", perf["etag"], alarm_ozeti))
+    except Exception as e:
+        logger.error(f"Dashboard API hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
+@app.route('/api/portfolio/analytics')
+def api_portfolio_analytics():
+    """Performans analitiği: TWR, XIRR, kayan volatilite, maksimum düşüş, varlık katkısı"""
+    try:
+        from analytics import portfolio_analytics, VOLATILITY_WINDOW
         
-        toplam_kar = round(toplam_guncel - toplam_maliyet, 2) if toplam_guncel > 0 else None
-        toplam_yuzde = round((toplam_kar / toplam_maliyet) * 100, 2) if toplam_maliyet > 0 and toplam_kar is not None else None
+        pencere = request.args.get('window', VOLATILITY_WINDOW, type=int)
+        if pencere < 2 or pencere > 365:
+            return jsonify({"success": False, "error": "Geçersiz parametreler"})
         
-        return jsonify({
-            "success": True,
-            "data": performance_data,
-            "total": {
-                "toplam_maliyet": round(toplam_maliyet, 2),
-                "toplam_guncel": round(toplam_guncel, 2) if toplam_guncel > 0 else None,
-                "toplam_kar_zarar": toplam_kar,
-                "kar_zarar_yuzde": toplam_yuzde
-            }
-        })
+        pdb = user_db()
+        result = portfolio_analytics(pdb, get_prices, get_price_histories, pencere)
+        
+        fiyatlar = format(zlib.crc32(repr(result.get("guncel_deger")).encode()), "x")
+        return conditional_json({"success": True, "data": result},
+                                pdb.etag("analytics", pencere, result.get("bitis"), fiyatlar))
     except Exception as e:
-        logger.error(f"Performans API hatası: {e}")
+        logger.error(f"Analitik API hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
+@app.route('/api/portfolio/timeseries')
+def api_portfolio_timeseries():
+    """Günlük portföy değeri (tarih aralığı, isteğe bağlı tek sembol)"""
+    try:
+        from snapshots import refresh_snapshots
+        
+        start = request.args.get('start') or None
+        end = request.args.get('end') or None
+        symbol = (request.args.get('symbol') or '').upper().strip() or None
+        try:
+            for value in (start, end):
+                if value:
+                    datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            return jsonify({"success": False, "error": "Geçersiz parametreler"})
+        
+        pdb = user_db()
+        refresh_snapshots(pdb, get_price_histories, get_prices)
+        series = pdb.snapshot_serisi(start, end, symbol)
+        
+        ozet = format(zlib.crc32(repr(series).encode()), "x")
+        return conditional_json({"success": True, "data": series},
+                                pdb.etag("timeseries", start, end, symbol, ozet))
+    except Exception as e:
+        logger.error(f"Zaman serisi API hatası: {e}")
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route('/api/portfolio/lots')
+def api_portfolio_lots():
+    """Lot bazlı değerleme: her alış lotu için güncel değer, kar/zarar ve elde tutma süresi"""
+    try:
+        from valuation import portfolio_lots
+        
+        pdb = user_db()
+        result = portfolio_lots(pdb, get_prices)
+        payload = {"success": True, **result}
+        
+        fiyatlar = repr([item["guncel_fiyat"] for item in result["symbols"]]).encode()
+        return conditional_json(payload, pdb.etag("portfolio-lots", format(zlib.crc32(fiyatlar), "x")))
+    except Exception as e:
+        logger.error(f"Lot değerleme API hatası: {e}")
+        return jsonify({"success": False, "error": str(e), "lots": [], "symbols": []})
+
+
 # ============================================================
 # FİYAT ALARMLARI API
 # ============================================================
 
+# Alarmlar veritabanında tutulur (tüm instance'lar paylaşır, her değişiklik
+# tek satır). Bekleyen alarmlar ayrıca bellekte sembole ve eşiğe göre
+# indekslenir; değerlendirme her tarayıcının sorgusunda değil, bir sembolün
+# yeni fiyatı çekildiğinde (get_price_for_symbol / piyasa özeti) yapılır.
+# İndeks ALERT_SYNC_TTL saniyede bir veritabanından yenilenir; böylece başka
+# instance'larda eklenen/silinen alarmlar da fark edilir.
+#
+# Fiyatlar tarayıcı sekmelerinden bağımsız olarak arka planda tazelenir:
+#   - sunucu süreci: ilk istekte başlayan, ALERT_EVAL_INTERVAL saniyede bir çalışan thread
+#   - ayrı süreç:    python alert_worker.py
+#   - serverless:    Vercel Cron → /api/alerts/evaluate (CRON_SECRET) ve
+#                    dashboard'un /api/alerts/check sorgusu
+# Dashboard tetiklenen alarmları /api/alerts/check ile alır; ALERT_WEBHOOK_URL
+# tanımlıysa alarmlar webhook'a da iletilir.
+
+ALERT_SYNC_TTL = float(os.environ.get("ALERT_SYNC_TTL", 30))
+# Serverless'ta (Vercel) istekler arasında thread çalışmaz: değerlendirici
+# başlatılmaz, fiyatlar /api/alerts/check ve Vercel Cron ile tazelenir
+SERVERLESS = bool(os.environ.get("VERCEL") or os.environ.get("VERCEL_REGION"))
+ALERT_EVAL_INTERVAL = float(os.environ.get("ALERT_EVAL_INTERVAL", 0 if SERVERLESS else CACHE_TTL))
+ALERT_WEBHOOK_URL = os.environ.get("ALERT_WEBHOOK_URL")
+CRON_SECRET = os.environ.get("CRON_SECRET")
+
+_alert_state = {"index": None, "timestamp": 0.0, "refreshing": False}
+_alert_lock = threading.Lock()
+
+
+def alert_symbol(symbol: str) -> str:
+    """Alarm sembolünü fiyat önbelleğindeki adına çevir (DOLAR → USD, GOLD → ALTIN)"""
+    symbol = symbol.upper().strip()
+    return FX_ALIASES.get(symbol, symbol)
+
+
+def migrate_legacy_alerts(db):
+    """alarmlar.json'daki eski alarmları veritabanına bir kez aktar (get_db ilk açılışta çağırır)"""
+    if not os.path.exists(ALERTS_FILE):
+        return
+    try:
+        with open(ALERTS_FILE, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        for old in legacy:
+            pdb = db.for_user(old.get("user_id"))
+            alert = pdb.alarm_ekle(alert_symbol(old["symbol"]), old["condition"],
+                                   float(old["target_price"]), old.get("created_at"))
+            if old.get("triggered"):
+                pdb.alarm_tetikle([alert["id"]], old.get("current_price") or 0, old.get("triggered_at"))
+                pdb.alarm_bildirimleri()
+        os.replace(ALERTS_FILE, ALERTS_FILE + ".imported")
+        logger.info(f"📦 {len(legacy)} alarm alarmlar.json dosyasından veritabanına aktarıldı")
+    except Exception as e:
+        logger.error(f"Alarm aktarma hatası: {e}")
+
+
+def get_alert_index() -> AlertIndex:
+    """Bekleyen alarmların indeksi (ilk kullanımda ve ALERT_SYNC_TTL'de bir yenilenir)"""
+    index = _alert_state["index"]
+    if index is not None and time.time() - _alert_state["timestamp"] < ALERT_SYNC_TTL:
+        return index
+    
+    with _alert_lock:
+        if _alert_state["index"] is not None and time.time() - _alert_state["timestamp"] < ALERT_SYNC_TTL:
+            return _alert_state["index"]
+        db = get_db()
+        if db is None:
+            return _alert_state["index"] or AlertIndex()
+        try:
+            _alert_state["index"] = AlertIndex(db.bekleyen_alarmlar())
+            _alert_state["timestamp"] = time.time()
+        except Exception as e:
+            logger.error(f"Alarm indeksi yüklenemedi: {e}")
+            return _alert_state["index"] or AlertIndex()
+        return _alert_state["index"]
+
+
+def loaded_alert_index():
+    """
+    Fiyat yolu için alarm indeksi: veritabanına bağlanmaz ve beklemez.
+    İndeks bayatsa (ve veritabanı bağlıysa) arka planda yenilenir; hiç
+    yüklenmediyse None döner.
+    """
+    index = _alert_state["index"]
+    stale = index is None or time.time() - _alert_state["timestamp"] >= ALERT_SYNC_TTL
+    if stale and _db is not None and not _alert_state["refreshing"]:
+        _alert_state["refreshing"] = True
+
+        def refresh():
+            try:
+                get_alert_index()
+            finally:
+                _alert_state["refreshing"] = False
+
+        io_pool.submit(refresh)
+    return index
+
+
+def on_price_update(symbol: str, price: float) -> list:
+    """Yeni fiyatla tetiklenen alarmları veritabanında işaretle; tetiklenen id'leri döndür"""
+    index = loaded_alert_index()
+    if index is None:
+        return []
+    candidates = index.tetiklenenler(alert_symbol(symbol), price)
+    if not candidates:
+        return []
+    try:
+        triggered = get_db().alarm_tetikle([a["id"] for a in candidates], price)
+    except Exception as e:
+        logger.error(f"Alarm tetikleme hatası: {e}")
+        return []
+    if triggered:
+        logger.info(f"🔔 {len(triggered)} alarm tetiklendi: {symbol} @ {price}")
+        dispatch_alerts([a for a in candidates if a["id"] in triggered], price)
+    return triggered
+
+
+def dispatch_alerts(alerts: list, price: float):
+    """Tetiklenen alarmları webhook'a ilet (fiyat güncellemesini bekletmez)"""
+    if ALERT_WEBHOOK_URL:
+        triggered_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        payload = [{"id": a["id"], "user_id": a["user_id"], "symbol": a["symbol"],
+                    "condition": a["condition"], "target_price": a["target_price"],
+                    "triggered_at": triggered_at, "current_price": price} for a in alerts]
+        io_pool.submit(post_webhook, ALERT_WEBHOOK_URL, payload)
+
+
+def evaluate_alerts() -> int:
+    """
+    Bekleyen alarmların sembollerinin fiyatlarını tazele.
+    Önbellekte olmayan her fiyat get_price_for_symbol → on_price_update
+    üzerinden değerlendirilir; önbellekteki fiyatlar çekildiklerinde
+    zaten değerlendirilmiştir.
+
+    Returns:
+        Fiyatı istenen sembol sayısı
+    """
+    symbols = get_alert_index().semboller()
+    if symbols:
+        get_prices(symbols)
+    return len(symbols)
+
+
+alert_evaluator = AlertEvaluator(evaluate_alerts, ALERT_EVAL_INTERVAL)
+_evaluator_autostarted = False
+
+
+@app.before_request
+def start_alert_evaluator():
+    """
+    Değerlendiriciyi sürecin ilk isteğinde başlat (gunicorn, flask run, ASGI).
+    İçe aktarmada değil istekte başlatıldığı için gunicorn --preload ile
+    fork edilen worker'larda da thread worker'ın kendisinde çalışır.
+    """
+    global _evaluator_autostarted
+    if not _evaluator_autostarted:
+        _evaluator_autostarted = True
+        alert_evaluator.start()
+
+
+def user_alerts() -> list:
+    """İsteği yapan kullanıcının alarmları"""
+    return user_db().alarmlar()
+
+
 @app.route('/api/alerts', methods=['GET'])
 def api_alerts_list():
     """Alarmları listele"""
-    return jsonify({"success": True, "data": price_alerts})
+    if not get_db():
+        return jsonify({"success": False, "error": "Veritabanı bağlantısı yok"})
+    
+    try:
+        return jsonify({"success": True, "data": user_alerts()})
+    except Exception as e:
+        logger.error(f"Alarm listeleme hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
 
 
 @app.route('/api/alerts', methods=['POST'])
@@ -767,20 +1739,20 @@ def api_alerts_add():
     """Alarm ekle"""
     try:
         data = request.json
-        alert = {
-            "id": int(datetime.now().timestamp() * 1000),
-            "symbol": data.get('symbol', '').upper(),
-            "condition": data.get('condition', 'above'),  # 'above' veya 'below'
-            "target_price": float(data.get('target_price', 0)),
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "triggered": False
-        }
+        symbol = alert_symbol(data.get('symbol', ''))
+        condition = data.get('condition', 'above')  # 'above' veya 'below'
+        target_price = float(data.get('target_price', 0))
         
-        if not alert["symbol"] or alert["target_price"] <= 0:
+        if not symbol or target_price <= 0 or condition not in ("above", "below"):
             return jsonify({"success": False, "error": "Geçersiz parametreler"})
         
-        price_alerts.append(alert)
-        save_alerts()
+        alert = user_db().alarm_ekle(symbol, condition, target_price)
+        get_alert_index().ekle(alert)
+        
+        # Sembolün güncel fiyatı önbellekteyse alarm hemen değerlendirilir
+        cached = price_cache.get(symbol)
+        if cached and (time.time() - cached["timestamp"]) < CACHE_TTL:
+            on_price_update(symbol, cached["data"]["price"])
         
         return jsonify({"success": True, "alert": alert})
     except Exception as e:
@@ -791,49 +1763,49 @@ def api_alerts_add():
 @app.route('/api/alerts/<int:alert_id>', methods=['DELETE'])
 def api_alerts_delete(alert_id: int):
     """Alarm sil"""
-    global price_alerts
-    price_alerts = [a for a in price_alerts if a["id"] != alert_id]
-    save_alerts()
-    return jsonify({"success": True})
+    try:
+        if user_db().alarm_sil(alert_id):
+            get_alert_index().sil(alert_id)
+        return jsonify({"success": True})
+    except Exception as e:
+        logger.error(f"Alarm silme hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
 
 
 @app.route('/api/alerts/check')
 def api_alerts_check():
-    """Alarmları kontrol et"""
+    """
+    Kullanıcının yeni tetiklenen alarmları (dashboard açıkken dakikada bir sorgulanır).
+    Bu süreçte arka plan değerlendiricisi çalışıyorsa sadece bildirimler
+    okunur; çalışmıyorsa (serverless, ALERT_EVAL_INTERVAL=0) bekleyen
+    alarmların fiyatları burada tazelenir. Fiyatlar önbellekten geldiği için
+    aynı sembolü soran sekmeler dış kaynağa tekrar gitmez.
+    """
     try:
-        triggered = []
-        for alert in price_alerts:
-            if alert["triggered"]:
-                continue
-            
-            try:
-                price_data = get_price_for_symbol(alert["symbol"])
-                if price_data.get("success"):
-                    current_price = price_data["price"]
-                    
-                    should_trigger = False
-                    if alert["condition"] == "above" and current_price >= alert["target_price"]:
-                        should_trigger = True
-                    elif alert["condition"] == "below" and current_price <= alert["target_price"]:
-                        should_trigger = True
-                    
-                    if should_trigger:
-                        alert["triggered"] = True
-                        alert["triggered_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                        alert["current_price"] = current_price
-                        triggered.append(alert)
-            except Exception:
-                pass
-        
-        if triggered:
-            save_alerts()
-        
-        return jsonify({"success": True, "triggered": triggered})
+        pdb = user_db()
+        if not alert_evaluator.running:
+            get_prices({a["symbol"] for a in pdb.alarmlar() if not a["triggered"]})
+        return jsonify({"success": True, "triggered": pdb.alarm_bildirimleri()})
     except Exception as e:
         logger.error(f"Alarm kontrol hatası: {e}")
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route('/api/alerts/evaluate', methods=['GET', 'POST'])
+def api_alerts_evaluate():
+    """
+    Alarmları bir kez değerlendir (vercel.json'daki Vercel Cron gibi dış zamanlayıcılar için).
+    CRON_SECRET tanımlı değilse kapalıdır.
+    """
+    if not CRON_SECRET or request.headers.get("Authorization") != f"Bearer {CRON_SECRET}":
+        return jsonify({"success": False, "error": "unauthorized"}), 401
+    try:
+        return jsonify({"success": True, "symbols": evaluate_alerts()})
+    except Exception as e:
+        logger.error(f"Alarm değerlendirme hatası: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
 # ============================================================
 # RUN
 # ============================================================
@@ -848,7 +1820,8 @@ if __name__ == '__main__':
     print("     /portfolio ... Portföy")
     print("     /market ...... Piyasa")
     print("     /history ..... İşlem Geçmişi")
-    print("  🤖 AI Chatbot:  Aktif" if groq_client else "  🤖 AI Chatbot:  Pasif (GROQ_API_KEY yok)")
+    print("  🤖 AI Chatbot:  Aktif" if GROQ_API_KEY else "  🤖 AI Chatbot:  Pasif (GROQ_API_KEY yok)")
     print("=" * 50 + "\n")
     
+    alert_evaluator.start()
     app.run(debug=True, port=5000, use_reloader=False)
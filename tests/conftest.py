@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modüller src/ içinden düz import edilir (web_app.py ile aynı düzen)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
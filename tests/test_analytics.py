@@ -0,0 +1,38 @@
+from datetime import date
+
+import numpy as np
+
+from analytics import build_series
+
+
+def _deger(seri):
+    return np.nansum(seri["fiyat"] * seri["miktar"], axis=1)
+
+
+def test_guncelleme_maliyeti_degerlemeyi_degistirmez():
+    # Piyasa verisi 2. günde biter; sonraki günler son piyasa fiyatıyla (120) ileri doldurulur
+    alis = {"sembol": "THYAO", "islem": "ALIS", "miktar": 10.0, "fiyat": 100.0,
+            "tarih": "2024-01-01 10:00", "detay": None}
+    guncelleme = {"sembol": "THYAO", "islem": "GUNCELLEME", "miktar": 10.0, "fiyat": 95.0,
+                  "tarih": "2024-01-04 10:00", "detay": "Eski: 10.0@100.0"}
+    gecmis = {"THYAO": (["2024-01-01", "2024-01-02"], [100.0, 120.0])}
+    bugun = date(2024, 1, 6)
+
+    once = build_series([alis], gecmis, bugun=bugun)
+    sonra = build_series([alis, guncelleme], gecmis, bugun=bugun)
+
+    np.testing.assert_allclose(sonra["fiyat"][:, 0], [100, 120, 120, 120, 120, 120])
+    np.testing.assert_allclose(_deger(sonra), _deger(once))
+
+
+def test_alis_satis_fiyati_piyasa_gozlemi_sayilir():
+    islemler = [
+        {"sembol": "ASELS", "islem": "ALIS", "miktar": 5.0, "fiyat": 50.0,
+         "tarih": "2024-01-01", "detay": None},
+        {"sembol": "ASELS", "islem": "SATIS", "miktar": 2.0, "fiyat": 60.0,
+         "tarih": "2024-01-03", "detay": None},
+    ]
+    seri = build_series(islemler, {}, bugun=date(2024, 1, 4))
+
+    np.testing.assert_allclose(seri["fiyat"][:, 0], [50, 50, 60, 60])
+    np.testing.assert_allclose(seri["miktar"][:, 0], [5, 5, 3, 3])
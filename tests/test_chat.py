@@ -0,0 +1,57 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import web_app
+
+
+class SahteGroq:
+    """Groq istemcisi yerine: çağrıları kaydeder, araç istemeden yanıtlar"""
+
+    def __init__(self, cevap="Merhaba!"):
+        self.cevap = cevap
+        self.cagrilar = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.cagrilar.append(kwargs)
+        if kwargs.get("stream"):
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self.cevap))])])
+        message = SimpleNamespace(content=self.cevap, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Veritabanı olmadan çalışan uygulama (get_db() None döner)"""
+    monkeypatch.setattr(web_app, "_db", None)
+    monkeypatch.setattr(web_app, "_db_failed_at", time.monotonic())
+    monkeypatch.setattr(web_app, "DB_RETRY_INTERVAL", 3600)
+    monkeypatch.setattr(web_app, "_evaluator_autostarted", True)
+    monkeypatch.setattr(web_app, "CHAT_TOOLS", True)
+    groq = SahteGroq()
+    monkeypatch.setattr(web_app, "get_groq_client", lambda: groq)
+    with web_app.app.test_client() as c:
+        c.groq = groq
+        yield c
+
+
+def _araclar(cagri):
+    return {t["function"]["name"] for t in cagri.get("tools", [])}
+
+
+def test_chat_veritabani_yokken_fiyat_araclariyla_yanitlar(client):
+    r = client.post("/api/chat", json={"message": "THYAO kaç TL?", "session_id": "t1"})
+    assert r.get_json() == {"success": True, "reply": "Merhaba!", "cached": False}
+    assert _araclar(client.groq.cagrilar[0]) == {"get_price", "get_price_history"}
+    # Geçmiş bellekte tutulur
+    assert len(web_app.chat_store.get(web_app.DEFAULT_USER_ID, "t1")) == 2
+
+
+def test_chat_akisi_veritabani_yokken_calisir(client):
+    r = client.post("/api/chat/stream", json={"message": "merhaba", "session_id": "t2"})
+    assert r.status_code == 200
+    govde = r.get_data(as_text=True)
+    assert "event: token" in govde and "event: done" in govde
+    assert _araclar(client.groq.cagrilar[0]) == {"get_price", "get_price_history"}
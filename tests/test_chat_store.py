@@ -0,0 +1,22 @@
+import logging
+
+from chat_store import DatabaseSessionStore, create_session_store
+
+
+MESAJLAR = [{"role": "user", "content": "merhaba"}, {"role": "assistant", "content": "selam"}]
+
+
+def test_veritabani_yoksa_gecmis_bellekte_tutulur(caplog):
+    store = create_session_store(lambda: None, backend="database")
+    assert isinstance(store, DatabaseSessionStore)
+
+    with caplog.at_level(logging.WARNING, logger="ChatStore"):
+        store.append("u", "s", MESAJLAR)
+        store.append("u", "s", MESAJLAR)
+    assert store.get("u", "s") == MESAJLAR * 2
+    assert store.get("baska", "s") == []
+    # Uyarı her istekte değil, bir kez yazılır
+    assert len([r for r in caplog.records if "bellekte" in r.getMessage()]) == 1
+
+    store.clear("u", "s")
+    assert store.get("u", "s") == []
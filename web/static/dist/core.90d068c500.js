@@ -0,0 +1,50 @@
+const API={prepareUrl(endpoint){const prefix=typeof SCRIPT_ROOT!=='undefined'?SCRIPT_ROOT:'';if(endpoint.startsWith('http'))return endpoint;const cleanEndpoint=endpoint.startsWith('/')?endpoint:'/'+endpoint;return prefix+cleanEndpoint;},async get(endpoint){try{const url=this.prepareUrl(endpoint);const res=await fetch(url);return await res.json();}catch(error){console.error('API Error:',error);return{success:false,error:error.message};}},async post(endpoint,data){try{const url=this.prepareUrl(endpoint);const res=await fetch(url,{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(data)});return await res.json();}catch(error){console.error('API Error:',error);return{success:false,error:error.message};}},async delete(endpoint){try{const url=this.prepareUrl(endpoint);const res=await fetch(url,{method:'DELETE'});return await res.json();}catch(error){console.error('API Error:',error);return{success:false,error:error.message};}}};const UI={showToast(message,type='success'){const toast=document.getElementById('toast');const toastMessage=document.getElementById('toastMessage');const toastIcon=toast.querySelector('.toast-icon');toastMessage.textContent=message;toastIcon.textContent=type==='success'?'✅':'❌';toast.classList.add('active');setTimeout(()=>toast.classList.remove('active'),3000);},formatNumber(num,decimals=2){if(num===undefined||num===null)return'-';return new Intl.NumberFormat('tr-TR',{minimumFractionDigits:decimals,maximumFractionDigits:decimals}).format(num);},formatCurrency(num){return`${this.formatNumber(num)} ₺`;},updateTime(){const el=document.getElementById('currentTime');if(el){const now=new Date();el.textContent=now.toLocaleTimeString('tr-TR',{hour:'2-digit',minute:'2-digit'});}}};async function searchSymbol(){const input=document.getElementById('searchInput');const resultDiv=document.getElementById('searchResult');if(!input||!resultDiv)return;const symbol=input.value.trim().toUpperCase();if(!symbol){resultDiv.classList.remove('active');return;}
+resultDiv.innerHTML='<p style="color: var(--color-text-muted);">🔍 Aranıyor...</p>';resultDiv.classList.add('active');const data=await API.get(`/api/price/${symbol}`);if(data.success){resultDiv.innerHTML=`
+            <div class="search-result-content">
+                <div class="search-result-info">
+                    <h4>${data.name || data.symbol}</h4>
+                    <p>${data.source} • ${data.date || 'Anlık'}</p>
+                </div>
+                <div class="search-result-price">${UI.formatNumber(data.price, 4)} ₺</div>
+            </div>
+        `;}else{resultDiv.innerHTML=`<p style="color: var(--color-danger);">❌ ${data.error || 'Bulunamadı'}</p>`;}}
+function createMarketCard(item){return`
+        <div class="market-card">
+            <div class="market-card-header">
+                <span class="market-symbol">${item.symbol}</span>
+                <span class="market-name">${item.display_name || item.name || ''}</span>
+            </div>
+            <div class="market-price">${UI.formatNumber(item.price, 4)} ₺</div>
+            <div class="market-source">${item.source}</div>
+        </div>
+    `;}
+document.addEventListener('DOMContentLoaded',()=>{UI.updateTime();setInterval(()=>UI.updateTime(),1000);const footerYear=document.getElementById('footerYear');if(footerYear){footerYear.textContent=new Date().getFullYear();}
+const searchBtn=document.getElementById('searchBtn');const searchInput=document.getElementById('searchInput');if(searchBtn){searchBtn.addEventListener('click',searchSymbol);}
+if(searchInput){searchInput.addEventListener('keypress',(e)=>{if(e.key==='Enter')searchSymbol();});}
+const hamburger=document.getElementById('hamburgerBtn');const nav=document.querySelector('.nav');const navOverlay=document.getElementById('navOverlay');function toggleMobileMenu(){hamburger.classList.toggle('active');nav.classList.toggle('active');navOverlay.classList.toggle('active');document.body.style.overflow=nav.classList.contains('active')?'hidden':'';}
+if(hamburger){hamburger.addEventListener('click',toggleMobileMenu);}
+if(navOverlay){navOverlay.addEventListener('click',toggleMobileMenu);}
+document.querySelectorAll('.nav-link').forEach(link=>{link.addEventListener('click',()=>{if(nav&&nav.classList.contains('active')){toggleMobileMenu();}});});});;
+const Chatbot={sessionId:'session_'+Date.now(),isOpen:false,init(){const fab=document.getElementById('chatbotFab');const panel=document.getElementById('chatbotPanel');const closeBtn=document.getElementById('chatClose');const clearBtn=document.getElementById('chatClear');const sendBtn=document.getElementById('chatSend');const input=document.getElementById('chatInput');if(!fab||!panel)return;fab.addEventListener('click',()=>this.toggle());closeBtn?.addEventListener('click',()=>this.close());clearBtn?.addEventListener('click',()=>this.clearChat());sendBtn?.addEventListener('click',()=>this.sendMessage());input?.addEventListener('keypress',(e)=>{if(e.key==='Enter'&&!e.shiftKey){e.preventDefault();this.sendMessage();}});},toggle(){this.isOpen=!this.isOpen;const panel=document.getElementById('chatbotPanel');const fab=document.getElementById('chatbotFab');if(this.isOpen){panel.classList.add('active');fab.classList.add('hidden');document.getElementById('chatInput')?.focus();}else{this.close();}},close(){this.isOpen=false;document.getElementById('chatbotPanel')?.classList.remove('active');document.getElementById('chatbotFab')?.classList.remove('hidden');},async sendMessage(){const input=document.getElementById('chatInput');const message=input.value.trim();if(!message)return;input.value='';this.addMessage(message,'user');this.showTyping();if(window.ReadableStream&&window.TextDecoder){try{if(await this.streamReply(message))return;}catch(e){console.error('Chat stream error:',e);}}
+try{const response=await API.post('/api/chat',{message:message,session_id:this.sessionId});this.removeTyping();if(response.success){const bubble=this.addMessage(response.reply,'bot');if(response.cached)this.markCached(bubble);}else{this.addMessage('❌ '+(response.error||'Bir hata oluştu'),'bot');}}catch(e){this.removeTyping();this.addMessage('❌ Bağlantı hatası oluştu','bot');}},async streamReply(message){const res=await fetch(API.prepareUrl('/api/chat/stream'),{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({message:message,session_id:this.sessionId})});if(!res.ok||!(res.headers.get('Content-Type')||'').startsWith('text/event-stream')){const data=await res.json().catch(()=>null);if(data&&data.error){this.removeTyping();this.addMessage('❌ '+data.error,'bot');return true;}
+return false;}
+const reader=res.body.getReader();const decoder=new TextDecoder();let buffer='';let text='';let bubble=null;const handle=(event,data)=>{if(event==='token'){if(!bubble){this.removeTyping();bubble=this.addMessage('','bot');}
+text+=data.t;bubble.innerHTML=this.formatMarkdown(text);this.scrollToBottom();}else if(event==='error'){this.removeTyping();this.addMessage('❌ '+(data.error||'Bir hata oluştu'),'bot');}else if(event==='done'){this.removeTyping();if(!bubble)bubble=this.addMessage('...','bot');if(data.cached)this.markCached(bubble);}};try{while(true){const{value,done}=await reader.read();if(done)break;buffer+=decoder.decode(value,{stream:true});let sep;while((sep=buffer.indexOf('\n\n'))!==-1){const block=buffer.slice(0,sep);buffer=buffer.slice(sep+2);let event='message';let data='';for(const line of block.split('\n')){if(line.startsWith('event: '))event=line.slice(7);else if(line.startsWith('data: '))data+=line.slice(6);}
+if(data)handle(event,JSON.parse(data));}}}catch(e){this.addMessage('❌ Bağlantı hatası oluştu','bot');}
+this.removeTyping();return true;},addMessage(text,sender){const container=document.getElementById('chatMessages');const div=document.createElement('div');div.className=`chat-message ${sender}`;let formattedText=text;if(sender==='bot'){formattedText=this.formatMarkdown(text);}
+div.innerHTML=`<div class="chat-bubble">${formattedText}</div>`;container.appendChild(div);this.scrollToBottom();return div.firstElementChild;},markCached(bubble){const badge=document.createElement('span');badge.className='chat-cached';badge.textContent='⚡ Önbellekten (aynı soru yakın zamanda yanıtlandı)';bubble.appendChild(badge);},scrollToBottom(){const container=document.getElementById('chatMessages');container.scrollTop=container.scrollHeight;},formatMarkdown(text){return text.replace(/\*\*(.*?)\*\*/g,'<strong>$1</strong>').replace(/\*(.*?)\*/g,'<em>$1</em>').replace(/`(.*?)`/g,'<code>$1</code>').replace(/\n/g,'<br>');},showTyping(){const container=document.getElementById('chatMessages');const div=document.createElement('div');div.className='chat-message bot typing-indicator';div.innerHTML=`
+            <div class="chat-bubble">
+                <div class="typing-dots">
+                    <span></span><span></span><span></span>
+                </div>
+            </div>
+        `;container.appendChild(div);container.scrollTop=container.scrollHeight;},removeTyping(){const typing=document.querySelector('.typing-indicator');if(typing)typing.remove();},async clearChat(){const container=document.getElementById('chatMessages');container.innerHTML=`
+            <div class="chat-message bot">
+                <div class="chat-bubble">
+                    Sohbet temizlendi! 🧹 Yeniden başlayalım. Nasıl yardımcı olabilirim?
+                </div>
+            </div>
+        `;try{await API.post('/api/chat/clear',{session_id:this.sessionId});}catch(e){console.error('Chat clear error:',e);}}};document.addEventListener('DOMContentLoaded',()=>{Chatbot.init();});;
+const Theme={init(){let saved=localStorage.getItem('finans-theme');if(!saved){const prefersDark=window.matchMedia('(prefers-color-scheme: dark)').matches;saved=prefersDark?'dark':'light';}
+this.apply(saved);const toggle=document.getElementById('themeToggle');if(toggle){toggle.addEventListener('click',()=>{const current=document.documentElement.getAttribute('data-theme');const next=current==='dark'?'light':'dark';this.apply(next);localStorage.setItem('finans-theme',next);});}
+window.matchMedia('(prefers-color-scheme: dark)').addEventListener('change',(e)=>{if(!localStorage.getItem('finans-theme')){this.apply(e.matches?'dark':'light');}});},apply(theme){document.documentElement.setAttribute('data-theme',theme);const icon=document.getElementById('themeIcon');if(icon){icon.textContent=theme==='dark'?'☀️':'🌙';}}};document.addEventListener('DOMContentLoaded',()=>{Theme.init();});
\ No newline at end of file
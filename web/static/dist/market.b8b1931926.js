@@ -0,0 +1,8 @@
+function renderGrid(id,items){const grid=document.getElementById(id);if(!grid)return;grid.innerHTML=items?.length>0?items.map(item=>createMarketCard({...item,display_name:item.name})).join(''):'<div class="market-card"><p>Veri yüklenemedi</p></div>';}
+async function loadMarket(){let data={};try{const response=await API.get('/api/market/overview');if(response.success)data=response.data;}catch(e){console.error('Market overview error:',e);}
+renderGrid('currencyGrid',data.currencies);renderGrid('commodityGrid',data.commodities);renderGrid('stockGrid',data.stocks);}
+async function refreshAll(){const btn=document.getElementById('refreshBtn');btn.disabled=true;btn.innerHTML='<span>⏳</span> Yükleniyor...';await loadMarket();btn.disabled=false;btn.innerHTML='<span>🔄</span> Yenile';UI.showToast('Veriler güncellendi!');}
+let converterTimeout=null;async function convertCurrency(){const amount=parseFloat(document.getElementById('converterAmount').value);const from=document.getElementById('converterFrom').value;const resultValue=document.querySelector('.converter-result-value');const info=document.getElementById('converterInfo');if(!amount||isNaN(amount)||amount<=0){resultValue.textContent='-';info.textContent='Geçerli bir miktar girin';return;}
+resultValue.textContent='⏳';info.textContent='Fiyat çekiliyor...';try{const data=await API.get(`/api/convert?from=${from}&to=TRY&amount=${amount}`);if(data.success){resultValue.textContent=UI.formatCurrency(data.result);info.textContent=`1 ${from} = ${UI.formatNumber(data.rate, 4)} ₺`;}else{resultValue.textContent='❌';info.textContent=data.error||'Fiyat alınamadı';}}catch(e){console.error('Converter error:',e);resultValue.textContent='❌';info.textContent='Bağlantı hatası';}}
+function debouncedConvert(){clearTimeout(converterTimeout);converterTimeout=setTimeout(convertCurrency,500);}
+document.addEventListener('DOMContentLoaded',()=>{loadMarket();document.getElementById('refreshBtn')?.addEventListener('click',refreshAll);document.getElementById('converterAmount')?.addEventListener('input',debouncedConvert);document.getElementById('converterFrom')?.addEventListener('change',convertCurrency);convertCurrency();});
\ No newline at end of file
@@ -58,6 +58,15 @@ const Chatbot = {
         this.addMessage(message, 'user');
         this.showTyping();
 
+        // Yanıt token token gelir; akış desteklenmiyorsa tam yanıt beklenir
+        if (window.ReadableStream && window.TextDecoder) {
+            try {
+                if (await this.streamReply(message)) return;
+            } catch (e) {
+                console.error('Chat stream error:', e);
+            }
+        }
+
         try {
             const response = await API.post('/api/chat', {
                 message: message,
@@ -67,7 +76,8 @@ const Chatbot = {
             this.removeTyping();
 
             if (response.success) {
-                this.addMessage(response.reply, 'bot');
+                const bubble = this.addMessage(response.reply, 'bot');
+                if (response.cached) this.markCached(bubble);
             } else {
                 this.addMessage('❌ ' + (response.error || 'Bir hata oluştu'), 'bot');
             }
@@ -77,6 +87,78 @@ const Chatbot = {
         }
     },
 
+    /**
+     * /api/chat/stream yanıtını (SSE) okuyup balona parça parça yazar.
+     * Akış başlatılamadıysa false döner (çağıran tam yanıta düşer).
+     */
+    async streamReply(message) {
+        const res = await fetch(API.prepareUrl('/api/chat/stream'), {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message: message, session_id: this.sessionId })
+        });
+        if (!res.ok || !(res.headers.get('Content-Type') || '').startsWith('text/event-stream')) {
+            const data = await res.json().catch(() => null);
+            if (data && data.error) {
+                this.removeTyping();
+                this.addMessage('❌ ' + data.error, 'bot');
+                return true;
+            }
+            return false;
+        }
+
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let bubble = null;
+
+        const handle = (event, data) => {
+            if (event === 'token') {
+                if (!bubble) {
+                    this.removeTyping();
+                    bubble = this.addMessage('', 'bot');
+                }
+                text += data.t;
+                bubble.innerHTML = this.formatMarkdown(text);
+                this.scrollToBottom();
+            } else if (event === 'error') {
+                this.removeTyping();
+                this.addMessage('❌ ' + (data.error || 'Bir hata oluştu'), 'bot');
+            } else if (event === 'done') {
+                this.removeTyping();
+                if (!bubble) bubble = this.addMessage('...', 'bot');
+                if (data.cached) this.markCached(bubble);
+            }
+        };
+
+        try {
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let sep;
+                while ((sep = buffer.indexOf('\n\n')) !== -1) {
+                    const block = buffer.slice(0, sep);
+                    buffer = buffer.slice(sep + 2);
+                    let event = 'message';
+                    let data = '';
+                    for (const line of block.split('\n')) {
+                        if (line.startsWith('event: ')) event = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
+                    }
+                    if (data) handle(event, JSON.parse(data));
+                }
+            }
+        } catch (e) {
+            // Akış yarıda kesildi: gelen kısım ekranda kalır, tekrar gönderilmez
+            this.addMessage('❌ Bağlantı hatası oluştu', 'bot');
+        }
+        this.removeTyping();
+        return true;
+    },
+
     addMessage(text, sender) {
         const container = document.getElementById('chatMessages');
         const div = document.createElement('div');
@@ -90,6 +172,20 @@ const Chatbot = {
 
         div.innerHTML = `<div class="chat-bubble">${formattedText}</div>`;
         container.appendChild(div);
+        this.scrollToBottom();
+        return div.firstElementChild;
+    },
+
+    // Önbellekten gelen (yeniden üretilmeyen) yanıtları işaretle
+    markCached(bubble) {
+        const badge = document.createElement('span');
+        badge.className = 'chat-cached';
+        badge.textContent = '⚡ Önbellekten (aynı soru yakın zamanda yanıtlandı)';
+        bubble.appendChild(badge);
+    },
+
+    scrollToBottom() {
+        const container = document.getElementById('chatMessages');
         container.scrollTop = container.scrollHeight;
     },
 
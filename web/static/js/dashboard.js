@@ -1,6 +1,7 @@
 /**
- * Dashboard Page JavaScript v3
+ * Dashboard Page JavaScript v4
  * Charts, Performance, Alerts, Auto-refresh
+ * Tüm bölümler tek /api/dashboard isteğinden beslenir
  */
 
 let portfolioChart = null;
@@ -8,45 +9,71 @@ let plChart = null;         // Kar/Zarar çubuk grafiği referansı
 let autoRefreshInterval = null;
 
 // ============================================================
-// DASHBOARD STATS
+// DASHBOARD (Tek istek)
 // ============================================================
+//
+// Portföy, özet, performans, son işlemler ve alarmlar /api/dashboard
+// endpoint'inden tek seferde gelir; her bölüm kendi render fonksiyonuyla çizilir.
+
+async function loadDashboard() {
+    const perfContainer = document.getElementById('performanceSummary');
+    if (perfContainer) {
+        perfContainer.innerHTML = `
+            <div class="perf-loading">
+                <div class="loading-spinner"></div>
+                <span>Fiyatlar yükleniyor...</span>
+            </div>
+        `;
+    }
 
-async function loadDashboardStats() {
+    let data;
     try {
-        const data = await API.get('/api/portfolio');
-        if (data.success) {
-            const summary = data.summary || {};
-            document.getElementById('totalValue').textContent = UI.formatCurrency(summary.toplam_maliyet || 0);
-            document.getElementById('positionCount').textContent = `${summary.sembol_sayisi || 0} Yatırım`;
-        } else {
-            document.getElementById('totalValue').textContent = '0,00 ₺';
-            document.getElementById('positionCount').textContent = '0 Yatırım';
-        }
+        data = await API.get('/api/dashboard');
     } catch (e) {
-        console.error('Dashboard stats error:', e);
+        console.error('Dashboard error:', e);
+        data = { success: false };
     }
 
-    try {
-        const history = await API.get('/api/history');
-        if (history.success) {
-            document.getElementById('transactionCount').textContent = `${history.data?.length || 0} İşlem`;
-        }
-    } catch (e) {
-        document.getElementById('transactionCount').textContent = '0 İşlem';
+    if (!data.success) {
+        data = {
+            success: false,
+            portfolio: [],
+            summary: {},
+            performance: { data: [], total: {} },
+            history: { recent: [], count: 0 },
+            alerts: []
+        };
     }
+
+    renderDashboardStats(data);
+    renderPortfolioChart(data.portfolio);
+    renderPLChart(data.performance);
+    renderPerformance(data.performance, data.success);
+    renderAlerts(data.alerts);
+    renderRecentHistory(data.history.recent);
+}
+
+// ============================================================
+// DASHBOARD STATS
+// ============================================================
+
+function renderDashboardStats(data) {
+    const summary = data.summary || {};
+    document.getElementById('totalValue').textContent = UI.formatCurrency(summary.toplam_maliyet || 0);
+    document.getElementById('positionCount').textContent = `${summary.sembol_sayisi || 0} Yatırım`;
+    document.getElementById('transactionCount').textContent = `${data.history?.count || 0} İşlem`;
 }
 
 // ============================================================
 // PORTFOLIO CHART (Pasta Grafiği)
 // ============================================================
 
-async function loadPortfolioChart() {
+function renderPortfolioChart(portfolio) {
     try {
-        const data = await API.get('/api/portfolio');
         const chartCanvas = document.getElementById('portfolioChart');
         const chartEmpty = document.getElementById('chartEmpty');
 
-        if (!data.success || !data.data?.length) {
+        if (!portfolio?.length) {
             if (chartCanvas) chartCanvas.classList.add('hidden');
             if (chartEmpty) chartEmpty.classList.remove('hidden');
             return;
@@ -55,7 +82,6 @@ async function loadPortfolioChart() {
         if (chartCanvas) chartCanvas.classList.remove('hidden');
         if (chartEmpty) chartEmpty.classList.add('hidden');
 
-        const portfolio = data.data;
         const labels = portfolio.map(p => p.sembol);
         const values = portfolio.map(p => p.toplam_maliyet);
 
@@ -131,21 +157,22 @@ async function loadPortfolioChart() {
 // PORTFOLIO PERFORMANCE (Kar/Zarar)
 // ============================================================
 
-async function loadPerformance() {
+function renderPerformance(data, success = true) {
     const container = document.getElementById('performanceSummary');
     if (!container) return;
 
-    container.innerHTML = `
-        <div class="perf-loading">
-            <div class="loading-spinner"></div>
-            <span>Fiyatlar yükleniyor...</span>
-        </div>
-    `;
+    if (!success) {
+        container.innerHTML = `
+            <div class="empty-state">
+                <div class="empty-state-icon">⚠️</div>
+                <div class="empty-state-text">Veri yüklenemedi</div>
+            </div>
+        `;
+        return;
+    }
 
     try {
-        const data = await API.get('/api/portfolio/performance');
-
-        if (!data.success || !data.data?.length) {
+        if (!data?.data?.length) {
             container.innerHTML = `
                 <div class="empty-state">
                     <div class="empty-state-icon">📈</div>
@@ -222,26 +249,24 @@ async function loadPerformance() {
 // KAR/ZARAR BAR CHART (Çubuk Grafiği)
 // ============================================================
 //
-// Bu fonksiyon /api/portfolio/performance endpoints'inden veri çeker.
+// Bu fonksiyon /api/dashboard yanıtındaki performans verisini kullanır.
 // Her yatırımın kar veya zarar miktarını yatay çubuk (bar) olarak çizer.
 // - Yeşil çubuklar = Kâr eden yatırımlar
 // - Kırmızı çubuklar = Zarar eden yatırımlar
 // Kullanıcı, hangi yatırımının ne kadar kazandırdığını/kaybettirdiğini
 // bir bakışta karşılaştırabilir.
 
-async function loadPLChart() {
+function renderPLChart(data) {
     const chartCanvas = document.getElementById('plChart');
     const chartEmpty = document.getElementById('plChartEmpty');
     if (!chartCanvas) return;
 
     try {
-        // 1) Backend'den performans verisini çek
-        //    Bu endpoint her yatırımın güncel fiyatını çekip
+        // 1) Performans verisi: backend her yatırımın güncel fiyatını çekip
         //    alış maliyetiyle karşılaştırarak kar/zarar hesaplar
-        const data = await API.get('/api/portfolio/performance');
 
         // 2) Veri yoksa veya hata varsa boş mesajı göster
-        if (!data.success || !data.data?.length) {
+        if (!data?.data?.length) {
             chartCanvas.classList.add('hidden');
             if (chartEmpty) chartEmpty.classList.remove('hidden');
             return;
@@ -391,12 +416,20 @@ async function loadQuickMarket() {
 // ============================================================
 
 async function loadAlerts() {
+    try {
+        const data = await API.get('/api/alerts');
+        if (data.success) renderAlerts(data.data);
+    } catch (e) {
+        console.error('Alerts error:', e);
+    }
+}
+
+function renderAlerts(alerts) {
     const list = document.getElementById('alertsList');
     if (!list) return;
 
     try {
-        const data = await API.get('/api/alerts');
-        if (!data.success || !data.data?.length) {
+        if (!alerts?.length) {
             list.innerHTML = `
                 <div class="empty-state">
                     <div class="empty-state-icon">🔔</div>
@@ -407,7 +440,7 @@ async function loadAlerts() {
             return;
         }
 
-        list.innerHTML = data.data.map(alert => {
+        list.innerHTML = alerts.map(alert => {
             const conditionText = alert.condition === 'above' ? '↑ üstüne çıkarsa' : '↓ altına düşerse';
             const statusClass = alert.triggered ? 'triggered' : 'active';
             const statusText = alert.triggered ? '✅ Tetiklendi!' : '⏳ Bekliyor';
@@ -464,22 +497,29 @@ async function deleteAlert(id) {
     }
 }
 
+function notifyAlerts(triggered) {
+    for (const alert of triggered) {
+        UI.showToast(`🔔 ${alert.symbol} alarm tetiklendi! Fiyat: ${UI.formatNumber(alert.current_price, 4)} ₺`);
+
+        // Browser notification
+        if ('Notification' in window && Notification.permission === 'granted') {
+            new Notification('Fiyat Alarmı! 🔔', {
+                body: `${alert.symbol}: ${alert.current_price} ₺`,
+                icon: '📊'
+            });
+        }
+    }
+    loadAlerts();
+}
+
 async function checkAlerts() {
+    // Alarmlar sunucuda değerlendirilir; sekme arka plandayken sorgulanmaz,
+    // görünür olduğunda bekleyen bildirimler tek seferde alınır.
+    if (document.hidden) return;
     try {
         const data = await API.get('/api/alerts/check');
         if (data.success && data.triggered?.length > 0) {
-            for (const alert of data.triggered) {
-                UI.showToast(`🔔 ${alert.symbol} alarm tetiklendi! Fiyat: ${UI.formatNumber(alert.current_price, 4)} ₺`);
-
-                // Browser notification
-                if (Notification.permission === 'granted') {
-                    new Notification('Fiyat Alarmı! 🔔', {
-                        body: `${alert.symbol}: ${alert.current_price} ₺`,
-                        icon: '📊'
-                    });
-                }
-            }
-            loadAlerts();
+            notifyAlerts(data.triggered);
         }
     } catch (e) {
         console.error('Alert check error:', e);
@@ -498,15 +538,13 @@ function closeAlertModal() {
 // RECENT HISTORY
 // ============================================================
 
-async function loadRecentHistory() {
+function renderRecentHistory(recent) {
     const list = document.getElementById('recentHistory');
     if (!list) return;
 
     try {
-        const data = await API.get('/api/history');
-
-        if (data.success && data.data?.length > 0) {
-            list.innerHTML = data.data.slice(0, 5).map(item => {
+        if (recent?.length > 0) {
+            list.innerHTML = recent.slice(0, 5).map(item => {
                 const isBuy = item.islem === 'ALIS';
                 const icon = isBuy ? '📈' : (item.islem === 'SATIS' ? '📉' : '🔄');
                 const iconClass = isBuy ? 'buy' : 'sell';
@@ -559,14 +597,9 @@ function startAutoRefresh() {
 // ============================================================
 
 document.addEventListener('DOMContentLoaded', () => {
-    // Load all sections
-    loadDashboardStats();
-    loadPortfolioChart();
-    loadPLChart();          // Yeni: Kar/Zarar çubuk grafiğini yükle
-    loadPerformance();
+    // Load all sections (piyasa kartları hariç hepsi tek istekte)
+    loadDashboard();
     loadQuickMarket();
-    loadAlerts();
-    loadRecentHistory();
 
     // Start auto-refresh
     startAutoRefresh();
@@ -576,8 +609,9 @@ document.addEventListener('DOMContentLoaded', () => {
         Notification.requestPermission();
     }
 
-    // Check alerts on load
+    // Alarm bildirimleri: yüklemede ve sekme tekrar görünür olduğunda kontrol et
     setTimeout(checkAlerts, 5000);
+    document.addEventListener('visibilitychange', checkAlerts);
 
     // Alert modal events
     document.getElementById('addAlertBtn')?.addEventListener('click', openAlertModal);
@@ -587,9 +621,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Performance refresh
     document.getElementById('refreshPerformance')?.addEventListener('click', () => {
-        loadPerformance();
-        loadPortfolioChart();
-        loadPLChart();      // Yeni: Güncelle butonuna basınca bar chart da yenilensin
+        loadDashboard();
         UI.showToast('📊 Performans güncelleniyor...');
     });
 
@@ -62,6 +62,10 @@ function renderHistory(items) {
                 icon = '📉';
                 iconClass = 'sell';
                 break;
+            case 'SIL':
+                icon = '🗑️';
+                iconClass = 'sell';
+                break;
             default:
                 icon = '🔄';
                 iconClass = 'update';
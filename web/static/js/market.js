@@ -2,68 +2,29 @@
  * Market Page JavaScript
  */
 
-async function loadCurrencies() {
-    const grid = document.getElementById('currencyGrid');
+// Tüm pano tek /api/market/overview isteğinden çizilir (sunucuda toplu
+// çekilir ve önbelleklenir)
+function renderGrid(id, items) {
+    const grid = document.getElementById(id);
     if (!grid) return;
 
-    const currencies = [
-        { symbol: 'USD', name: 'Amerikan Doları' },
-        { symbol: 'EUR', name: 'Euro' }
-    ];
-
-    const results = [];
-
-    for (const curr of currencies) {
-        const data = await API.get(`/api/price/${curr.symbol}`);
-        if (data.success) {
-            data.display_name = curr.name;
-            results.push(data);
-        }
-    }
-
-    grid.innerHTML = results.length > 0
-        ? results.map(createMarketCard).join('')
+    grid.innerHTML = items?.length > 0
+        ? items.map(item => createMarketCard({ ...item, display_name: item.name })).join('')
         : '<div class="market-card"><p>Veri yüklenemedi</p></div>';
 }
 
-async function loadCommodities() {
-    const grid = document.getElementById('commodityGrid');
-    if (!grid) return;
-
-    const data = await API.get('/api/price/ALTIN');
-
-    if (data.success) {
-        data.display_name = 'Gram Altın';
-        grid.innerHTML = createMarketCard(data);
-    } else {
-        grid.innerHTML = '<div class="market-card"><p>Veri yüklenemedi</p></div>';
-    }
-}
-
-async function loadStocks() {
-    const grid = document.getElementById('stockGrid');
-    if (!grid) return;
-
-    const stocks = [
-        { symbol: 'THYAO', name: 'Türk Hava Yolları' },
-        { symbol: 'ASELS', name: 'Aselsan' },
-        { symbol: 'KCHOL', name: 'Koç Holding' },
-        { symbol: 'SISE', name: 'Şişecam' }
-    ];
-
-    const results = [];
-
-    for (const stock of stocks) {
-        const data = await API.get(`/api/price/${stock.symbol}`);
-        if (data.success) {
-            data.display_name = stock.name;
-            results.push(data);
-        }
+async function loadMarket() {
+    let data = {};
+    try {
+        const response = await API.get('/api/market/overview');
+        if (response.success) data = response.data;
+    } catch (e) {
+        console.error('Market overview error:', e);
     }
 
-    grid.innerHTML = results.length > 0
-        ? results.map(createMarketCard).join('')
-        : '<div class="market-card"><p>Veri yüklenemedi</p></div>';
+    renderGrid('currencyGrid', data.currencies);
+    renderGrid('commodityGrid', data.commodities);
+    renderGrid('stockGrid', data.stocks);
 }
 
 async function refreshAll() {
@@ -71,11 +32,7 @@ async function refreshAll() {
     btn.disabled = true;
     btn.innerHTML = '<span>⏳</span> Yükleniyor...';
 
-    await Promise.all([
-        loadCurrencies(),
-        loadCommodities(),
-        loadStocks()
-    ]);
+    await loadMarket();
 
     btn.disabled = false;
     btn.innerHTML = '<span>🔄</span> Yenile';
@@ -90,9 +47,9 @@ async function refreshAll() {
 // 1. Kullanıcı miktarı değiştirdiğinde veya birim seçtiğinde tetiklenir
 // 2. Debounce: Kullanıcı yazmayı bitirene kadar bekler (500ms)
 //    -> Bu sayede her tuş basışında API çağrısı yapılmaz (sunucu koruması)
-// 3. Backend'den seçilen birimin güncel fiyatını çeker
-// 4. Basit çarpma işlemi: miktar × birim_fiyatı = TL karşılığı
-// 5. Sonucu ve kur bilgisini ekranda gösterir
+// 3. Backend'in /api/convert endpoint'i önbellekteki çapraz kur matrisiyle
+//    çevirir (çevirme başına dış API çağrısı yapılmaz)
+// 4. Sonucu ve kur bilgisini ekranda gösterir
 
 let converterTimeout = null;  // Debounce zamanlayıcısı
 
@@ -115,24 +72,19 @@ async function convertCurrency() {
     info.textContent = 'Fiyat çekiliyor...';
 
     try {
-        // 4) Backend'den güncel fiyatı çek
-        //    Mevcut /api/price/USD endpoint'ini kullanıyoruz
-        //    Yani yeni bir backend endpoint'i yazmaya GEREK YOK!
-        const data = await API.get(`/api/price/${from}`);
-
-        if (data.success && data.price) {
-            // 5) Çarpma işlemi: miktar × birim fiyatı = TL karşılığı
-            //    Örnek: 100 USD × 32.50 = 3.250,00 ₺
-            const result = amount * data.price;
-
-            // 6) Sonucu formatlı olarak göster
-            resultValue.textContent = UI.formatCurrency(result);
-
-            // 7) Alt bilgi satırında kur oranını göster
-            //    Örnek: "1 USD = 32,5000 ₺ • Kaynak: Yahoo Finance"
-            info.textContent = `1 ${from} = ${UI.formatNumber(data.price, 4)} ₺ • ${data.source || 'Anlık'}`;
+        // 4) Sunucuda çapraz kur matrisiyle çevir
+        //    Örnek: 100 USD → TRY, kur 32.50 → 3.250,00 ₺
+        const data = await API.get(`/api/convert?from=${from}&to=TRY&amount=${amount}`);
+
+        if (data.success) {
+            // 5) Sonucu formatlı olarak göster
+            resultValue.textContent = UI.formatCurrency(data.result);
+
+            // 6) Alt bilgi satırında kur oranını göster
+            //    Örnek: "1 USD = 32,5000 ₺"
+            info.textContent = `1 ${from} = ${UI.formatNumber(data.rate, 4)} ₺`;
         } else {
-            // Fiyat alınamadıysa hata mesajı göster
+            // Kur alınamadıysa hata mesajı göster
             resultValue.textContent = '❌';
             info.textContent = data.error || 'Fiyat alınamadı';
         }
@@ -153,9 +105,7 @@ function debouncedConvert() {
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
-    loadCurrencies();
-    loadCommodities();
-    loadStocks();
+    loadMarket();
 
     document.getElementById('refreshBtn')?.addEventListener('click', refreshAll);
 